@@ -1,8 +1,11 @@
 import streamlit as st
-from docx import Document
 from pathlib import Path
+import asyncio
 import io
-from src.graph import app
+from src.graph import arun_thread, thread_id_for, rerun_review
+from src.section_graph import arun_sections
+from src.agents import GRAPH_CONFIG
+from src.docx_stream import read_docx_text, strip_format_tags, write_docx_translation
 
 st.set_page_config(page_title="Patent-Mind Translator", layout="wide")
 
@@ -14,27 +17,63 @@ if uploaded_file is not None:
     file_extension = Path(uploaded_file.name).suffix.lower()
     
     if file_extension == '.docx':
-        doc = Document(io.BytesIO(uploaded_file.getvalue()))
-        source_text = '\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
+        # Inline formatting is kept as <g1>..</g1> / <x1/> placeholders for the .docx download
+        source_text = read_docx_text(io.BytesIO(uploaded_file.getvalue()), placeholders=True)
     else: # .txt
         source_text = uploaded_file.getvalue().decode("utf-8")
 
     st.subheader("Original Text")
-    st.text_area("Source", source_text, height=200)
+    st.text_area("Source", strip_format_tags(source_text), height=200)
 
     use_flash = st.checkbox("Use faster model for review (Gemini Flash)")
+    by_section = st.checkbox("Split into sections and translate them in parallel")
+    max_concurrency = st.number_input("Max parallel sections", min_value=1, max_value=32,
+                                      value=GRAPH_CONFIG["max_concurrency"], disabled=not by_section)
 
-    if st.button("Translate Document"):
-        initial_state = {
-            "original_text": source_text,
-            "document_type": "claim", # This could be an option in the UI
-            "use_flash_review": use_flash,
-            "messages": []
-        }
-        
-        with st.spinner('Translating... This may take a moment.'):
-            final_state = app.invoke(initial_state)
+    # Checkpointed thread for this document: an interrupted run resumes where it stopped
+    thread_id = thread_id_for(source_text, "sections" if by_section else "claim")
+    st.caption(f"Thread: `{thread_id}`")
 
+    col_translate, col_review = st.columns(2)
+    with col_translate:
+        if st.button("Translate Document"):
+            initial_state = {
+                "original_text": source_text,
+                "document_type": "claim", # This could be an option in the UI
+                "use_flash_review": use_flash,
+                "messages": [],
+                "iteration": 0,
+                "needs_human_review": False,
+                "escalation_reason": ""
+            }
+
+            # Nodes await their LLM calls and report as they finish
+            with st.status('Translating... This may take a moment.', expanded=True) as status:
+                def on_update(node_name, update):
+                    if node_name == "translate_section":
+                        item = update["section_results"][0]
+                        status.write(f"✅ Section {item['section']['unit_id'] or item['seq'] + 1} ({item['source']})")
+                    else:
+                        status.write(f"✅ {node_name}")
+
+                if by_section:
+                    run = arun_sections(source_text, use_flash_review=use_flash, thread_id=thread_id,
+                                        max_concurrency=int(max_concurrency), on_update=on_update)
+                else:
+                    run = arun_thread(initial_state, thread_id, on_update=on_update)
+                st.session_state[thread_id] = asyncio.run(run)
+                status.update(label="Translation finished", state="complete")
+    with col_review:
+        review_model = st.selectbox("Reviewer model", ["gemini-2.5-flash", "gemini-2.5-pro", "gemini-3-pro-preview"])
+        if st.button("Re-run review only", disabled=by_section):
+            with st.spinner('Reviewing the stored draft...'):
+                try:
+                    st.session_state[thread_id] = rerun_review(thread_id, review_model=review_model)
+                except ValueError as e:
+                    st.error(str(e))
+
+    final_state = st.session_state.get(thread_id)
+    if final_state:
         translation = final_state.get("final_translation")
         if not translation:
             translation = final_state.get("draft_translation", "No translation generated.")
@@ -42,7 +81,33 @@ if uploaded_file is not None:
         review = final_state.get("review_result", {})
 
         st.subheader("Translated Text")
-        st.text_area("Translation", translation, height=300)
+        st.text_area("Translation", strip_format_tags(translation), height=300)
+
+        if file_extension == '.docx':
+            output = io.BytesIO()
+            if write_docx_translation(io.BytesIO(uploaded_file.getvalue()), output, translation):
+                st.download_button(
+                    "Download translated .docx",
+                    output.getvalue(),
+                    file_name=f"{Path(uploaded_file.name).stem}_translated.docx",
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                )
+            else:
+                st.warning("Line count differs from the source paragraphs; formatted .docx download is unavailable.")
+
+        section_results = final_state.get("section_results", [])
+        if section_results:
+            st.subheader("Sections")
+            st.dataframe([
+                {
+                    "section": item["section"]["unit_id"] or item["seq"] + 1,
+                    "source": item["source"],
+                    "review passed": item["review_passed"],
+                    "attempts": item["iteration"],
+                    "escalation": item["escalation_reason"],
+                }
+                for item in section_results
+            ])
 
         if review:
             st.subheader("QA Review")
@@ -6,6 +6,7 @@ PyQt6 기반 데스크톱 애플리케이션
 
 import sys
 import os
+import time
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -22,6 +23,34 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from pipeline import TranslationPipeline
 from tm_manager import TranslationMemory
 from section_parser import PatentSectionParser
+from job_queue import JobQueue, job_key
+from docx_stream import read_docx_text, strip_format_tags, write_docx_translation
+from pdf_extractor import get_extraction_service, join_pages
+
+
+def save_translation(output_path: Path, translation: str, source_path: str = None) -> bool:
+    """번역 결과를 .docx 또는 텍스트 파일로 저장
+
+    원문이 .docx이고 번역문 줄이 원문 문단과 일대일로 대응하면 원본 서식을 유지한다.
+    Returns: 원본 서식 유지 여부
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.suffix.lower() == '.docx' and source_path and Path(source_path).suffix.lower() == '.docx' \
+            and write_docx_translation(source_path, str(output_path), translation):
+        return True
+
+    translation = strip_format_tags(translation)
+    if output_path.suffix.lower() == '.docx':
+        from docx import Document
+        doc = Document()
+        for line in translation.split('\n'):
+            if line.strip():
+                doc.add_paragraph(line)
+        doc.save(str(output_path))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(translation)
+    return False
 
 
 class TranslationThread(QThread):
@@ -31,7 +60,8 @@ class TranslationThread(QThread):
     finished = pyqtSignal(dict)  # 완료 시 결과
     error = pyqtSignal(str)  # 오류 발생 시
 
-    def __init__(self, input_file, output_file, doc_type, use_review, save_tm, auto_section=False):
+    def __init__(self, input_file, output_file, doc_type, use_review, save_tm, auto_section=False,
+                 restart=False):
         super().__init__()
         self.input_file = input_file
         self.output_file = output_file
@@ -39,8 +69,11 @@ class TranslationThread(QThread):
         self.use_review = use_review
         self.save_tm = save_tm
         self.auto_section = auto_section
+        self.restart = restart
 
     def run(self):
+        pipeline = None
+        job_queue = None
         try:
             self.progress.emit("🚀 번역 파이프라인 초기화 중...")
             pipeline = TranslationPipeline()
@@ -54,16 +87,20 @@ class TranslationThread(QThread):
                 with open(self.input_file, 'r', encoding='utf-8') as f:
                     source_text = f.read()
             elif file_ext == '.docx':
-                from docx import Document
-                doc = Document(self.input_file)
-                source_text = '\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
-                self.progress.emit(f"📄 Word 파일 읽기 완료: {len(doc.paragraphs)}개 문단")
+                # 자동 섹션 분류 모드는 문서를 재구성하므로 서식 자리표시자 없이 읽음
+                source_text = read_docx_text(self.input_file, placeholders=not self.auto_section)
+                paragraph_count = source_text.count('\n') + 1 if source_text else 0
+                self.progress.emit(f"📄 Word 파일 읽기 완료: {paragraph_count}개 문단")
             elif file_ext == '.pdf':
-                from docling.document_converter import DocumentConverter
-                converter = DocumentConverter()
-                result = converter.convert(self.input_file)
-                source_text = result.document.export_to_markdown()
-                self.progress.emit("📄 PDF 파일 변환 완료")
+                # 같은 PDF는 캐시에서 바로 읽고, 변환기는 실행 간 재사용
+                service = get_extraction_service()
+                page_texts = []
+                for page_no, text in service.iter_pages(self.input_file):
+                    page_texts.append(text)
+                    self.progress.emit(f"📄 PDF 페이지 {page_no} 추출")
+                source_text = join_pages(page_texts)
+                self.progress.emit(f"📄 PDF 파일 변환 완료 (캐시 {service.cache_hits}페이지, "
+                                   f"변환 {service.converted_pages}페이지)")
             else:
                 raise ValueError(f"지원하지 않는 파일 형식: {file_ext}")
 
@@ -71,55 +108,26 @@ class TranslationThread(QThread):
             if self.auto_section:
                 self.progress.emit("🤖 자동 섹션 분류 시작...")
 
-                parser = PatentSectionParser()
-                sections = parser.parse_document(source_text)
-
-                # 섹션별 번역 결과 저장
-                translated_sections = {}
-                total_sections = sum(len(items) for items in sections.values())
-                current = 0
-
-                for section_type, section_list in sections.items():
-                    if not section_list:
-                        continue
-
-                    translated_sections[section_type] = []
-
-                    for i, section in enumerate(section_list, 1):
-                        current += 1
-                        doc_type = parser.get_document_type_from_section(section.section_type)
-
-                        self.progress.emit(
-                            f"📝 번역 중 ({current}/{total_sections}): "
-                            f"{section_type.upper()} #{i} - {doc_type}"
-                        )
-
-                        # 섹션별 번역
-                        result = pipeline.translate_document(
-                            source_text=section.content,
-                            document_type=doc_type,
-                            use_self_review=self.use_review,
-                            save_to_tm=self.save_tm
-                        )
-
-                        if result["success"]:
-                            translated_sections[section_type].append(
-                                (section, result["translation"])
-                            )
-                        else:
-                            raise Exception(f"섹션 번역 실패: {result.get('error')}")
-
-                # 번역된 섹션 재구성
-                self.progress.emit("🔄 번역 문서 재구성 중...")
-                translation = parser.reconstruct_document(translated_sections)
-
-                # 결과 생성
-                result = {
-                    "success": True,
-                    "translation": translation,
-                    "sections": {k: len(v) for k, v in sections.items()},
-                    "auto_section": True
-                }
+                # 세그먼트별 번역 결과를 작업 큐에 기록 (중단 후 같은 파일을 다시 번역하면 이어서 진행)
+                job_queue = JobQueue()
+                job_id = job_key(source_text, mode="auto_section", use_self_review=self.use_review,
+                                 model=pipeline.translator.model_name)
+                if self.restart:
+                    # 저장된 세그먼트를 재사용하지 않고 새 작업으로 번역
+                    job_id = f"{job_id}-{int(time.time())}"
+                if job_queue.open_job(job_id, self.input_file, use_self_review=self.use_review):
+                    progress = job_queue.progress(job_id)
+                    done = progress["translated"] + progress["qa_checked"] + progress["saved"]
+                    self.progress.emit(f"↻ 중단된 작업 재개: {job_id} (번역 완료 {done}개)")
+
+                result = pipeline.translate_sections(
+                    source_text=source_text,
+                    use_self_review=self.use_review,
+                    save_to_tm=self.save_tm,
+                    job_queue=job_queue,
+                    job_id=job_id,
+                    progress_callback=self.progress.emit
+                )
 
             # 일반 번역 모드
             else:
@@ -137,19 +145,10 @@ class TranslationThread(QThread):
                 # 출력 파일 저장
                 self.progress.emit(f"💾 저장 중: {self.output_file}")
                 output_path = Path(self.output_file)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                output_ext = output_path.suffix.lower()
-
-                if output_ext == '.docx':
-                    from docx import Document
-                    doc = Document()
-                    for line in translation.split('\n'):
-                        if line.strip():
-                            doc.add_paragraph(line)
-                    doc.save(str(output_path))
-                else:
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(translation)
+                if save_translation(output_path, translation, self.input_file):
+                    self.progress.emit("🎨 원본 서식 유지하여 저장")
+                if job_queue is not None:
+                    job_queue.finish_job(job_id, str(output_path))
 
                 # QA 리포트 저장
                 if "qa_result" in result:
@@ -159,13 +158,17 @@ class TranslationThread(QThread):
                         f.write(qa_report)
 
                 self.progress.emit("✅ 번역 완료!")
-                pipeline.close()
                 self.finished.emit(result)
             else:
                 raise Exception(result.get('error', '알 수 없는 오류'))
 
         except Exception as e:
             self.error.emit(str(e))
+        finally:
+            if job_queue is not None:
+                job_queue.close()
+            if pipeline is not None:
+                pipeline.close()
 
 
 class PatentTranslatorGUI(QMainWindow):
@@ -174,6 +177,8 @@ class PatentTranslatorGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.translation_thread = None
+        self.qa_session = None
+        self.review_sections = None
         self.init_ui()
 
     def init_ui(self):
@@ -197,6 +202,10 @@ class PatentTranslatorGUI(QMainWindow):
         translate_tab = self.create_translate_tab()
         tabs.addTab(translate_tab, "📝 번역")
 
+        # 검수 탭
+        review_tab = self.create_review_tab()
+        tabs.addTab(review_tab, "🔍 검수")
+
         # TM 통계 탭
         tm_tab = self.create_tm_tab()
         tabs.addTab(tm_tab, "📊 Translation Memory")
@@ -268,6 +277,12 @@ class PatentTranslatorGUI(QMainWindow):
         self.auto_section_checkbox.toggled.connect(self.toggle_auto_section)
         options_layout.addWidget(self.auto_section_checkbox)
 
+        # 작업 큐에 저장된 번역 재사용 여부 (자동 분류 시에만 사용)
+        self.restart_checkbox = QCheckBox("🔁 저장된 작업을 재사용하지 않고 처음부터 번역")
+        self.restart_checkbox.setChecked(False)
+        self.restart_checkbox.setEnabled(False)
+        options_layout.addWidget(self.restart_checkbox)
+
         # 문서 유형 (자동 분류 시 비활성화)
         doc_type_layout = QHBoxLayout()
         doc_type_layout.addWidget(QLabel("문서 유형:"))
@@ -326,6 +341,144 @@ class PatentTranslatorGUI(QMainWindow):
 
         return tab
 
+    def create_review_tab(self):
+        """세그먼트 검수 탭 생성 (번역 수정 시 해당 세그먼트만 QA 재검사)"""
+        tab = QWidget()
+        layout = QVBoxLayout()
+        tab.setLayout(layout)
+
+        # 타이틀
+        title = QLabel("🔍 세그먼트 검수")
+        title_font = QFont()
+        title_font.setPointSize(14)
+        title_font.setBold(True)
+        title.setFont(title_font)
+        layout.addWidget(title)
+
+        self.review_summary_label = QLabel("번역을 완료하면 세그먼트별 QA 결과가 표시됩니다.")
+        layout.addWidget(self.review_summary_label)
+
+        # 세그먼트 테이블 (번역 열만 편집 가능)
+        self.review_table = QTableWidget(0, 4)
+        self.review_table.setHorizontalHeaderLabels(["세그먼트", "원문", "번역 (편집 가능)", "QA"])
+        self.review_table.horizontalHeader().setStretchLastSection(True)
+        self.review_table.setWordWrap(True)
+        self.review_table.itemChanged.connect(self.on_review_item_changed)
+        layout.addWidget(self.review_table)
+
+        # 선택한 세그먼트의 위반 사항
+        self.review_detail_text = QTextEdit()
+        self.review_detail_text.setReadOnly(True)
+        self.review_detail_text.setMaximumHeight(150)
+        layout.addWidget(self.review_detail_text)
+        self.review_table.currentCellChanged.connect(
+            lambda row, *_: self.show_segment_violations(row)
+        )
+
+        save_btn = QPushButton("💾 수정본 저장")
+        save_btn.clicked.connect(self.save_reviewed_translation)
+        layout.addWidget(save_btn)
+
+        return tab
+
+    def load_review_segments(self, result):
+        """번역 결과의 QA 세션을 검수 테이블에 표시"""
+        self.qa_session = result.get("qa_session")
+        self.review_sections = result.get("translated_sections")
+        if not self.qa_session:
+            return
+
+        self.review_table.blockSignals(True)
+        self.review_table.setRowCount(len(self.qa_session.segments))
+        for row, segment in enumerate(self.qa_session.segments):
+            label_item = QTableWidgetItem(segment.label)
+            source_item = QTableWidgetItem(segment.source)
+            for item in (label_item, source_item):
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.review_table.setItem(row, 0, label_item)
+            self.review_table.setItem(row, 1, source_item)
+            self.review_table.setItem(row, 2, QTableWidgetItem(segment.target))
+            self.update_review_status(row)
+        self.review_table.resizeRowsToContents()
+        self.review_table.blockSignals(False)
+        self.update_review_summary()
+
+    def update_review_status(self, row):
+        """세그먼트 QA 상태 열 갱신"""
+        violations = self.qa_session.segment_violations(row)
+        status = "✅" if self.qa_session.segment_passed(row) else "❌"
+        if violations:
+            status += f" {len(violations)}건"
+        item = QTableWidgetItem(status)
+        item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+        self.review_table.setItem(row, 3, item)
+
+    def update_review_summary(self):
+        """전체 QA 요약 갱신"""
+        qa_result = self.qa_session.result()
+        self.review_summary_label.setText(
+            f"QA: {'✅ PASS' if qa_result['passed'] else '❌ FAIL'} | "
+            f"세그먼트 {qa_result['segments']}개 | 위반 {qa_result['total_violations']}개 | "
+            f"재검사 {qa_result['cache_misses']}회, 캐시 적중 {qa_result['cache_hits']}회"
+        )
+
+    def on_review_item_changed(self, item):
+        """번역 수정 시 해당 세그먼트만 재검사"""
+        if not self.qa_session or item.column() != 2:
+            return
+
+        row = item.row()
+        self.qa_session.update_target(row, item.text())
+        self.review_table.blockSignals(True)
+        self.update_review_status(row)
+        self.review_table.blockSignals(False)
+        self.update_review_summary()
+        self.show_segment_violations(row)
+
+    def show_segment_violations(self, row):
+        """세그먼트 위반 사항 표시"""
+        if not self.qa_session or not 0 <= row < len(self.qa_session.segments):
+            return
+
+        lines = []
+        for v in self.qa_session.segment_violations(row):
+            lines.append(f"[{v['severity'].upper()}] {v['location']}: {v['description']}")
+            if v['correct']:
+                lines.append(f"    → {v['correct']}")
+        self.review_detail_text.setText("\n".join(lines) or "위반 사항 없음")
+
+    def save_reviewed_translation(self):
+        """검수 반영본과 QA 리포트 저장"""
+        output_file = self.output_file_edit.text()
+        if not self.qa_session or not output_file:
+            QMessageBox.warning(self, "경고", "저장할 검수 결과가 없습니다.")
+            return
+
+        # 자동 섹션 분류 결과는 섹션 헤더를 포함하여 재구성
+        if self.review_sections:
+            items = sorted(
+                ((key, section) for key, pairs in self.review_sections.items() for section, _ in pairs),
+                key=lambda pair: pair[1].start_line
+            )
+            translated_sections = {key: [] for key in self.review_sections}
+            for (key, section), segment in zip(items, self.qa_session.segments):
+                translated_sections[key].append((section, segment.target))
+            translation = PatentSectionParser().reconstruct_document(translated_sections)
+        else:
+            translation = self.qa_session.translation()
+
+        try:
+            output_path = Path(output_file)
+            save_translation(output_path, translation, self.input_file_edit.text().strip())
+            qa_report = self.qa_session.checker.generate_report(self.qa_session.result())
+            with open(output_path.with_suffix('.qa.txt'), 'w', encoding='utf-8') as f:
+                f.write(qa_report)
+        except Exception as e:
+            QMessageBox.critical(self, "오류", f"저장 실패:\n{str(e)}")
+            return
+
+        self.statusBar().showMessage(f"수정본 저장 완료: {output_path}")
+
     def create_tm_tab(self):
         """TM 검색 및 통계 탭 생성"""
         tab = QWidget()
@@ -680,6 +833,7 @@ class PatentTranslatorGUI(QMainWindow):
         """자동 섹션 분류 토글"""
         # 자동 분류 모드일 때는 문서 유형 선택 비활성화
         self.doc_type_combo.setEnabled(not checked)
+        self.restart_checkbox.setEnabled(checked)
 
         if checked:
             self.log_text.append(
@@ -714,6 +868,7 @@ class PatentTranslatorGUI(QMainWindow):
         use_review = self.review_checkbox.isChecked()
         save_tm = self.tm_checkbox.isChecked()
         auto_section = self.auto_section_checkbox.isChecked()
+        restart = auto_section and self.restart_checkbox.isChecked()
 
         # UI 비활성화
         self.translate_btn.setEnabled(False)
@@ -727,7 +882,7 @@ class PatentTranslatorGUI(QMainWindow):
 
         # 번역 스레드 시작
         self.translation_thread = TranslationThread(
-            input_file, output_file, doc_type, use_review, save_tm, auto_section
+            input_file, output_file, doc_type, use_review, save_tm, auto_section, restart
         )
         self.translation_thread.progress.connect(self.update_progress)
         self.translation_thread.finished.connect(self.translation_finished)
@@ -744,7 +899,7 @@ class PatentTranslatorGUI(QMainWindow):
         self.progress_bar.hide()
         self.translate_btn.setEnabled(True)
 
-        translation = result["translation"]
+        translation = strip_format_tags(result["translation"])
         qa_result = result.get("qa_result", {})
 
         # 결과 표시
@@ -760,6 +915,8 @@ class PatentTranslatorGUI(QMainWindow):
             self.log_text.append(f"\n📊 QA 결과: {'✅ PASS' if passed else '❌ FAIL'}")
             self.log_text.append(f"   위반 사항: {total_violations}개")
 
+        self.load_review_segments(result)
+
         # 성공 메시지
         QMessageBox.information(
             self,
@@ -4,18 +4,18 @@
 """
 
 import sys
+import time
 from pathlib import Path
 
 # src 디렉토리를 Python 경로에 추가
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+# 번역 파이프라인(LLM SDK)과 RAG(chromadb)는 무거우므로 필요한 명령 안에서 임포트
+# (version, tm-stats 등 LLM이 필요 없는 명령의 시작 시간 단축)
 import click
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
-from rich.syntax import Syntax
-from pipeline import TranslationPipeline
-from tm_manager import TranslationMemory
-from rag_guide import StyleGuideRAG
 
 console = Console()
 
@@ -35,8 +35,15 @@ def cli():
               default=None, help='번역에 사용할 Gemini 모델 선택')
 @click.option('--no-review', is_flag=True, help='자체 검수 생략')
 @click.option('--no-tm', is_flag=True, help='TM 저장 생략')
-def translate(input_file, output, document_type, model, no_review, no_tm):
+@click.option('--pages', default=None, help='PDF 페이지 범위 (예: 1-20)')
+@click.option('--auto-section', is_flag=True, help='섹션 자동 분류 후 섹션 단위 번역 (중단 시 재개 가능)')
+@click.option('--restart', is_flag=True, help='--auto-section 작업 큐에 저장된 번역을 무시하고 처음부터 번역')
+@click.option('--timings', is_flag=True, help='단계별 소요 시간/토큰 측정 (logs/metrics.jsonl에 기록, 요약 출력)')
+def translate(input_file, output, document_type, model, no_review, no_tm, pages, auto_section, restart, timings):
     """특허 문서 번역 (지원: .txt, .docx, .pdf)"""
+    from pipeline import TranslationPipeline
+    from docx_stream import strip_format_tags, write_docx_translation
+    from rich.syntax import Syntax
 
     console.print(Panel.fit("🌟 특허 번역 시작", style="bold blue"))
 
@@ -48,17 +55,26 @@ def translate(input_file, output, document_type, model, no_review, no_tm):
         with open(input_file, 'r', encoding='utf-8') as f:
             source_text = f.read()
     elif file_ext == '.docx':
+        # 서식 자리표시자(<g1>..</g1>, <x1/>)를 포함한 문단 단위 텍스트 (.docx 출력 시 원본 서식 복원)
+        from docx_stream import read_docx_text
+        # (섹션 자동 분류 모드는 문서를 재구성하므로 자리표시자 없이 읽음)
+        source_text = read_docx_text(input_file, placeholders=not auto_section)
+    elif file_ext == '.pdf':
+        from pdf_extractor import get_extraction_service, join_pages, parse_page_range
+        service = get_extraction_service()
         try:
-            from docx import Document
-            doc = Document(input_file)
-            source_text = '\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
-        except ImportError:
-            console.print("❌ python-docx 패키지가 필요합니다: uv add python-docx", style="red")
+            page_range = parse_page_range(pages)
+            page_texts = []
+            for page_no, text in service.iter_pages(input_file, page_range):
+                page_texts.append(text)
+                console.print(f"   📄 PDF 페이지 {page_no} 추출", style="dim")
+            source_text = join_pages(page_texts)
+        except (ImportError, ValueError) as e:
+            console.print(f"❌ {e}", style="red")
             sys.exit(1)
-    # PDF 지원은 docling이 로컬에 설치되어 있지 않을 수 있으므로 일단 제거
-    # elif file_ext == '.pdf': ...
+        console.print(f"📄 PDF 추출 완료 (캐시 {service.cache_hits}페이지, 변환 {service.converted_pages}페이지)")
     else:
-        console.print(f"❌ 지원하지 않는 파일 형식: {file_ext}. (.txt, .docx만 지원)", style="red")
+        console.print(f"❌ 지원하지 않는 파일 형식: {file_ext}. (.txt, .docx, .pdf만 지원)", style="red")
         sys.exit(1)
 
     console.print(f"\n📄 입력 파일: {input_file}")
@@ -69,19 +85,46 @@ def translate(input_file, output, document_type, model, no_review, no_tm):
         console.print(f"🤖 사용할 모델: {model}")
     console.print("")
 
-    pipeline = TranslationPipeline()
+    translation_logger = None
+    if timings:
+        import logging
+        from logger import TranslationLogger
+        translation_logger = TranslationLogger.from_config(console_level=logging.WARNING)
+    pipeline = TranslationPipeline(logger=translation_logger)
     
     # 모델 설정 (사용자가 지정한 경우)
     if model:
         pipeline.translator.set_model(model)
 
+    job_queue = None
     try:
-        result = pipeline.translate_document(
-            source_text=source_text,
-            document_type=document_type,
-            use_self_review=not no_review,
-            save_to_tm=not no_tm
-        )
+        if auto_section:
+            # 세그먼트별 번역 결과를 작업 큐에 기록 (같은 입력을 다시 실행하면 이어서 진행)
+            from job_queue import JobQueue, job_key
+            job_queue = JobQueue()
+            job_id = job_key(source_text, mode="auto_section", use_self_review=not no_review,
+                             model=pipeline.translator.model_name)
+            if restart:
+                job_id = f"{job_id}-{int(time.time())}"
+            if job_queue.open_job(job_id, input_file, use_self_review=not no_review):
+                progress = job_queue.progress(job_id)
+                done = progress["translated"] + progress["qa_checked"] + progress["saved"]
+                console.print(f"↻ 중단된 작업 재개: {job_id} (번역 완료 {done}개)", style="cyan")
+
+            result = pipeline.translate_sections(
+                source_text=source_text,
+                use_self_review=not no_review,
+                save_to_tm=not no_tm,
+                job_queue=job_queue,
+                job_id=job_id
+            )
+        else:
+            result = pipeline.translate_document(
+                source_text=source_text,
+                document_type=document_type,
+                use_self_review=not no_review,
+                save_to_tm=not no_tm
+            )
 
         if result["success"]:
             translation = result["translation"]
@@ -89,13 +132,19 @@ def translate(input_file, output, document_type, model, no_review, no_tm):
             console.print("✅ 번역 완료!", style="bold green")
             console.print("="*60 + "\n", style="green")
 
-            syntax = Syntax(translation, "text", theme="monokai", line_numbers=False)
+            syntax = Syntax(strip_format_tags(translation), "text", theme="monokai", line_numbers=False)
             console.print(Panel(syntax, title="번역 결과", border_style="green"))
 
             if output:
                 output_path = Path(output)
                 output_path.parent.mkdir(parents=True, exist_ok=True)
-                if output_path.suffix.lower() == '.docx':
+                if output_path.suffix.lower() == '.docx' and file_ext == '.docx' and \
+                        write_docx_translation(input_file, str(output_path), translation):
+                    console.print(f"\n💾 Word 파일 저장 완료 (원본 서식 유지): {output_path}", style="green")
+                elif output_path.suffix.lower() == '.docx':
+                    if file_ext == '.docx':
+                        console.print("⚠️  번역문 줄 수가 원문 문단 수와 달라 원본 서식 없이 저장합니다", style="yellow")
+                        translation = strip_format_tags(translation)
                     try:
                         from docx import Document
                         doc = Document()
@@ -108,7 +157,7 @@ def translate(input_file, output, document_type, model, no_review, no_tm):
                         console.print("❌ python-docx 패키지가 필요합니다", style="red")
                 else:
                     with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(translation)
+                        f.write(strip_format_tags(translation))
                     console.print(f"\n💾 텍스트 파일 저장 완료: {output_path}", style="green")
 
                 if "qa_result" in result:
@@ -122,16 +171,166 @@ def translate(input_file, output, document_type, model, no_review, no_tm):
                 qa = result["qa_result"]
                 console.print(f"\n📊 QA 결과: {'✅ PASS' if qa['passed'] else '❌ FAIL'}")
                 console.print(f"   위반 사항: {qa['total_violations']}개")
+
+            if translation_logger is not None and translation_logger.last_summary:
+                summary = translation_logger.last_summary
+                console.print(f"\n⏱️ 단계별 소요 시간 (전체 {summary['wall_seconds']:.2f}초, "
+                              f"LLM 호출 {summary['llm_calls']}회, "
+                              f"토큰 {summary['prompt_tokens']:,}+{summary['output_tokens']:,})")
+                for name, stage in summary["stages"].items():
+                    console.print(f"   {name}: {stage['seconds']:.2f}초 ({stage['share']:.0%}, {stage['count']}회, "
+                                  f"최대 {stage['max_seconds']:.2f}초)")
+                console.print(f"   기록: {translation_logger.metrics_path}", style="dim")
+
+            if job_queue is not None:
+                job_queue.finish_job(job_id, str(output or ""))
         else:
             console.print(f"\n❌ 번역 실패: {result.get('error')}", style="bold red")
             sys.exit(1)
+    finally:
+        if job_queue is not None:
+            job_queue.close()
+        pipeline.close()
+        if translation_logger is not None:
+            translation_logger.close()
+
+
+@cli.command()
+@click.option('--db', 'db_path', default='data/jobs.db', help='작업 큐 데이터베이스 경로')
+@click.option('--all', 'show_all', is_flag=True, help='완료된 작업 포함')
+@click.option('--human-review', is_flag=True, help='사람 검수 대기 목록 표시')
+def jobs(db_path, show_all, human_review):
+    """섹션 단위 번역 작업 큐 상태 (중단된 작업은 같은 명령을 다시 실행하면 재개)"""
+    from job_queue import JobQueue
+
+    queue = JobQueue(db_path)
+    try:
+        if human_review:
+            reviews = queue.list_human_reviews()
+        else:
+            job_list = queue.list_jobs(unfinished_only=not show_all)
+    finally:
+        queue.close()
+
+    if human_review:
+        console.print(Panel.fit("🧑‍⚖️ 사람 검수 대기", style="bold yellow"))
+        if not reviews:
+            console.print("\n대기 중인 항목이 없습니다.")
+        for item in reviews:
+            meta = item["meta"]
+            # 스레드 ID, 원문, LLM 검수 의견의 대괄호가 rich 마크업으로 해석되지 않도록 이스케이프
+            thread = escape(f"[{item['thread_id']}]")
+            console.print(f"\n#{item['id']} {thread} {item['created_at']}")
+            console.print(f"   사유: {escape(item['reason'] or '')} (시도 {meta.get('iterations', 0)}회, "
+                          f"${meta.get('cost_usd', 0.0):.3f})")
+            console.print(f"   원문: {escape(item['source_text'][:80])}")
+            console.print(f"   검수 의견: {escape(item['feedback'][:200])}")
+        return
+
+    console.print(Panel.fit("🗂 번역 작업 큐", style="bold cyan"))
+    if not job_list:
+        console.print("\n진행 중인 작업이 없습니다.")
+        return
+    for job in job_list:
+        progress = job["progress"]
+        total = sum(progress.values())
+        done = total - progress["pending"] - progress["translating"]
+        # 상태의 대괄호와 파일 경로가 rich 마크업으로 해석되지 않도록 이스케이프
+        status = escape(f"[{job['status']}]")
+        console.print(f"\n{escape(job['job_id'])} {status} {escape(job['input_path'] or '')}")
+        console.print(f"   번역 {done}/{total} (대기 {progress['pending']}, 번역 중 {progress['translating']}, "
+                      f"QA {progress['qa_checked']}, 저장 {progress['saved']})  갱신: {job['updated_at']}")
+
+
+@cli.command()
+@click.argument('input_pattern')
+@click.option('-o', '--output-dir', type=click.Path(), default='output', show_default=True, help='출력 디렉토리')
+@click.option('--ext', 'output_ext', type=click.Choice(['.txt', '.docx']), default=None,
+              help='출력 형식 (기본: .docx 입력은 .docx, 그 외 .txt)')
+@click.option('--type', 'document_type', type=click.Choice(['claim', 'specification', 'abstract']),
+              default='claim', help='문서 유형')
+@click.option('--model', type=click.Choice(['gemini-2.5-flash', 'gemini-2.5-pro', 'gemini-3-pro-preview']),
+              default=None, help='번역에 사용할 Gemini 모델 선택')
+@click.option('-r', '--recursive', is_flag=True, help='하위 디렉토리 포함 (글롭은 ** 사용)')
+@click.option('--concurrency', default=4, show_default=True, help='동시에 번역할 최대 문서 수')
+@click.option('--rpm', type=float, default=None, help='LLM 분당 최대 요청 수')
+@click.option('--workers', type=int, default=None, help='파일 읽기/쓰기 프로세스 수 (기본: CPU 수)')
+@click.option('--force', is_flag=True, help='최신 출력이 있어도 다시 번역')
+@click.option('--no-review', is_flag=True, help='자체 검수 생략')
+@click.option('--no-tm', is_flag=True, help='TM 저장 생략')
+@click.option('-v', '--verbose', is_flag=True, help='문서별 파이프라인 로그 출력')
+def translate_batch(input_pattern, output_dir, output_ext, document_type, model, recursive,
+                    concurrency, rpm, workers, force, no_review, no_tm, verbose):
+    """디렉토리 또는 글롭 패턴의 문서 일괄 번역"""
+    import os
+    from contextlib import redirect_stdout
+    from batch_translate import BatchTranslator, discover_inputs
+    from pipeline import TranslationPipeline
+
+    console.print(Panel.fit("📦 특허 일괄 번역", style="bold blue"))
+
+    inputs = discover_inputs(input_pattern, recursive)
+    if not inputs:
+        console.print(f"❌ 번역할 파일이 없습니다: {input_pattern} (.txt, .docx, .pdf)", style="red")
+        sys.exit(1)
+    base_dir = Path(input_pattern) if Path(input_pattern).is_dir() else None
+
+    pipeline = TranslationPipeline()
+    if model:
+        pipeline.translator.set_model(model)
+
+    try:
+        batch = BatchTranslator(pipeline, concurrency=concurrency, requests_per_minute=rpm, workers=workers)
+        jobs = batch.plan(inputs, Path(output_dir), output_ext, base_dir, force=force)
+        skipped = sum(1 for job in jobs if job.status == "skipped")
+        console.print(f"\n📄 입력 파일: {len(inputs)}개 (최신 출력 있음 {skipped}개 건너뜀)")
+        console.print(f"⚙️  동시 번역 {concurrency}개" + (f", 분당 {rpm:g}회 요청 제한" if rpm else "") + "\n")
+
+        # 파이프라인 로그는 문서 간에 섞이므로 기본적으로 숨기고 문서별 결과만 출력
+        progress = Console(file=sys.stdout)
+        done_count = 0
+
+        def on_done(job):
+            nonlocal done_count
+            done_count += 1
+            prefix = f"[{done_count}/{len(jobs) - skipped}]"
+            if job.status == "failed":
+                progress.print(f"{prefix} ❌ {job.input_path}: {job.error}", style="red")
+            else:
+                qa = "" if job.qa_passed is None else (" QA ✅" if job.qa_passed else " QA ❌")
+                progress.print(f"{prefix} ✅ {job.input_path} → {job.output_path} "
+                               f"({job.source}, {job.seconds:.1f}초){qa}")
+
+        translate_kwargs = {
+            "document_type": document_type,
+            "use_self_review": not no_review,
+            "save_to_tm": not no_tm
+        }
+        if verbose:
+            summary = batch.run(jobs, translate_kwargs, on_done)
+        else:
+            with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+                summary = batch.run(jobs, translate_kwargs, on_done)
     finally:
         pipeline.close()
 
+    usage = summary.token_usage
+    console.print("\n" + "=" * 60)
+    console.print(f"완료 {summary.count('done')}개 / 실패 {summary.count('failed')}개 / "
+                  f"건너뜀 {summary.count('skipped')}개 ({summary.elapsed:.1f}초)")
+    console.print(f"처리량: {summary.docs_per_min:.1f} 문서/분, {summary.tokens_per_min:,.0f} 토큰/분 "
+                  f"(LLM 요청 {usage.get('requests', 0)}회, 입력 {usage.get('prompt_tokens', 0):,} / "
+                  f"출력 {usage.get('output_tokens', 0):,} 토큰)")
+    console.print(f"TM 적중률: {summary.tm_hit_rate:.1%}")
+    if summary.count('failed'):
+        sys.exit(1)
+
 
 @cli.command()
 def tm_stats():
     """Translation Memory 통계"""
+    from tm_manager import TranslationMemory
+
     tm = TranslationMemory()
     try:
         stats = tm.get_stats()
@@ -149,10 +348,75 @@ def tm_stats():
         tm.close()
 
 
+@cli.command()
+@click.option('--db', 'db_path', default='data/translation_memory.db', help='TM 데이터베이스 경로')
+@click.option('-o', '--output', default='data/domain_classifier.npz', help='모델 저장 경로')
+@click.option('--min-samples', default=5, show_default=True, help='도메인별 최소 학습 샘플 수')
+def train_domain(db_path, output, min_samples):
+    """TM의 도메인 라벨로 로컬 도메인 분류기 학습"""
+    from domain_classifier import DomainClassifier
+    from tm_manager import TranslationMemory
+
+    console.print(Panel.fit("🧠 도메인 분류기 학습", style="bold yellow"))
+    tm = TranslationMemory(db_path)
+    try:
+        classifier = DomainClassifier()
+        counts = classifier.fit_from_tm(tm, min_samples=min_samples)
+    except ValueError as e:
+        console.print(f"\n❌ 학습 실패: {e}", style="red")
+        sys.exit(1)
+    finally:
+        tm.close()
+
+    classifier.save(output)
+    console.print("\n학습 샘플:")
+    for domain, count in counts.items():
+        console.print(f"  - {domain}: {count}개")
+    console.print(f"\n✅ 모델 저장 완료: {output}", style="green")
+
+
+@cli.command()
+@click.option('--db', 'db_path', default='data/translation_memory.db', help='TM 데이터베이스 경로')
+@click.option('--rules', 'rule_paths', multiple=True, help='QA 규칙 파일 (여러 번 지정 가능, 기본: config/qa_rules.json)')
+@click.option('--workers', type=int, default=None, help='워커 프로세스 수 (기본: CPU 수)')
+@click.option('--batch-size', default=500, show_default=True, help='워커당 배치 크기')
+@click.option('--downrank', is_flag=True, help='QA 실패 항목의 품질 점수 하향')
+@click.option('--restart', is_flag=True, help='체크포인트를 무시하고 처음부터 감사')
+def qa_audit(db_path, rule_paths, workers, batch_size, downrank, restart):
+    """TM 전체 항목에 현재 QA 규칙 재적용"""
+    from qa_audit import TMQAAuditor
+
+    console.print(Panel.fit("🔍 Translation Memory QA 감사", style="bold cyan"))
+    auditor = TMQAAuditor(db_path, rule_paths=list(rule_paths) or None)
+    try:
+        if not restart and auditor.get_checkpoint():
+            console.print(f"\n↻ 체크포인트에서 재개: TM id > {auditor.get_checkpoint()}")
+
+        def on_progress(stats):
+            console.print(f"   감사 {stats['audited']}건 / 실패 {stats['failed']}건 "
+                          f"(TM id {stats['last_tm_id']})")
+
+        stats = auditor.run(workers=workers, batch_size=batch_size, downrank=downrank,
+                            resume=not restart, progress_callback=on_progress)
+    finally:
+        auditor.close()
+
+    counts = stats["severity_counts"]
+    console.print(f"\n감사 항목: {stats['audited']}개 ({stats['rows_per_sec']:.0f}건/초)")
+    console.print(f"QA 실패: {stats['failed']}개")
+    console.print(f"위반 사항: {stats['violations']}개 "
+                  f"(Critical {counts['critical']}, Major {counts['major']}, Minor {counts['minor']})")
+    if downrank:
+        console.print(f"품질 점수 하향: {stats['downranked']}개")
+    console.print("\n✅ 감사 완료 (결과: qa_audit 테이블)", style="green")
+
+
 @cli.command()
 @click.argument('guide_path', type=click.Path(exists=True))
 def init_rag(guide_path):
     """스타일 가이드 RAG 인덱싱"""
+    from rag_guide import StyleGuideRAG
+
     console.print(Panel.fit("🔧 스타일 가이드 인덱싱", style="bold yellow"))
     console.print(f"\n📄 파일: {guide_path}")
     rag = StyleGuideRAG()
@@ -163,6 +427,115 @@ def init_rag(guide_path):
         sys.exit(1)
 
 
+@cli.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='바인드 주소')
+@click.option('--port', default=8765, show_default=True, help='포트')
+@click.option('--workers', default=2, show_default=True, help='동시에 번역할 작업 수')
+@click.option('--max-pending', default=16, show_default=True, help='워커를 기다릴 수 있는 작업 수 (초과 시 429)')
+def serve(host, port, workers, max_pending):
+    """번역 HTTP 서버 실행 (파이프라인을 한 번만 초기화하여 재사용)"""
+    from translation_server import serve as run_server
+
+    console.print(Panel.fit("🌐 번역 서버", style="bold blue"))
+    console.print(f"\n주소: http://{host}:{port} (워커 {workers}개, 대기 {max_pending}개)")
+    console.print("엔드포인트: POST /jobs, GET /jobs/{id}, /jobs/{id}/result, /jobs/{id}/stream, /health\n")
+    try:
+        run_server(host=host, port=port, workers=workers, max_pending=max_pending)
+    except (ImportError, ValueError) as e:
+        console.print(f"❌ {e}", style="red")
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('commands', nargs=-1)
+@click.option('-n', '--repeat', default=5, show_default=True, help='명령별 실행 횟수')
+@click.option('--max-seconds', default=1.0, show_default=True, help='허용 시작 시간 (중앙값 기준, 초과 시 종료 코드 1)')
+def startup_time(commands, repeat, max_seconds):
+    """LLM이 필요 없는 명령의 시작 시간 측정 (매번 새 프로세스, 기본: version, tm-stats)"""
+    import statistics
+    import subprocess
+
+    commands = commands or ('version', 'tm-stats')
+    console.print(Panel.fit("⏱️ CLI 시작 시간", style="bold cyan"))
+
+    slow = []
+    for command in commands:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, __file__, *command.split()], capture_output=True)
+            timings.append(time.perf_counter() - start)
+            if result.returncode != 0:
+                console.print(f"❌ {command}: 종료 코드 {result.returncode}\n"
+                              f"{result.stderr.decode('utf-8', 'replace')}", style="red")
+                sys.exit(1)
+
+        median = statistics.median(timings)
+        ok = median <= max_seconds
+        if not ok:
+            slow.append(command)
+        console.print(f"  {'✅' if ok else '❌'} {command}: 중앙값 {median:.2f}초 "
+                      f"(최소 {min(timings):.2f}초, 최대 {max(timings):.2f}초)")
+
+    if slow:
+        console.print(f"\n❌ 허용 시간 {max_seconds:.2f}초 초과: {', '.join(slow)}", style="red")
+        sys.exit(1)
+    console.print(f"\n✅ 모든 명령이 {max_seconds:.2f}초 이내에 시작", style="green")
+
+
+@cli.command()
+@click.option('--only', 'only', multiple=True, type=click.Choice(['tm', 'qa', 'parse', 'pipeline']),
+              help='실행할 벤치마크 (여러 번 지정 가능, 기본: 전체)')
+@click.option('-o', '--output', type=click.Path(), default='output/benchmark.json', show_default=True,
+              help='결과 JSON 경로')
+@click.option('--baseline', type=click.Path(exists=True), help='비교할 기준 결과 JSON (회귀 시 종료 코드 1)')
+@click.option('--threshold', default=0.2, show_default=True, help='회귀로 판단할 악화 비율')
+@click.option('--tm-size', default=5000, show_default=True, help='합성 TM 항목 수')
+@click.option('--queries', default=200, show_default=True, help='TM 검색 질의 수')
+@click.option('--qa-segments', default=500, show_default=True, help='QA 검사 세그먼트 수')
+@click.option('--documents', default=20, show_default=True, help='파싱할 합성 문서 수')
+@click.option('--pipeline-documents', default=10, show_default=True, help='파이프라인으로 번역할 문서 수')
+@click.option('--llm-latency', default=0.0, show_default=True, help='가짜 LLM 응답 지연 (초)')
+@click.option('--seed', default=0, show_default=True, help='코퍼스 생성 시드')
+@click.option('--repeat', default=3, show_default=True, help='처리량 측정 반복 횟수 (최고 기록 사용)')
+def benchmark(only, output, baseline, threshold, tm_size, queries, qa_segments, documents,
+              pipeline_documents, llm_latency, seed, repeat):
+    """합성 코퍼스로 TM 검색, QA, 섹션 파싱, 전체 파이프라인 성능 측정 (API 호출 없음)"""
+    from benchmark import compare_results, config_mismatch, load_results, run_benchmarks, save_results
+
+    console.print(Panel.fit("📈 성능 벤치마크", style="bold cyan"))
+    results = run_benchmarks(
+        only=list(only), tm_size=tm_size, queries=queries, qa_segments=qa_segments, documents=documents,
+        pipeline_documents=pipeline_documents, llm_latency=llm_latency, seed=seed, repeat=repeat,
+        progress=lambda name: console.print(f"  ⏳ {name} ...")
+    )
+    save_results(results, output)
+
+    for name, metric in results["metrics"].items():
+        console.print(f"  {name}: {metric['value']:g} {metric['unit']}")
+    console.print(f"\n💾 결과 저장: {output}")
+
+    if not baseline:
+        return
+    base = load_results(baseline)
+    mismatch = config_mismatch(base, results)
+    if mismatch:
+        console.print(f"⚠️ 기준 결과와 설정이 다름: {', '.join(mismatch)}", style="yellow")
+
+    console.print(f"\n📊 기준 결과 대비 ({base.get('commit') or baseline}, 임계값 {threshold:.0%})")
+    rows = compare_results(base, results, threshold)
+    for row in rows:
+        mark = '❌' if row['regression'] else '✅'
+        change = f"{row['change']:.1%} 악화" if row['change'] > 0 else f"{-row['change']:.1%} 개선"
+        console.print(f"  {mark} {row['name']}: {row['baseline']:g} → {row['current']:g} {row['unit']} ({change})")
+
+    regressions = [row['name'] for row in rows if row['regression']]
+    if regressions:
+        console.print(f"\n❌ 성능 회귀: {', '.join(regressions)}", style="red")
+        sys.exit(1)
+    console.print("\n✅ 성능 회귀 없음", style="green")
+
+
 @cli.command()
 def version():
     """버전 정보"""
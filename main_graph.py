@@ -1,26 +1,41 @@
+import asyncio
 import click
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
-from src.graph import app
+from src.graph import arun_thread, thread_id_for, thread_history, replay, rerun_review
+from src.section_graph import arun_sections
 from docx import Document
 from pathlib import Path
+from src.docx_stream import read_docx_text, strip_format_tags, write_docx_translation
 
 console = Console()
 
 @click.command()
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('--use-flash-review', is_flag=True, help="Use the faster Gemini Flash model for the review step.")
-def run(input_file, use_flash_review):
+@click.option('--thread-id', default=None, help="Checkpoint thread ID (default: derived from the input text).")
+@click.option('--fresh', is_flag=True, help="Discard the thread's checkpoints and start over.")
+@click.option('--inspect', 'inspect_only', is_flag=True, help="List the thread's checkpoints and exit.")
+@click.option('--replay', 'replay_from', default=None, metavar="CHECKPOINT_ID", help="Re-execute from a stored checkpoint.")
+@click.option('--rerun-review', 'rerun_review_only', is_flag=True, help="Re-run only the reviewer on the stored draft.")
+@click.option('--review-model', default=None, help="Model for the reviewer (e.g. gemini-2.5-flash).")
+@click.option('--sections', 'by_section', is_flag=True, help="Split into sections and translate/review them in parallel.")
+@click.option('--max-concurrency', type=int, default=None, help="Sections processed at the same time with --sections (default: graph.max_concurrency).")
+def run(input_file, use_flash_review, thread_id, fresh, inspect_only, replay_from, rerun_review_only, review_model,
+        by_section, max_concurrency):
     """
     Runs the LangGraph-based patent translation system.
+
+    Every step is checkpointed to data/graph_checkpoints.db, so re-running the same
+    input resumes an interrupted run instead of starting again from analysis.
     """
     console.print(Panel("🚀 [bold blue]Starting Patent-Mind Translation System[/bold blue]"))
 
     input_path = Path(input_file)
     if input_path.suffix.lower() == '.docx':
-        doc = Document(input_file)
-        source_text = '\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
+        # Keep inline formatting as <g1>..</g1> / <x1/> placeholders so it can be restored on save
+        source_text = read_docx_text(input_file, placeholders=True)
     else: # Assume .txt
         with open(input_file, 'r', encoding='utf-8') as f:
             source_text = f.read()
@@ -29,17 +44,58 @@ def run(input_file, use_flash_review):
         console.print("[bold red]Error: Input file is empty or contains no text.[/bold red]")
         return
 
+    if by_section and (inspect_only or replay_from or rerun_review_only):
+        console.print("[bold red]Error: --inspect, --replay and --rerun-review work on whole-document threads only.[/bold red]")
+        return
+
     initial_state = {
         "original_text": source_text,
         "document_type": "claim", # Example, can be made dynamic
         "use_flash_review": use_flash_review,
-        "messages": []
+        "messages": [],
+        "iteration": 0,
+        "needs_human_review": False,
+        "escalation_reason": ""
     }
+    if review_model:
+        initial_state["review_model"] = review_model
+    thread_id = thread_id or thread_id_for(source_text, "sections" if by_section else initial_state["document_type"])
+
+    if inspect_only:
+        for snapshot in thread_history(thread_id):
+            values = snapshot.values
+            console.print(
+                f"[cyan]{snapshot.config['configurable']['checkpoint_id']}[/cyan] "
+                f"step={snapshot.metadata.get('step')} next={', '.join(snapshot.next) or 'END'} "
+                f"analysis={'yes' if values.get('analysis_result') else 'no'} "
+                f"draft={'yes' if values.get('draft_translation') else 'no'} "
+                f"review={values.get('review_result', {}).get('passed') if values.get('review_result') else '-'}"
+            )
+        return
 
     console.print(f"📄 Processing file: {input_file}")
+    console.print(f"🧵 Thread: {thread_id}")
     console.print(f"⚡ Using Flash for review: {'Yes' if use_flash_review else 'No'}")
-    
-    final_state = app.invoke(initial_state)
+
+    def on_update(node_name, update):
+        if node_name == "translate_section":
+            item = update["section_results"][0]
+            console.print(f"  ✅ section {item['section']['unit_id'] or item['seq'] + 1} ({item['source']})")
+        else:
+            console.print(f"  ✅ {node_name}")
+
+    if by_section:
+        console.print("🧩 Section mode: sections are translated and reviewed in parallel")
+        final_state = asyncio.run(arun_sections(source_text, use_flash_review=use_flash_review,
+                                                review_model=review_model, thread_id=thread_id, fresh=fresh,
+                                                max_concurrency=max_concurrency, on_update=on_update))
+    elif rerun_review_only:
+        final_state = rerun_review(thread_id, review_model=review_model,
+                                   use_flash_review=use_flash_review or None)
+    elif replay_from:
+        final_state = replay(thread_id, replay_from)
+    else:
+        final_state = asyncio.run(arun_thread(initial_state, thread_id, fresh=fresh, on_update=on_update))
 
     translation = final_state.get("final_translation")
     if not translation:
@@ -49,21 +105,44 @@ def run(input_file, use_flash_review):
     
     output_path = input_path.with_name(f"{input_path.stem}_translated.docx")
     
-    # Save as .docx
-    new_doc = Document()
-    for line in translation.split('\n'):
-        if line.strip():
-            new_doc.add_paragraph(line)
-    new_doc.save(output_path)
+    # Save as .docx (restore the original formatting when the paragraphs line up)
+    if input_path.suffix.lower() == '.docx' and write_docx_translation(input_file, str(output_path), translation):
+        console.print("🎨 Original formatting preserved.")
+    else:
+        if input_path.suffix.lower() == '.docx':
+            console.print("[yellow]⚠️ Line count differs from the source paragraphs; saving without formatting.[/yellow]")
+        translation = strip_format_tags(translation)
+        new_doc = Document()
+        for line in translation.split('\n'):
+            if line.strip():
+                new_doc.add_paragraph(line)
+        new_doc.save(output_path)
     console.print(f"📄 Translated document saved to: [cyan]{output_path}[/cyan]")
 
     # Also print to console
-    syntax = Syntax(translation, "text", theme="monokai", line_numbers=True)
+    syntax = Syntax(strip_format_tags(translation), "text", theme="monokai", line_numbers=True)
     console.print(Panel(syntax, title="Final Translation", border_style="green"))
 
     review = final_state.get("review_result", {})
+    for item in final_state.get("section_results", []):
+        if not item["review_passed"] and item["source"] != "TM":
+            console.print(f"[yellow]⚠️ Section {item['section']['unit_id'] or item['seq'] + 1}: "
+                          f"{item['escalation_reason'] or 'review failed'}[/yellow]")
     if review:
         console.print(Panel(f"Review Passed: {review.get('passed')}\nFeedback: {review.get('feedback')}", title="QA Review", border_style="cyan"))
+    section_results = final_state.get("section_results", [])
+    if section_results:
+        console.print(f"🧩 Sections: {len(section_results)} "
+                      f"({sum(1 for item in section_results if item['source'] == 'TM')} from TM), "
+                      f"attempts {sum(item['iteration'] for item in section_results)}, "
+                      f"estimated cost ${final_state.get('cost_usd', 0.0):.4f}, LLM time {final_state.get('llm_seconds', 0.0):.1f}s")
+    else:
+        console.print(f"🔁 Attempts: {final_state.get('iteration', 0)} "
+                      f"(last model: {final_state.get('translator_model', '-')}), "
+                      f"estimated cost ${final_state.get('cost_usd', 0.0):.4f}, LLM time {final_state.get('llm_seconds', 0.0):.1f}s")
+    if final_state.get("needs_human_review"):
+        console.print(f"[bold yellow]🧑‍⚖️ Queued for human review: {final_state.get('escalation_reason') or 'see sections above'}[/bold yellow]")
+        console.print("   List pending items with: python main.py jobs --human-review")
 
 if __name__ == "__main__":
     run()
@@ -1,70 +1,264 @@
-from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from .schemas import AgentState, AnalysisResult, ReviewResult
 from .tm_manager import TranslationMemory
+from .job_queue import JobQueue
+from .domain_classifier import DomainClassifier, DEFAULT_MODEL_PATH, guess_domain_by_keywords
+from .llm_clients import get_client
+from .docx_stream import strip_format_tags
+import asyncio
 import json
-from dotenv import load_dotenv
+import threading
+import time
+import yaml
 from pathlib import Path
 
-# Load environment variables from .env file at the earliest point
-load_dotenv()
 
-# Initialize the Gemini models
-llm_pro = ChatGoogleGenerativeAI(model="gemini-2.5-pro")
-llm_flash = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+def load_graph_config() -> dict:
+    """Review-loop settings from the `graph` section of config/api_config.yaml."""
+    config_path = Path(__file__).parent.parent / "config" / "api_config.yaml"
+    config = {}
+    if config_path.exists():
+        config = (yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}).get("graph", {})
+    config.setdefault("escalation", ["gemini-2.5-flash", "gemini-2.5-pro"])
+    config.setdefault("attempts_per_model", 1)
+    config.setdefault("max_seconds", 600)
+    config.setdefault("max_cost_usd", 1.0)
+    config.setdefault("pricing", {})
+    config.setdefault("max_concurrency", 4)
+    return config
+
+
+GRAPH_CONFIG = load_graph_config()
+
+
+def get_llm(model: str):
+    """Chat model by name, created on first use and cached by the client registry."""
+    return get_client("langchain-gemini", model)
+
+
+def escalation_model(iteration: int) -> str:
+    """Translator model for the given attempt (0-based), following the escalation ladder."""
+    ladder = GRAPH_CONFIG["escalation"]
+    return ladder[min(iteration // GRAPH_CONFIG["attempts_per_model"], len(ladder) - 1)]
+
+
+def budget_exceeded(state: AgentState) -> str:
+    """Reason to stop retranslating (empty string if another attempt is allowed)."""
+    max_iterations = len(GRAPH_CONFIG["escalation"]) * GRAPH_CONFIG["attempts_per_model"]
+    if state.get("iteration", 0) >= max_iterations:
+        return f"review failed after {state.get('iteration', 0)} attempts ({' -> '.join(GRAPH_CONFIG['escalation'])})"
+    if state.get("cost_usd", 0.0) >= GRAPH_CONFIG["max_cost_usd"]:
+        return f"cost budget exhausted (${state.get('cost_usd', 0.0):.3f} >= ${GRAPH_CONFIG['max_cost_usd']})"
+    if state.get("llm_seconds", 0.0) >= GRAPH_CONFIG["max_seconds"]:
+        return f"time budget exhausted ({state.get('llm_seconds', 0.0):.0f}s >= {GRAPH_CONFIG['max_seconds']}s)"
+    return ""
+
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+REVIEWER_USER_TEMPLATE = """**Original English:**
+`{original_text}`
+
+**Korean Translation:**
+`{draft_translation}`
+
+**Terminology Map Used:**
+`{analysis_result}`"""
+
+
+def _build_analyst(template: str):
+    return (ChatPromptTemplate.from_messages([("system", template), ("user", "{original_text}")]),
+            JsonOutputParser(pydantic_object=AnalysisResult))
+
+
+def _build_translator(template: str):
+    return ChatPromptTemplate.from_template(template), None
+
+
+def _build_reviewer(template: str):
+    return (ChatPromptTemplate.from_messages([("system", template), ("user", REVIEWER_USER_TEMPLATE)]),
+            JsonOutputParser(pydantic_object=ReviewResult))
+
+
+# Chain name -> (prompt file in prompts/, builder returning (prompt, output parser or None))
+CHAIN_SPECS = {
+    "analyst": ("analyst.prompt", _build_analyst),
+    "translator": ("translator.prompt", _build_translator),
+    "reviewer": ("reviewer.prompt", _build_reviewer),
+}
+
+
+class CompiledChain:
+    """A prompt file compiled once: the prompt template (format instructions pre-filled),
+    its output parser, and one prompt | model runnable per model."""
+
+    def __init__(self, name: str, version: tuple, prompt: ChatPromptTemplate, parser=None):
+        self.name = name
+        self.version = version
+        self.parser = parser
+        if parser is not None and "format_instructions" in prompt.input_variables:
+            prompt = prompt.partial(format_instructions=parser.get_format_instructions())
+        self.prompt = prompt
+        self._runnables = {}
+
+    def runnable(self, model: str):
+        llm = get_llm(model)
+        runnable = self._runnables.get(model)
+        # Rebuilt if the client registry handed out a new client for the model
+        if runnable is None or runnable.last is not llm:
+            runnable = self._runnables[model] = self.prompt | llm
+        return runnable
+
+
+_chains = {}
+_chains_lock = threading.Lock()
+
+
+def get_chain(name: str) -> CompiledChain:
+    """Compiled chain for a prompt; recompiled when its prompts/ file changes (mtime/size),
+    so prompt edits apply to a running server without a restart."""
+    filename, builder = CHAIN_SPECS[name]
+    path = PROMPTS_DIR / filename
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    chain = _chains.get(name)
+    if chain is None or chain.version != version:
+        with _chains_lock:
+            chain = _chains.get(name)
+            if chain is None or chain.version != version:
+                prompt, parser = builder(path.read_text(encoding="utf-8"))
+                chain = _chains[name] = CompiledChain(name, version, prompt, parser)
+    return chain
+
+
+def invoke_llm(chain: CompiledChain, model: str, inputs: dict):
+    """Run the chain's prompt | model and return (message, usage increments for the state)."""
+    start = time.perf_counter()
+    message = chain.runnable(model).invoke(inputs)
+    seconds = time.perf_counter() - start
+    return message, _usage_increments(message, model, seconds)
+
+
+async def ainvoke_llm(chain: CompiledChain, model: str, inputs: dict):
+    """Async invoke_llm: awaits the API call instead of blocking a thread."""
+    start = time.perf_counter()
+    message = await chain.runnable(model).ainvoke(inputs)
+    seconds = time.perf_counter() - start
+    return message, _usage_increments(message, model, seconds)
+
+
+def _usage_increments(message, model: str, seconds: float) -> dict:
+    usage = getattr(message, "usage_metadata", None) or {}
+    price = GRAPH_CONFIG["pricing"].get(model, {})
+    cost = (usage.get("input_tokens", 0) * price.get("input", 0.0)
+            + usage.get("output_tokens", 0) * price.get("output", 0.0)) / 1_000_000
+    return {"cost_usd": cost, "llm_seconds": seconds}
+
+
+def _analyst_request(state: AgentState):
+    """Chain, model and inputs for the analyst call."""
+    return get_chain("analyst"), "gemini-2.5-pro", {"original_text": strip_format_tags(state["original_text"])}
 
-def load_prompt(filename: str) -> PromptTemplate:
-    """Loads a prompt template from a file."""
-    prompt_path = Path(__file__).parent.parent / "prompts" / filename
-    return PromptTemplate.from_template(prompt_path.read_text(encoding="utf-8"))
 
 def analyst_node(state: AgentState):
     """
     Analyzes the source text to extract domain and key terminology.
     """
     print("--- Running Analyst Node ---")
-    parser = JsonOutputParser(pydantic_object=AnalysisResult)
+    chain, model, inputs = _analyst_request(state)
+    message, usage = invoke_llm(chain, model, inputs)
+    result = chain.parser.invoke(message)
     
-    system_prompt_template = load_prompt("analyst.prompt")
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt_template.template),
-        ("user", "{original_text}"),
-    ])
-    
-    chain = prompt | llm_pro | parser
-    result = chain.invoke({
-        "original_text": state["original_text"],
-        "format_instructions": parser.get_format_instructions(),
-    })
+    return {"analysis_result": result, **usage}
+
+
+async def aanalyst_node(state: AgentState):
+    """Async analyst_node."""
+    print("--- Running Analyst Node ---")
+    chain, model, inputs = _analyst_request(state)
+    message, usage = await ainvoke_llm(chain, model, inputs)
+    result = await chain.parser.ainvoke(message)
     
-    return {"analysis_result": result}
+    return {"analysis_result": result, **usage}
 
 
-def translator_node(state: AgentState):
-    """
-    Translates the source text based on the analysis.
-    """
-    print("--- Running Translator Node ---")
+def _translator_request(state: AgentState):
+    """Chain, model and inputs for the translator call (model follows the escalation ladder)."""
+    iteration = state.get("iteration", 0)
+    model = escalation_model(iteration)
+    print(f"--- Running Translator Node (attempt {iteration + 1}, {model}) ---")
     
     analysis = state["analysis_result"]
     domain = analysis.get("domain", "general technology")
     term_mapping = analysis.get("term_mapping", {})
+
+    # On a retry, tell the model what the reviewer rejected in the previous draft
+    review_feedback = ""
+    review = state.get("review_result")
+    if iteration and review and not review.get("passed"):
+        review_feedback = (
+            "\n---\n### **PREVIOUS ATTEMPT REJECTED (MUST FIX)**\n"
+            f"The reviewer rejected this draft:\n`{state.get('draft_translation', '')}`\n\n"
+            f"Reviewer feedback:\n{review.get('feedback', '')}\n"
+        )
     
-    system_prompt_template = load_prompt("translator.prompt")
-    
-    prompt = ChatPromptTemplate.from_template(system_prompt_template.template)
+    # Similar past translations found by the fuzzy TM search
+    tm_references = ""
+    if state.get("tm_suggestions"):
+        tm_references = "\n---\n### **SIMILAR PAST TRANSLATIONS (REFERENCE ONLY)**\n" + "\n".join(
+            f"- ({match['similarity']:.0%}) `{match['source']}` -> `{match['target']}`"
+            for match in state["tm_suggestions"]
+        ) + "\n"
     
-    chain = prompt | llm_pro
-    result = chain.invoke({
+    return get_chain("translator"), model, {
+        "tm_references": tm_references,
         "document_type": state.get("document_type", "claim"),
         "domain": domain,
         "term_mapping": json.dumps(term_mapping, ensure_ascii=False, indent=2),
         "original_text": state["original_text"],
-    })
+        "review_feedback": review_feedback,
+    }
+
+
+def _translator_update(state: AgentState, model: str, result, usage: dict) -> dict:
+    return {
+        "draft_translation": result.content,
+        "iteration": state.get("iteration", 0) + 1,
+        "translator_model": model,
+        **usage
+    }
+
+
+def translator_node(state: AgentState):
+    """
+    Translates the source text based on the analysis.
+    """
+    chain, model, inputs = _translator_request(state)
+    result, usage = invoke_llm(chain, model, inputs)
+    return _translator_update(state, model, result, usage)
+
+
+async def atranslator_node(state: AgentState):
+    """Async translator_node."""
+    chain, model, inputs = _translator_request(state)
+    result, usage = await ainvoke_llm(chain, model, inputs)
+    return _translator_update(state, model, result, usage)
+
+
+def _reviewer_request(state: AgentState):
+    """Chain, model and inputs for the reviewer call."""
+    if state.get("review_model"):
+        reviewer_model = state["review_model"]
+    else:
+        reviewer_model = "gemini-2.5-flash" if state.get("use_flash_review") else "gemini-2.5-pro"
     
-    return {"draft_translation": result.content}
+    return get_chain("reviewer"), reviewer_model, {
+        "original_text": state["original_text"],
+        "draft_translation": state["draft_translation"],
+        "analysis_result": json.dumps(state["analysis_result"], ensure_ascii=False, indent=2),
+    }
 
 
 def reviewer_node(state: AgentState):
@@ -72,55 +266,77 @@ def reviewer_node(state: AgentState):
     Reviews the translated text for errors and consistency.
     """
     print("--- Running Reviewer Node ---")
-    parser = JsonOutputParser(pydantic_object=ReviewResult)
+    chain, model, inputs = _reviewer_request(state)
+    message, usage = invoke_llm(chain, model, inputs)
+    result = chain.parser.invoke(message)
     
-    reviewer_llm = llm_flash if state.get("use_flash_review") else llm_pro
+    return {"review_result": result, **usage}
+
+
+async def areviewer_node(state: AgentState):
+    """Async reviewer_node."""
+    print("--- Running Reviewer Node ---")
+    chain, model, inputs = _reviewer_request(state)
+    message, usage = await ainvoke_llm(chain, model, inputs)
+    result = await chain.parser.ainvoke(message)
     
-    system_prompt_template = load_prompt("reviewer.prompt")
+    return {"review_result": result, **usage}
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt_template.template),
-        ("user", """**Original English:**
-`{original_text}`
+_domain_classifier = None
 
-**Korean Translation:**
-`{draft_translation}`
 
-**Terminology Map Used:**
-`{analysis_result}`"""),
-    ])
-    
-    chain = prompt | reviewer_llm | parser
-    result = chain.invoke({
-        "original_text": state["original_text"],
-        "draft_translation": state["draft_translation"],
-        "analysis_result": json.dumps(state["analysis_result"], ensure_ascii=False, indent=2),
-        "format_instructions": parser.get_format_instructions(),
-    })
-    
-    return {"review_result": result}
+def guess_domain(text: str, confidence_threshold: float = 0.6) -> str:
+    """Local domain guess (trained classifier if available, else keywords) - no API call."""
+    global _domain_classifier
+    if _domain_classifier is None and Path(DEFAULT_MODEL_PATH).exists():
+        _domain_classifier = DomainClassifier.load(DEFAULT_MODEL_PATH)
+    if _domain_classifier is not None:
+        domain, confidence = _domain_classifier.predict(text)
+        if confidence >= confidence_threshold:
+            return domain
+    return guess_domain_by_keywords(text)[0]
+
 
-def tm_search_node(state: AgentState):
+def triage_node(state: AgentState):
     """
-    Searches the Translation Memory for existing translations.
+    Cheap first step: local domain guess and exact TM lookup (no LLM call).
     """
-    print("--- Running TM Search Node ---")
+    print("--- Running Triage Node ---")
+    # Word formatting placeholders (<g1>..</g1>, <x1/>) are only for the translator prompt and the .docx output
+    source = strip_format_tags(state["original_text"])
+    domain = guess_domain(source)
+
     tm = TranslationMemory()
-    analysis = state["analysis_result"]
-    domain = analysis.get("domain", "general")
-    
-    matches = tm.search(state["original_text"], domain=domain, similarity_threshold=1.0)
-    tm.close()
-    
-    if matches and matches[0]["similarity"] == 1.0:
-        print(f"--- Found 100% match in TM. Skipping translation. ---")
+    try:
+        match = tm.get_exact(source)
+    finally:
+        tm.close()
+
+    if match:
+        print("--- Found 100% match in TM. Skipping analysis and translation. ---")
         return {
-            "final_translation": matches[0]["target"],
+            "domain_guess": domain,
+            "final_translation": match["target"],
             "tm_match_found": True
         }
-    else:
-        print("--- No exact match found in TM. Proceeding to translation. ---")
-        return {"tm_match_found": False}
+    print(f"--- No exact TM match (domain guess: {domain}). Running analysis and fuzzy TM search. ---")
+    return {"domain_guess": domain, "tm_match_found": False}
+
+
+def tm_fuzzy_node(state: AgentState):
+    """
+    Retrieves similar TM entries as translation references (runs alongside the analyst).
+    """
+    print("--- Running Fuzzy TM Search Node ---")
+    tm = TranslationMemory()
+    try:
+        matches = tm.search(strip_format_tags(state["original_text"]), domain=state.get("domain_guess"),
+                            similarity_threshold=0.7, max_results=3)
+    finally:
+        tm.close()
+    print(f"--- Found {len(matches)} similar TM entries. ---")
+    return {"tm_suggestions": matches}
+
 
 def tm_save_node(state: AgentState):
     """
@@ -135,8 +351,8 @@ def tm_save_node(state: AgentState):
         domain = analysis.get("domain", "general")
         
         tm.add(
-            source=state["original_text"],
-            target=state["draft_translation"],
+            source=strip_format_tags(state["original_text"]),
+            target=strip_format_tags(state["draft_translation"]),
             domain=domain,
             document_type=state.get("document_type", "claim"),
             quality_score=10 # Assuming perfect score after passing review
@@ -148,3 +364,54 @@ def tm_save_node(state: AgentState):
     # This node doesn't modify the main state path, just performs an action.
     # We set final_translation here if it came from the translator path.
     return {"final_translation": state.get("draft_translation")}
+
+
+def human_review_node(state: AgentState, config):
+    """
+    Stops the review loop and queues the latest draft for a human reviewer.
+    """
+    reason = budget_exceeded(state) or "review failed"
+    print(f"--- Escalating to human review: {reason} ---")
+
+    queue = JobQueue()
+    try:
+        queue.add_human_review(
+            thread_id=config.get("configurable", {}).get("thread_id", ""),
+            source_text=state["original_text"],
+            translation=state.get("draft_translation", ""),
+            feedback=(state.get("review_result") or {}).get("feedback", ""),
+            reason=reason,
+            meta={
+                "iterations": state.get("iteration", 0),
+                "translator_model": state.get("translator_model"),
+                "cost_usd": state.get("cost_usd", 0.0),
+                "llm_seconds": state.get("llm_seconds", 0.0),
+            }
+        )
+    finally:
+        queue.close()
+
+    # The unapproved draft is returned as the result but never saved to TM
+    return {
+        "final_translation": state.get("draft_translation"),
+        "needs_human_review": True,
+        "escalation_reason": reason
+    }
+
+
+# Async variants of the local (TM / job queue) nodes: SQLite and the domain classifier are
+# synchronous, so they run in a worker thread and the event loop stays free for LLM calls.
+async def atriage_node(state: AgentState):
+    return await asyncio.to_thread(triage_node, state)
+
+
+async def atm_fuzzy_node(state: AgentState):
+    return await asyncio.to_thread(tm_fuzzy_node, state)
+
+
+async def atm_save_node(state: AgentState):
+    return await asyncio.to_thread(tm_save_node, state)
+
+
+async def ahuman_review_node(state: AgentState, config):
+    return await asyncio.to_thread(human_review_node, state, config)
@@ -7,15 +7,14 @@
 
 import re
 import json
-import os
 import yaml
 from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import Counter
-import google.generativeai as genai
-from dotenv import load_dotenv
 
-load_dotenv()
+from domain_classifier import DomainClassifier, DEFAULT_MODEL_PATH, guess_domain_by_keywords
+from llm_clients import check_credentials, generation_config, get_client
+from logger import record_tokens, span
 
 
 class DocumentAnalyzer:
@@ -23,44 +22,63 @@ class DocumentAnalyzer:
 
     def __init__(self, 
                  terminology_path: str = "config/terminology.json",
-                 api_config_path: str = "config/api_config.yaml"):
+                 api_config_path: str = "config/api_config.yaml",
+                 classifier_path: str = DEFAULT_MODEL_PATH,
+                 domain_confidence_threshold: float = 0.6):
         self.terminology_path = Path(terminology_path)
         self.terminology = self._load_terminology()
 
-        # API 키 및 모델 설정
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY 환경 변수를 설정해야 합니다.")
-        genai.configure(api_key=api_key)
+        # 로컬 도메인 분류기 (학습된 모델이 있을 때만 사용)
+        self.domain_classifier = self._load_domain_classifier(classifier_path)
+        self.domain_confidence_threshold = domain_confidence_threshold
+
+        # LLM 백엔드 자격 증명 확인 및 모델 설정
+        check_credentials()
 
         with open(api_config_path, 'r', encoding='utf-8') as f:
             api_config = yaml.safe_load(f)
         
         google_config = api_config.get("google", {})
-        model_name = google_config.get("model", "gemini-2.5-flash")
+        self.model_name = google_config.get("model", "gemini-2.5-flash")
         
-        self.model = genai.GenerativeModel(model_name)
-        self.generation_config = genai.types.GenerationConfig(
+        self.generation_config = generation_config(
             max_output_tokens=google_config.get("max_output_tokens", 8192),
             temperature=google_config.get("temperature", 0.0)
         )
 
+    @property
+    def model(self):
+        """분석용 GenerativeModel (AI 분석을 처음 요청할 때 생성)"""
+        return get_client("gemini", self.model_name)
+
     def _load_terminology(self) -> Dict:
         """용어집 로드"""
         with open(self.terminology_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def _load_domain_classifier(self, classifier_path: str):
+        """학습된 도메인 분류기 로드 (없으면 None)"""
+        if not classifier_path or not Path(classifier_path).exists():
+            return None
+        try:
+            return DomainClassifier.load(classifier_path)
+        except Exception as e:
+            print(f"도메인 분류기 로드 오류: {e}")
+            return None
+
+    def identify_domain_with_confidence(self, text: str) -> Tuple[str, float, str]:
+        """기술 분야 식별 (도메인, 신뢰도, 식별 방법)"""
+        if self.domain_classifier is not None:
+            domain, confidence = self.domain_classifier.predict(text)
+            if confidence >= self.domain_confidence_threshold:
+                return domain, confidence, "classifier"
+
+        domain, confidence = guess_domain_by_keywords(text)
+        return domain, confidence, "keywords"
+
     def identify_domain(self, text: str) -> str:
         """기술 분야 식별"""
-        domain_keywords = {
-            "electronics_semiconductor": ["substrate", "layer", "semiconductor", "wafer", "transistor", "chip", "circuit"],
-            "chemistry_pharma": ["compound", "molecule", "pharmaceutical", "drug", "synthesis", "reaction", "chemical"],
-            "mechanical": ["distal", "proximal", "apparatus", "device", "mechanical", "housing"],
-            "biotech": ["protein", "cell", "antibody", "gene", "DNA", "RNA", "biological"]
-        }
-        text_lower = text.lower()
-        scores = {domain: sum(1 for kw in keywords if kw in text_lower) for domain, keywords in domain_keywords.items()}
-        return max(scores, key=scores.get) if max(scores.values()) > 0 else "general"
+        return self.identify_domain_with_confidence(text)[0]
 
     def extract_technical_terms(self, text: str, top_n: int = 20) -> List[Tuple[str, int]]:
         """핵심 기술 용어 추출"""
@@ -114,7 +132,12 @@ Example JSON structure:
 }}
 """
         try:
-            response = self.model.generate_content(prompt, generation_config=self.generation_config)
+            with span("llm_call", model=self.model_name, purpose="analysis", stream=False):
+                response = self.model.generate_content(prompt, generation_config=self.generation_config)
+                usage = getattr(response, "usage_metadata", None)
+                if usage is not None:
+                    record_tokens(getattr(usage, "prompt_token_count", 0) or 0,
+                                  getattr(usage, "candidates_token_count", 0) or 0)
             # Gemini 응답에서 JSON만 정리하여 추출
             clean_json_str = re.search(r'\{.*\}', response.text, re.DOTALL)
             if clean_json_str:
@@ -127,8 +150,8 @@ Example JSON structure:
     def analyze(self, text: str, use_ai: bool = True) -> Dict:
         """전체 문서 분석"""
         print("📊 문서 분석 중...")
-        domain = self.identify_domain(text)
-        print(f"   ✓ 도메인 식별: {domain}")
+        domain, domain_confidence, domain_method = self.identify_domain_with_confidence(text)
+        print(f"   ✓ 도메인 식별: {domain} (신뢰도: {domain_confidence:.0%}, {domain_method})")
         technical_terms = self.extract_technical_terms(text)
         print(f"   ✓ 기술 용어 추출: {len(technical_terms)}개")
         patterns = self.identify_patterns(text)
@@ -143,7 +166,8 @@ Example JSON structure:
         term_mapping = self._build_term_mapping(technical_terms, domain, ai_analysis)
         
         result = {
-            "domain": domain, "technical_terms": technical_terms, "patterns": patterns,
+            "domain": domain, "domain_confidence": domain_confidence, "domain_method": domain_method,
+            "technical_terms": technical_terms, "patterns": patterns,
             "ai_analysis": ai_analysis, "term_mapping": term_mapping
         }
         print("✅ 문서 분석 완료\n")
@@ -0,0 +1,248 @@
+"""
+디렉토리/글롭 일괄 번역
+- 입력 파일 읽기(.docx/.txt)와 출력 파일 쓰기는 프로세스 풀(spawn)에서 실행
+- PDF 추출은 프로세스 전역 추출 서비스(하나의 docling 변환기와 캐시)를 사용하도록 스레드에서 실행
+- 번역(LLM 호출)은 asyncio로 동시 실행, 전역 동시 실행 수와 분당 요청 수 제한
+- 출력이 입력보다 최신이면 건너뜀
+- 처리량 요약 (문서/분, 토큰/분, TM 적중률)
+"""
+
+import asyncio
+import glob
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SUPPORTED_EXTENSIONS = ('.txt', '.docx', '.pdf')
+
+
+class RateLimiter:
+    """분당 요청 수 제한 (요청 간격을 균등하게 배분, 스레드 안전)"""
+
+    def __init__(self, requests_per_minute: float):
+        if requests_per_minute <= 0:
+            raise ValueError(f"분당 요청 수는 0보다 커야 합니다: {requests_per_minute}")
+        self.interval = 60.0 / requests_per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """다음 요청 가능 시각까지 대기"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+@dataclass
+class BatchJob:
+    """일괄 번역 대상 문서"""
+    input_path: Path
+    output_path: Path
+    status: str = "pending"  # pending / skipped / done / failed
+    source: str = ""  # 번역 출처 ("TM" 또는 LLM)
+    qa_passed: Optional[bool] = None
+    formatted: bool = False
+    error: str = ""
+    seconds: float = 0.0
+
+
+@dataclass
+class BatchSummary:
+    """일괄 번역 처리량 요약"""
+    jobs: List[BatchJob] = field(default_factory=list)
+    elapsed: float = 0.0
+    token_usage: Dict[str, int] = field(default_factory=dict)
+
+    def count(self, status: str) -> int:
+        return sum(1 for job in self.jobs if job.status == status)
+
+    @property
+    def docs_per_min(self) -> float:
+        return self.count("done") / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def tokens_per_min(self) -> float:
+        tokens = self.token_usage.get("prompt_tokens", 0) + self.token_usage.get("output_tokens", 0)
+        return tokens / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def tm_hit_rate(self) -> float:
+        done = [job for job in self.jobs if job.status == "done"]
+        return sum(1 for job in done if job.source == "TM") / len(done) if done else 0.0
+
+
+def discover_inputs(pattern: str, recursive: bool = False) -> List[Path]:
+    """디렉토리 또는 글롭 패턴에서 지원 형식의 입력 파일 목록 (정렬)"""
+    path = Path(pattern)
+    if path.is_dir():
+        candidates = path.rglob('*') if recursive else path.glob('*')
+    else:
+        candidates = (Path(p) for p in glob.glob(pattern, recursive=recursive))
+
+    return sorted(
+        p for p in candidates
+        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+        and not p.name.startswith('~$')  # Word 임시 파일
+    )
+
+
+def output_path_for(input_path: Path, output_dir: Path, output_ext: Optional[str] = None,
+                    base_dir: Optional[Path] = None) -> Path:
+    """입력 파일의 출력 경로 (base_dir 기준 상대 경로 유지, 기본 확장자: .docx 입력은 .docx, 그 외 .txt)"""
+    ext = output_ext or ('.docx' if input_path.suffix.lower() == '.docx' else '.txt')
+    relative = input_path.relative_to(base_dir) if base_dir else Path(input_path.name)
+    return output_dir / relative.parent / f"{input_path.stem}_ko{ext}"
+
+
+def is_up_to_date(input_path: Path, output_path: Path) -> bool:
+    """출력 파일이 입력 파일보다 최신인지 여부"""
+    return output_path.exists() and output_path.stat().st_mtime >= input_path.stat().st_mtime
+
+
+def load_source(input_path: str, placeholders: bool = True) -> str:
+    """워커: 입력 파일 텍스트 추출 (.docx는 서식 자리표시자 포함)
+
+    .pdf는 get_extraction_service()의 변환기를 재사용하도록 메인 프로세스의 스레드에서 호출한다.
+    """
+    ext = Path(input_path).suffix.lower()
+    if ext == '.docx':
+        from docx_stream import read_docx_text
+        return read_docx_text(input_path, placeholders=placeholders)
+    if ext == '.pdf':
+        from pdf_extractor import get_extraction_service
+        return get_extraction_service().extract(input_path)
+    with open(input_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def write_output(input_path: str, output_path: str, translation: str,
+                 qa_report: Optional[str] = None) -> bool:
+    """워커: 번역 결과 저장. .docx → .docx는 원본 서식 유지. Returns: 원본 서식 유지 여부"""
+    from docx_stream import strip_format_tags, write_docx_translation
+
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    formatted = False
+    if output.suffix.lower() == '.docx':
+        if Path(input_path).suffix.lower() == '.docx':
+            formatted = write_docx_translation(input_path, output_path, translation)
+        if not formatted:
+            from docx import Document
+            doc = Document()
+            for line in strip_format_tags(translation).split('\n'):
+                if line.strip():
+                    doc.add_paragraph(line)
+            doc.save(output_path)
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(strip_format_tags(translation))
+
+    if qa_report is not None:
+        with open(output.with_suffix('.qa.txt'), 'w', encoding='utf-8') as f:
+            f.write(qa_report)
+    return formatted
+
+
+class BatchTranslator:
+    """일괄 번역 실행기
+
+    하나의 TranslationPipeline을 공유하여 모듈 임포트와 초기화를 한 번만 수행한다.
+    파이프라인 내부의 QA는 세그먼트 캐시를 사용하므로 번역 스레드에서 그대로 실행한다.
+    """
+
+    def __init__(self, pipeline, concurrency: int = 4, requests_per_minute: Optional[float] = None,
+                 workers: Optional[int] = None):
+        """
+        Args:
+            pipeline: TranslationPipeline
+            concurrency: 동시에 번역할 최대 문서 수 (전역)
+            requests_per_minute: LLM 분당 최대 요청 수 (None이면 제한 없음)
+            workers: .docx/.txt 읽기와 출력 쓰기 프로세스 수 (기본: CPU 수)
+        """
+        if concurrency < 1:
+            raise ValueError(f"동시 실행 수는 1 이상이어야 합니다: {concurrency}")
+        self.pipeline = pipeline
+        self.concurrency = concurrency
+        self.workers = workers
+        if requests_per_minute:
+            pipeline.translator.rate_limiter = RateLimiter(requests_per_minute)
+
+    def plan(self, inputs: List[Path], output_dir: Path, output_ext: Optional[str] = None,
+             base_dir: Optional[Path] = None, force: bool = False) -> List[BatchJob]:
+        """작업 목록 생성 (최신 출력이 있으면 skipped)"""
+        jobs = []
+        for input_path in inputs:
+            job = BatchJob(input_path, output_path_for(input_path, output_dir, output_ext, base_dir))
+            if not force and is_up_to_date(input_path, job.output_path):
+                job.status = "skipped"
+            jobs.append(job)
+        return jobs
+
+    def run(self, jobs: List[BatchJob], translate_kwargs: Optional[Dict] = None,
+            progress_callback: Optional[Callable[[BatchJob], None]] = None) -> BatchSummary:
+        """작업 실행. 각 문서가 끝날 때마다 progress_callback(job) 호출"""
+        usage_before = dict(self.pipeline.translator.token_usage)
+        start = time.perf_counter()
+        asyncio.run(self._run(jobs, translate_kwargs or {}, progress_callback))
+        elapsed = time.perf_counter() - start
+
+        usage_after = self.pipeline.translator.token_usage
+        token_usage = {key: usage_after[key] - usage_before.get(key, 0) for key in usage_after}
+        return BatchSummary(jobs=jobs, elapsed=elapsed, token_usage=token_usage)
+
+    async def _run(self, jobs: List[BatchJob], translate_kwargs: Dict,
+                   progress_callback: Optional[Callable[[BatchJob], None]]):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # 미리 읽어 둘 문서 수 제한 (번역 대기 중인 원문이 메모리에 쌓이지 않도록)
+        in_flight = asyncio.Semaphore(self.concurrency * 2)
+
+        # 번역 스레드가 실행 중일 때 워커가 필요에 따라 생성되므로 fork 대신 spawn으로 시작
+        # PDF 추출은 프로세스 전역 변환기를 공유하고 변환기 잠금으로 직렬화되므로 스레드 하나로 실행
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as processes, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as threads, \
+                ThreadPoolExecutor(max_workers=1) as extractor:
+
+            async def process(job: BatchJob):
+                async with in_flight:
+                    started = time.perf_counter()
+                    try:
+                        await translate_job(job)
+                        job.status = "done"
+                    except Exception as e:
+                        job.status = "failed"
+                        job.error = str(e)
+                    job.seconds = time.perf_counter() - started
+                if progress_callback:
+                    progress_callback(job)
+
+            async def translate_job(job: BatchJob):
+                reader = extractor if job.input_path.suffix.lower() == '.pdf' else processes
+                source_text = await loop.run_in_executor(reader, load_source, str(job.input_path))
+                if not source_text.strip():
+                    raise ValueError("입력 파일에 텍스트가 없습니다")
+
+                async with semaphore:
+                    result = await loop.run_in_executor(
+                        threads, lambda: self.pipeline.translate_document(source_text=source_text,
+                                                                          **translate_kwargs))
+                if not result["success"]:
+                    raise RuntimeError(result.get("error") or "번역 실패")
+
+                qa_report = None
+                if "qa_result" in result:
+                    job.qa_passed = result["qa_result"]["passed"]
+                    qa_report = self.pipeline.qa_checker.generate_report(result["qa_result"])
+                job.formatted = await loop.run_in_executor(
+                    processes, write_output, str(job.input_path), str(job.output_path),
+                    result["translation"], qa_report)
+                job.source = result.get("source", "")
+
+            await asyncio.gather(*(process(job) for job in jobs if job.status == "pending"))
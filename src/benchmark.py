@@ -0,0 +1,390 @@
+"""
+성능 벤치마크
+- 합성 특허 코퍼스 생성 (청구항, 명세서, 지정 크기의 TM)
+- TranslationMemory.search 지연 시간 백분위수
+- PatentQAChecker.check_all 처리량
+- PatentSectionParser.parse_document 속도
+- TranslationPipeline.translate_document 소요 시간 (FakeBackend, API 호출 없음)
+- 결과는 JSON으로 저장하여 커밋 간 비교, 기준 결과보다 임계값 이상 느려지면 회귀로 보고
+"""
+
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+RESULT_VERSION = 1
+BENCHMARKS = ("tm", "qa", "parse", "pipeline")
+
+_DEVICES = ["semiconductor device", "display apparatus", "battery module", "sensor assembly",
+            "wireless terminal", "image processing apparatus", "light emitting device", "memory system"]
+_PARTS = ["substrate", "gate electrode", "insulating layer", "housing", "controller", "antenna",
+          "electrode", "cathode", "anode", "separator", "lens", "light source", "processor",
+          "memory cell", "channel layer", "conductive pattern", "sealing member", "support frame"]
+_RELATIONS = ["disposed on", "coupled to", "spaced apart from", "overlapping", "in contact with",
+              "electrically connected to", "surrounding", "adjacent to"]
+_PROPERTIES = ["a thickness of 10 nm to 200 nm", "a width greater than that of the {part}",
+               "a refractive index of 1.5 or more", "a temperature of 25 °C to 80 °C",
+               "a content of 5 wt% or less", "a plurality of openings"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """선형 보간 백분위수 (pct: 0~100)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def _a(noun: str, capital: bool = False) -> str:
+    article = "an" if noun[0] in "aeiou" else "a"
+    return f"{article.capitalize() if capital else article} {noun}"
+
+
+class CorpusGenerator:
+    """합성 특허 코퍼스 (같은 seed면 같은 코퍼스)"""
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+
+    def _part(self) -> str:
+        return self.rng.choice(_PARTS)
+
+    def _clause(self) -> str:
+        part, other = self.rng.sample(_PARTS, 2)
+        if self.rng.random() < 0.5:
+            return f"the {part} is {self.rng.choice(_RELATIONS)} the {other}"
+        return f"the {part} has " + self.rng.choice(_PROPERTIES).format(part=other)
+
+    def claims(self, count: int) -> List[str]:
+        """독립항 1개(이후 약 5개마다 하나 더)와 종속항들"""
+        claims = []
+        independent = 1
+        device = self.rng.choice(_DEVICES)
+        for number in range(1, count + 1):
+            if number == 1 or self.rng.random() < 0.2:
+                independent = number
+                device = self.rng.choice(_DEVICES)
+                parts = self.rng.sample(_PARTS, 3)
+                claims.append(
+                    f"{number}. {_a(device, True)} comprising:\n"
+                    f"{_a(parts[0])};\n"
+                    f"{_a(parts[1])} {self.rng.choice(_RELATIONS)} the {parts[0]}; and\n"
+                    f"{_a(parts[2])} {self.rng.choice(_RELATIONS)} the {parts[1]},\n"
+                    f"wherein {self._clause()}."
+                )
+            else:
+                cited = self.rng.randint(independent, number - 1)
+                claims.append(f"{number}. The {device} of claim {cited}, wherein {self._clause()}.")
+        return claims
+
+    def paragraph(self, sentences: int = 4) -> str:
+        text = []
+        for _ in range(sentences):
+            part = self._part()
+            text.append(f"In some embodiments, {self._clause()}, and the {part} "
+                        f"{self.rng.randint(100, 999)} may be formed by a deposition process.")
+        return " ".join(text)
+
+    def specification(self, paragraphs: int) -> str:
+        """헤더와 [0001] 문단 번호가 있는 명세서 본문"""
+        headings = ["TECHNICAL FIELD", "BACKGROUND", "SUMMARY", "BRIEF DESCRIPTION OF THE DRAWINGS",
+                    "DETAILED DESCRIPTION"]
+        per_heading = max(1, paragraphs // len(headings))
+        lines = []
+        number = 0
+        for index, heading in enumerate(headings):
+            lines.append(heading)
+            count = per_heading if index < len(headings) - 1 else max(1, paragraphs - number)
+            for _ in range(count):
+                number += 1
+                if heading.startswith("BRIEF"):
+                    lines.append(f"[{number:04d}] FIG. {number} is a cross-sectional view of the "
+                                 f"{self.rng.choice(_DEVICES)} according to an embodiment.")
+                else:
+                    lines.append(f"[{number:04d}] {self.paragraph(self.rng.randint(2, 5))}")
+                if number >= paragraphs:
+                    break
+            lines.append("")
+        return "\n".join(lines)
+
+    def document(self, claims: int = 10, paragraphs: int = 20) -> str:
+        """제목, 요약, 명세서, 청구범위로 구성된 문서"""
+        device = self.rng.choice(_DEVICES)
+        return "\n".join([
+            "TITLE OF THE INVENTION",
+            f"{device.upper()} AND METHOD OF MANUFACTURING THE SAME",
+            "",
+            "ABSTRACT",
+            f"{_a(device, True)} includes {self._clause()}. {self.paragraph(2)}",
+            "",
+            self.specification(paragraphs),
+            "CLAIMS",
+            "\n".join(self.claims(claims)),
+        ])
+
+    def tm_entries(self, size: int) -> List[Tuple[str, str]]:
+        """(원문, 번역) 쌍 - 원문은 청구항/문단 문장"""
+        from llm_backends import pseudo_translate
+        entries = []
+        seen = set()
+        while len(entries) < size:
+            if self.rng.random() < 0.5:
+                source = self.claims(self.rng.randint(1, 3))[-1]
+            else:
+                source = self.paragraph(self.rng.randint(1, 2))
+            if source not in seen:
+                seen.add(source)
+                entries.append((source, pseudo_translate(source)))
+        return entries
+
+
+def build_tm(path: str, entries: List[Tuple[str, str]], domain: str = "general"):
+    """TM 생성 (한 트랜잭션으로 일괄 삽입)"""
+    from tm_manager import TranslationMemory
+    tm = TranslationMemory(path)
+    with tm._lock:
+        tm.conn.executemany(
+            '''INSERT OR REPLACE INTO translation_memory
+               (source_text, target_text, source_hash, domain, document_type, quality_score)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            [(source, target, tm._calculate_hash(source), domain, "claim", 1 + i % 5)
+             for i, (source, target) in enumerate(entries)]
+        )
+        tm.conn.commit()
+    return tm
+
+
+def _timed(func: Callable, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _latency_metrics(prefix: str, seconds: List[float]) -> Dict[str, Dict]:
+    return {
+        f"{prefix}.p50_ms": _metric(percentile(seconds, 50) * 1000, "ms"),
+        f"{prefix}.p90_ms": _metric(percentile(seconds, 90) * 1000, "ms"),
+        f"{prefix}.p99_ms": _metric(percentile(seconds, 99) * 1000, "ms"),
+        f"{prefix}.mean_ms": _metric(statistics.fmean(seconds) * 1000, "ms"),
+    }
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+def bench_tm_search(workdir: Path, tm_size: int = 5000, queries: int = 200, seed: int = 0) -> Dict[str, Dict]:
+    """TM 검색 지연 시간 (완전 일치 / 유사 일치 / 불일치 질의를 1:1:1로)"""
+    generator = CorpusGenerator(seed)
+    entries = generator.tm_entries(tm_size)
+    tm = build_tm(str(workdir / "bench_tm.db"), entries)
+    try:
+        rng = random.Random(seed + 1)
+        exact, fuzzy, miss = [], [], []
+        for i in range(queries):
+            source = rng.choice(entries)[0]
+            kind = i % 3
+            if kind == 0:
+                exact.append(_timed(tm.search, source))
+            elif kind == 1:
+                # 숫자/단어 하나를 바꾼 유사 문장
+                fuzzy.append(_timed(tm.search, source.replace("the ", "said ", 1) + " "))
+            else:
+                miss.append(_timed(tm.search, generator.paragraph(1) + f" #{i}"))
+        metrics = _latency_metrics("tm_search", exact + fuzzy + miss)
+        metrics.update(_latency_metrics("tm_search.exact", exact))
+        metrics.update(_latency_metrics("tm_search.fuzzy", fuzzy + miss))
+        return metrics
+    finally:
+        tm.close()
+
+
+def bench_qa(segments: int = 500, seed: int = 0, repeat: int = 3) -> Dict[str, Dict]:
+    """QA 전체 검사 처리량 (세그먼트/초)"""
+    from llm_backends import pseudo_translate
+    from qa_checker import PatentQAChecker
+
+    generator = CorpusGenerator(seed)
+    term_mapping = {"substrate": "기판", "electrode": "전극", "cathode": "음극", "anode": "양극"}
+    pairs = []
+    for i in range(segments):
+        source = generator.claims(2)[-1] if i % 2 else generator.paragraph(3)
+        pairs.append((source, pseudo_translate(source, term_mapping), "claim" if i % 2 else "specification"))
+
+    checker = PatentQAChecker()
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for source, translation, document_type in pairs:
+            checker.check_all(source, translation, term_mapping, document_type, verbose=False)
+        rounds.append(time.perf_counter() - start)
+    best = min(rounds)
+    return {
+        "qa_check_all.segments_per_s": _metric(segments / best, "segments/s", "higher"),
+        "qa_check_all.mean_ms": _metric(best / segments * 1000, "ms"),
+    }
+
+
+def bench_parse(documents: int = 20, claims: int = 20, paragraphs: int = 100,
+                seed: int = 0, repeat: int = 3) -> Dict[str, Dict]:
+    """섹션 파싱 속도 (문서/초, MB/초)"""
+    from section_parser import PatentSectionParser
+
+    generator = CorpusGenerator(seed)
+    texts = [generator.document(claims, paragraphs) for _ in range(documents)]
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+    parser = PatentSectionParser()
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            parser.parse_document(text)
+        rounds.append(time.perf_counter() - start)
+    best = min(rounds)
+    return {
+        "parse_document.documents_per_s": _metric(documents / best, "documents/s", "higher"),
+        "parse_document.mb_per_s": _metric(megabytes / best, "MB/s", "higher"),
+    }
+
+
+def bench_pipeline(workdir: Path, documents: int = 10, claims: int = 3, llm_latency: float = 0.0,
+                   use_self_review: bool = True, seed: int = 0) -> Dict[str, Dict]:
+    """translate_document 전체 소요 시간 (FakeBackend, LLM 지연은 llm_latency초 고정)
+
+    llm_latency=0이면 LLM을 제외한 파이프라인 자체 오버헤드를 측정한다.
+    """
+    import llm_clients
+    from llm_backends import FakeBackend
+    from pipeline import TranslationPipeline
+    from tm_manager import TranslationMemory
+
+    backend = FakeBackend(latency=llm_latency, seed=seed)
+    previous = llm_clients.use_backend(backend)
+    generator = CorpusGenerator(seed)
+    texts = ["\n".join(generator.claims(claims)) for _ in range(documents)]
+    timings = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline = TranslationPipeline()
+            pipeline.tm.close()
+            pipeline.tm = TranslationMemory(str(workdir / "bench_pipeline_tm.db"))
+            try:
+                for text in texts:
+                    timings.append(_timed(pipeline.translate_document, text, "claim", use_self_review))
+            finally:
+                pipeline.close()
+    finally:
+        if previous is not None:
+            llm_clients.use_backend(previous)
+
+    total = sum(timings)
+    metrics = _latency_metrics("pipeline.translate_document", timings)
+    metrics["pipeline.documents_per_min"] = _metric(documents / total * 60, "documents/min", "higher")
+    metrics["pipeline.llm_requests_per_document"] = _metric(
+        backend.stats["requests"] / documents, "requests", "lower")
+    return metrics
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(only: Optional[List[str]] = None, tm_size: int = 5000, queries: int = 200,
+                   qa_segments: int = 500, documents: int = 20, claims: int = 20, paragraphs: int = 100,
+                   pipeline_documents: int = 10, llm_latency: float = 0.0, seed: int = 0,
+                   repeat: int = 3, progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """선택한 벤치마크 실행 (기본: 전체). Returns: JSON 직렬화 가능한 결과"""
+    selected = list(only or BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"알 수 없는 벤치마크: {', '.join(unknown)} ({', '.join(BENCHMARKS)})")
+
+    config = {"tm_size": tm_size, "queries": queries, "qa_segments": qa_segments, "documents": documents,
+              "claims": claims, "paragraphs": paragraphs, "pipeline_documents": pipeline_documents,
+              "llm_latency": llm_latency, "seed": seed, "repeat": repeat}
+    metrics: Dict[str, Dict] = {}
+    durations = {}
+    with tempfile.TemporaryDirectory(prefix="patent_bench_") as tmp:
+        workdir = Path(tmp)
+        for name in selected:
+            if progress:
+                progress(name)
+            start = time.perf_counter()
+            if name == "tm":
+                metrics.update(bench_tm_search(workdir, tm_size, queries, seed))
+            elif name == "qa":
+                metrics.update(bench_qa(qa_segments, seed, repeat))
+            elif name == "parse":
+                metrics.update(bench_parse(documents, claims, paragraphs, seed, repeat))
+            else:
+                metrics.update(bench_pipeline(workdir, pipeline_documents, 3, llm_latency, seed=seed))
+            durations[name] = round(time.perf_counter() - start, 2)
+
+    return {
+        "version": RESULT_VERSION,
+        "commit": _git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "durations_s": durations,
+        "metrics": metrics,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    """기준 결과 대비 변화 (두 결과에 모두 있는 지표만)
+
+    Returns:
+        [{"name", "baseline", "current", "change", "regression"}] - change는 나빠진 비율
+        (lower 지표는 증가율, higher 지표는 감소율), regression은 change > threshold
+    """
+    rows = []
+    for name, metric in current.get("metrics", {}).items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base or not base["value"]:
+            continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        if metric.get("better") == "higher":
+            change = -change
+        rows.append({
+            "name": name,
+            "baseline": base["value"],
+            "current": metric["value"],
+            "unit": metric["unit"],
+            "change": round(change, 4),
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def config_mismatch(baseline: Dict, current: Dict) -> List[str]:
+    """기준 결과와 설정(코퍼스 크기 등)이 다른 항목"""
+    base, cur = baseline.get("config", {}), current.get("config", {})
+    return [key for key in sorted(set(base) | set(cur)) if base.get(key) != cur.get(key)]
+
+
+def save_results(results: Dict, path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_results(path: str) -> Dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
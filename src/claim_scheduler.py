@@ -0,0 +1,131 @@
+"""
+청구항 의존 관계 기반 병렬 번역 스케줄러
+- 종속항 인용 관계(PatentSection.depends_on)로 DAG 구성
+- 선행 청구항이 모두 번역된 청구항부터 동시에 번역
+- 종속항에는 인용 청구항 번역문의 전제부를 previous_translation으로 전달
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+
+from section_parser import PatentSection
+
+
+# 한국어 청구항 전제부 종결 표현 ("~방법으로서,", "~장치에 있어서,")
+_PREAMBLE_END = re.compile(r'(?:에\s*있어서|으로서|로서)\s*,|:')
+
+
+def claim_preamble(translation: str, max_chars: int = 300) -> str:
+    """번역된 청구항의 전제부 추출 (종결 표현이 없으면 첫 줄)"""
+    match = _PREAMBLE_END.search(translation[:max_chars])
+    if match:
+        return translation[:match.end()].strip()
+    return translation.strip().split('\n', 1)[0][:max_chars]
+
+
+def build_claim_graph(claims: List[PatentSection]) -> Dict[str, List[str]]:
+    """청구항 ID → 인용하는 청구항 ID 목록 (목록에 없는 청구항 인용은 무시)"""
+    ids = {claim.unit_id for claim in claims}
+    return {
+        claim.unit_id: [parent for parent in claim.depends_on if parent in ids]
+        for claim in claims
+    }
+
+
+class ClaimScheduler:
+    """청구항 DAG 스케줄러"""
+
+    def __init__(self, translate_fn: Callable[[PatentSection, Optional[str]], str],
+                 max_workers: int = 4,
+                 progress_callback: Optional[Callable[[PatentSection, int, int], None]] = None):
+        """
+        Args:
+            translate_fn: (청구항, 인용 청구항 전제부 컨텍스트) → 번역문
+            max_workers: 동시에 번역할 최대 청구항 수
+            progress_callback: 청구항 번역 시작 시 (청구항, 시작 순번, 전체 수)로 호출
+        """
+        self.translate_fn = translate_fn
+        self.max_workers = max_workers
+        self.progress_callback = progress_callback
+
+    def _parent_context(self, parents: List[str], translations: Dict[str, str]) -> Optional[str]:
+        if not parents:
+            return None
+        return "\n".join(
+            f"[{parent.replace('claim-', '청구항 ')}] {claim_preamble(translations[parent])}"
+            for parent in parents
+        )
+
+    def run(self, claims: List[PatentSection]) -> Dict[str, str]:
+        """청구항 번역 실행. 청구항 ID → 번역문 반환
+
+        독립항은 모두 동시에 시작하고, 종속항은 인용하는 청구항이 모두 끝나는 즉시 시작한다.
+        번역 중 예외가 발생하면 대기 중인 작업을 취소하고 예외를 다시 발생시킨다.
+        """
+        graph = build_claim_graph(claims)
+        by_id = {claim.unit_id: claim for claim in claims}
+        remaining = {claim_id: set(parents) for claim_id, parents in graph.items()}
+        children: Dict[str, List[str]] = {}
+        for claim_id, parents in graph.items():
+            for parent in parents:
+                children.setdefault(parent, []).append(claim_id)
+
+        translations: Dict[str, str] = {}
+        started = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            def submit(claim_id: str):
+                nonlocal started
+                started += 1
+                claim = by_id[claim_id]
+                if self.progress_callback:
+                    self.progress_callback(claim, started, len(claims))
+                context = self._parent_context(graph[claim_id], translations)
+                running[executor.submit(self.translate_fn, claim, context)] = claim_id
+
+            # 문서 순서를 유지하며 독립항부터 제출
+            for claim in claims:
+                if not remaining[claim.unit_id]:
+                    submit(claim.unit_id)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    claim_id = running.pop(future)
+                    try:
+                        translations[claim_id] = future.result()
+                    except Exception:
+                        for pending in running:
+                            pending.cancel()
+                        raise
+
+                    for child in children.get(claim_id, []):
+                        remaining[child].discard(claim_id)
+                        if not remaining[child]:
+                            submit(child)
+
+        return translations
+
+
+if __name__ == "__main__":
+    # 테스트 (번역 함수 대신 전달받은 컨텍스트를 확인)
+    from section_parser import PatentSectionParser
+
+    doc = """CLAIMS
+1. A method for processing data, comprising: obtaining a substrate.
+2. The method of claim 1, wherein the substrate is heated.
+3. A device comprising a housing.
+4. The device of claim 3, used in the method of claim 2."""
+
+    parser = PatentSectionParser()
+    claims = [section for _, section in parser.iter_sections(doc.split('\n'))]
+
+    def fake_translate(claim, context):
+        print(f"{claim.unit_id} ← {claim.depends_on} | 컨텍스트: {context!r}")
+        return f"청구항 {claim.unit_id} 번역으로서, 나머지"
+
+    result = ClaimScheduler(fake_translate, max_workers=2).run(claims)
+    print(list(result))
@@ -0,0 +1,407 @@
+"""
+서식 보존 DOCX 읽기/쓰기 (스트리밍 XML 처리)
+- word/document.xml 등 본문 파트를 iterparse로 문단 단위 처리 (문서 전체 DOM을 만들지 않음)
+- 문단의 런(run)을 서식별로 묶어 <g1>...</g1>, 텍스트가 아닌 인라인 요소는 <x1/> 자리표시자로 표현
+- 번역문의 자리표시자를 원래 런 서식으로 복원하여 원본 패키지 구조에 다시 기록
+"""
+
+import copy
+import io
+import re
+import shutil
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+# 자식 요소를 하나씩 스트리밍하는 컨테이너 (그 외 요소는 하위 트리 전체를 한 번에 처리)
+CONTAINER_TAGS = {_w(tag) for tag in (
+    "document", "body", "tbl", "tr", "tc", "sdt", "sdtContent", "customXml",
+    "hdr", "ftr", "footnotes", "footnote", "endnotes", "endnote",
+)}
+# 런을 감싸는 문단 내 요소 (같은 요소의 얕은 복사본으로 다시 감쌈)
+WRAPPER_TAGS = {_w(tag) for tag in ("hyperlink", "ins", "smartTag")}
+# 위치만 표시하는 요소 (재구성 시 문단 앞/뒤에 배치)
+START_MARKERS = {_w(tag) for tag in ("bookmarkStart", "commentRangeStart", "permStart", "moveFromRangeStart", "moveToRangeStart")}
+END_MARKERS = {_w(tag) for tag in ("bookmarkEnd", "commentRangeEnd", "permEnd", "moveFromRangeEnd", "moveToRangeEnd")}
+# 버려도 되는 요소
+DROP_TAGS = {_w(tag) for tag in ("proofErr", "lastRenderedPageBreak")}
+
+_PLACEHOLDER = re.compile(r'(</?g\d+>|<x\d+/>)')
+
+
+def _is_text_part(name: str) -> bool:
+    """번역 대상 XML 파트 (본문, 각주/미주, 머리글/바닥글)"""
+    return bool(re.match(r'word/(document|footnotes|endnotes|header\d*|footer\d*)\.xml$', name))
+
+
+@dataclass
+class DocxParagraph:
+    """번역 단위 문단"""
+    part: str
+    index: int
+    text: str          # 자리표시자 포함 텍스트
+    plain_text: str    # 자리표시자 제외 텍스트
+    groups: Dict[int, Tuple[Optional[ET.Element], Optional[ET.Element]]] = field(default_factory=dict, repr=False)
+    objects: Dict[int, List[ET.Element]] = field(default_factory=dict, repr=False)
+
+
+class _ParagraphExtractor:
+    """문단 요소 → 자리표시자 텍스트"""
+
+    def __init__(self, p: ET.Element):
+        self.p = p
+        self.ppr = None
+        self.start_markers: List[ET.Element] = []
+        self.end_markers: List[ET.Element] = []
+        self.pieces = []  # ('text', key, text, rPr, wrapper) / ('obj', [요소])
+        self._field: Optional[List[ET.Element]] = None
+        self._field_depth = 0
+
+        for child in p:
+            self._visit(child, None)
+        if self._field:
+            self.pieces.append(('obj', self._field))
+
+    def _visit(self, elem: ET.Element, wrapper: Optional[ET.Element]):
+        tag = elem.tag
+        if tag == _w("pPr"):
+            self.ppr = elem
+        elif tag == _w("r"):
+            self._visit_run(elem, wrapper)
+        elif tag in WRAPPER_TAGS and wrapper is None:
+            for child in elem:
+                self._visit(child, elem)
+        elif tag in START_MARKERS:
+            self.start_markers.append(elem)
+        elif tag in END_MARKERS:
+            self.end_markers.append(elem)
+        elif tag in DROP_TAGS:
+            pass
+        elif self._field is not None:
+            self._field.append(elem)
+        else:
+            # 수식, 인라인 콘텐츠 컨트롤, 삭제 기록 등은 통째로 보존
+            self.pieces.append(('obj', [elem]))
+
+    def _visit_run(self, run: ET.Element, wrapper: Optional[ET.Element]):
+        rpr = run.find(_w("rPr"))
+        key = (id(wrapper) if wrapper is not None else 0,
+               ET.tostring(rpr, encoding="unicode") if rpr is not None else "")
+
+        # 복합 필드(fldChar begin ~ end)는 하나의 개체로 보존
+        fld_chars = [c.get(_w("fldCharType")) for c in run.iter(_w("fldChar"))]
+        if self._field is not None or "begin" in fld_chars:
+            if self._field is None:
+                self._field = []
+            self._field.append(run)
+            for fld_type in fld_chars:
+                self._field_depth += {"begin": 1, "end": -1}.get(fld_type, 0)
+            if self._field_depth <= 0:
+                self.pieces.append(('obj', self._field))
+                self._field, self._field_depth = None, 0
+            return
+
+        for child in run:
+            if child.tag in (_w("rPr"),) or child.tag in DROP_TAGS:
+                continue
+            if child.tag == _w("t"):
+                if child.text:
+                    self.pieces.append(('text', key, child.text, rpr, wrapper))
+            else:
+                # 탭, 줄바꿈, 그림, 각주 참조 등은 해당 요소만 담은 런으로 보존
+                obj_run = ET.Element(run.tag, run.attrib)
+                if rpr is not None:
+                    obj_run.append(rpr)
+                obj_run.append(child)
+                if wrapper is not None:
+                    wrapped = ET.Element(wrapper.tag, wrapper.attrib)
+                    wrapped.append(obj_run)
+                    obj_run = wrapped
+                self.pieces.append(('obj', [obj_run]))
+
+    def build(self, part: str, index: int) -> DocxParagraph:
+        """자리표시자 텍스트 생성 (가장 많은 텍스트의 서식을 기본 서식으로 사용)"""
+        lengths: Dict[Tuple, int] = {}
+        for piece in self.pieces:
+            if piece[0] == 'text':
+                lengths[piece[1]] = lengths.get(piece[1], 0) + len(piece[2])
+        base_key = max(lengths, key=lengths.get) if lengths else None
+
+        paragraph = DocxParagraph(part=part, index=index, text="", plain_text="")
+        base = next((piece for piece in self.pieces if piece[0] == 'text' and piece[1] == base_key), None)
+        paragraph.groups[0] = (base[3], base[4]) if base else (None, None)
+
+        group_ids: Dict[Tuple, int] = {}
+        text_parts, plain_parts = [], []
+        open_group = None
+        for piece in self.pieces:
+            if piece[0] == 'obj':
+                if open_group:
+                    text_parts.append(f"</g{open_group}>")
+                    open_group = None
+                obj_id = len(paragraph.objects) + 1
+                paragraph.objects[obj_id] = piece[1]
+                text_parts.append(f"<x{obj_id}/>")
+                plain_parts.append(self._object_text(piece[1]))
+                continue
+
+            _, key, text, rpr, wrapper = piece
+            group = 0 if key == base_key else group_ids.setdefault(key, len(group_ids) + 1)
+            if group != open_group and open_group:
+                text_parts.append(f"</g{open_group}>")
+                open_group = None
+            if group and group != open_group:
+                paragraph.groups[group] = (rpr, wrapper)
+                text_parts.append(f"<g{group}>")
+                open_group = group
+            text_parts.append(text)
+            plain_parts.append(text)
+        if open_group:
+            text_parts.append(f"</g{open_group}>")
+
+        paragraph.text = "".join(text_parts)
+        paragraph.plain_text = "".join(plain_parts)
+        return paragraph
+
+    @staticmethod
+    def _object_text(elements: List[ET.Element]) -> str:
+        """개체의 일반 텍스트 표현 (탭/줄바꿈은 공백 문자로, 그 외는 빈 문자열)"""
+        text = []
+        for elem in elements:
+            for child in elem.iter():
+                if child.tag == _w("tab"):
+                    text.append("\t")
+                elif child.tag in (_w("br"), _w("cr")) and child.get(_w("type")) in (None, "textWrapping"):
+                    text.append(" ")
+        return "".join(text)
+
+    def rebuild(self, paragraph: DocxParagraph, translated: str):
+        """번역문으로 문단 내용 교체"""
+        for child in list(self.p):
+            self.p.remove(child)
+        if self.ppr is not None:
+            self.p.append(self.ppr)
+        for marker in self.start_markers:
+            self.p.append(marker)
+
+        used_objects = set()
+        group = 0
+        last_wrapper, last_wrapped = None, None
+
+        def add_text(text: str):
+            nonlocal last_wrapper, last_wrapped
+            rpr, wrapper = paragraph.groups.get(group, paragraph.groups[0])
+            run = ET.Element(_w("r"))
+            if rpr is not None:
+                run.append(copy.deepcopy(rpr))
+            for i, chunk in enumerate(text.split("\t")):
+                if i:
+                    ET.SubElement(run, _w("tab"))
+                if chunk:
+                    t = ET.SubElement(run, _w("t"))
+                    t.text = chunk
+                    t.set(XML_SPACE, "preserve")
+
+            if wrapper is None:
+                self.p.append(run)
+                last_wrapper, last_wrapped = None, None
+            elif wrapper is last_wrapper:
+                last_wrapped.append(run)
+            else:
+                last_wrapped = ET.SubElement(self.p, wrapper.tag, wrapper.attrib)
+                last_wrapped.append(run)
+                last_wrapper = wrapper
+
+        def add_object(obj_id: int):
+            nonlocal last_wrapper, last_wrapped
+            elements = paragraph.objects[obj_id]
+            if obj_id in used_objects:
+                elements = [copy.deepcopy(e) for e in elements]
+            used_objects.add(obj_id)
+            self.p.extend(elements)
+            last_wrapper, last_wrapped = None, None
+
+        for token in _PLACEHOLDER.split(translated):
+            if not token:
+                continue
+            match = re.fullmatch(r'<(/?)g(\d+)>|<x(\d+)/>', token)
+            if not match:
+                add_text(token)
+            elif match.group(3):
+                if int(match.group(3)) in paragraph.objects:
+                    add_object(int(match.group(3)))
+            elif match.group(1):
+                group = 0
+            elif int(match.group(2)) in paragraph.groups:
+                group = int(match.group(2))
+
+        # 번역문에서 빠진 개체(그림, 각주 참조 등)는 문단 끝에 보존
+        for obj_id in paragraph.objects:
+            if obj_id not in used_objects:
+                add_object(obj_id)
+
+        for marker in self.end_markers:
+            self.p.append(marker)
+
+
+def _qname(tag: str, prefixes: Dict[str, str]) -> str:
+    if tag[0] != "{":
+        return tag
+    uri, local = tag[1:].split("}", 1)
+    prefix = prefixes.get(uri)
+    return f"{prefix}:{local}" if prefix else local
+
+
+def _register_namespace(prefix: str, uri: str):
+    try:
+        ET.register_namespace(prefix, uri)
+    except ValueError:
+        pass
+
+
+def _walk_part(source, part: str, out=None) -> Iterator[Tuple[DocxParagraph, _ParagraphExtractor]]:
+    """XML 파트를 스트리밍하며 텍스트가 있는 문단을 생성
+
+    out이 있으면 문서를 다시 기록한다. 생성된 문단은 다음 값을 요청하기 전에
+    extractor.rebuild()로 교체할 수 있으며, 교체된 내용이 기록된다.
+    컨테이너의 자식은 끝 태그에서 처리 후 부모에서 제거하므로 메모리에는 현재 문단만 남는다.
+    """
+    prefixes: Dict[str, str] = {}
+    pending_ns: List[Tuple[str, str]] = []
+    stack: List[Tuple[ET.Element, bool]] = []  # (요소, 스트리밍 컨테이너 여부)
+    index = 0
+
+    if out is not None:
+        out.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n')
+
+    for event, item in ET.iterparse(source, events=("start-ns", "start", "end")):
+        if event == "start-ns":
+            prefix, uri = item
+            pending_ns.append((prefix, uri))
+            prefixes.setdefault(uri, prefix)
+            if prefix:
+                _register_namespace(prefix, uri)
+            continue
+
+        elem = item
+        if event == "start":
+            parent_streams = not stack or stack[-1][1]
+            is_container = parent_streams and (not stack or elem.tag in CONTAINER_TAGS)
+            stack.append((elem, is_container))
+            if is_container and out is not None:
+                attrs = "".join(
+                    f' xmlns{":" + prefix if prefix else ""}={quoteattr(uri)}' for prefix, uri in pending_ns
+                ) + "".join(f" {_qname(k, prefixes)}={quoteattr(v)}" for k, v in elem.attrib.items())
+                out.write(f"<{_qname(elem.tag, prefixes)}{attrs}>")
+            pending_ns = []
+            continue
+
+        # end
+        _, is_container = stack.pop()
+        parent = stack[-1][0] if stack else None
+        parent_streams = not stack or stack[-1][1]
+
+        if is_container:
+            if out is not None:
+                out.write(f"</{_qname(elem.tag, prefixes)}>")
+        elif parent_streams:
+            if elem.tag == _w("p"):
+                extractor = _ParagraphExtractor(elem)
+                paragraph = extractor.build(part, index)
+                index += 1
+                if paragraph.plain_text.strip():
+                    yield paragraph, extractor
+            if out is not None:
+                elem.tail = None
+                out.write(ET.tostring(elem, encoding="unicode"))
+        else:
+            continue
+
+        if parent is not None:
+            parent.remove(elem)
+
+
+def _text_parts(zin: zipfile.ZipFile) -> List[str]:
+    names = [name for name in zin.namelist() if _is_text_part(name)]
+    # 본문 → 각주/미주 → 머리글/바닥글 순
+    return sorted(names, key=lambda name: (name != "word/document.xml", name))
+
+
+def iter_paragraphs(path: str) -> Iterator[DocxParagraph]:
+    """텍스트가 있는 문단을 문서 순서대로 생성 (표 안의 문단, 각주, 머리글/바닥글 포함)"""
+    with zipfile.ZipFile(path) as zin:
+        for part in _text_parts(zin):
+            with zin.open(part) as source:
+                for paragraph, _ in _walk_part(source, part):
+                    yield paragraph
+
+
+def read_docx_text(path: str, placeholders: bool = False) -> str:
+    """DOCX 텍스트 추출 (문단당 한 줄, 표/각주/머리글 포함)
+
+    placeholders=True이면 인라인 서식 자리표시자를 포함한다 (write_docx_translation으로 되돌릴 때 사용).
+    """
+    return "\n".join(
+        paragraph.text if placeholders else paragraph.plain_text
+        for paragraph in iter_paragraphs(path)
+    )
+
+
+def strip_format_tags(text: str) -> str:
+    """서식 자리표시자 제거 (텍스트 출력이나 서식 복원에 실패한 경우)"""
+    return _PLACEHOLDER.sub("", text)
+
+
+def write_translated_docx(input_path: str, output_path: str,
+                          translate_fn: Callable[[DocxParagraph], Optional[str]]) -> int:
+    """원본 DOCX 패키지를 복사하면서 본문 파트의 문단을 번역문으로 교체
+
+    translate_fn은 텍스트가 있는 문단마다 문서 순서대로 호출되며, None을 반환하면 원문을 유지한다.
+    Returns: 처리한 문단 수
+    """
+    count = 0
+    with zipfile.ZipFile(input_path) as zin, \
+            zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+        text_parts = set(_text_parts(zin))
+        for info in zin.infolist():
+            if info.filename not in text_parts:
+                with zin.open(info) as source, zout.open(info, "w") as target:
+                    shutil.copyfileobj(source, target)
+                continue
+
+            with zin.open(info) as source, zout.open(info.filename, "w", force_zip64=True) as raw:
+                out = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+                for paragraph, extractor in _walk_part(source, info.filename, out):
+                    count += 1
+                    translated = translate_fn(paragraph)
+                    if translated is not None:
+                        extractor.rebuild(paragraph, translated)
+                out.flush()
+                out.detach()
+    return count
+
+
+def write_docx_translation(input_path: str, output_path: str, translation: str) -> bool:
+    """read_docx_text(placeholders=True)로 만든 원문의 번역문(문단당 한 줄)을 원본 서식에 기록
+
+    번역문의 줄 수가 원문 문단 수와 다르면 정렬할 수 없으므로 기록하지 않고 False를 반환한다.
+    """
+    lines = [line for line in translation.split("\n") if line.strip()]
+    expected = sum(1 for _ in iter_paragraphs(input_path))
+    if len(lines) != expected:
+        return False
+
+    remaining = iter(lines)
+    write_translated_docx(input_path, output_path, lambda paragraph: next(remaining))
+    return True
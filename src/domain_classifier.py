@@ -0,0 +1,212 @@
+"""
+로컬 통계 기반 기술 분야 분류기
+- 해시 기반 단어 n-gram 특징 (Hashing trick)
+- 다항 나이브 베이즈 (NumPy)
+- TM의 domain 라벨로 오프라인 학습, 디스크 저장/로드
+"""
+
+import re
+import json
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# 학습된 분류기가 없을 때 사용하는 키워드 기반 휴리스틱
+DOMAIN_KEYWORDS = {
+    "electronics_semiconductor": ["substrate", "layer", "semiconductor", "wafer", "transistor", "chip", "circuit"],
+    "chemistry_pharma": ["compound", "molecule", "pharmaceutical", "drug", "synthesis", "reaction", "chemical"],
+    "mechanical": ["distal", "proximal", "apparatus", "device", "mechanical", "housing"],
+    "biotech": ["protein", "cell", "antibody", "gene", "DNA", "RNA", "biological"]
+}
+
+DEFAULT_MODEL_PATH = "data/domain_classifier.npz"
+
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9\-]+")
+_NGRAM_PRIME = 1000003
+_token_hash_cache: Dict[str, int] = {}
+
+
+def _token_hash(token: str) -> int:
+    """토큰 해시 (내장 hash()는 프로세스마다 달라지므로 crc32 사용)"""
+    value = _token_hash_cache.get(token)
+    if value is None:
+        value = zlib.crc32(token.encode("utf-8"))
+        if len(_token_hash_cache) < 200000:
+            _token_hash_cache[token] = value
+    return value
+
+
+def guess_domain_by_keywords(text: str) -> Tuple[str, float]:
+    """키워드 집계로 도메인 추정 (도메인, 신뢰도)"""
+    text_lower = text.lower()
+    scores = {domain: sum(1 for kw in keywords if kw in text_lower)
+              for domain, keywords in DOMAIN_KEYWORDS.items()}
+    total = sum(scores.values())
+    if total == 0:
+        return "general", 0.0
+    best = max(scores, key=scores.get)
+    return best, scores[best] / total
+
+
+class DomainClassifier:
+    """해시 n-gram + 다항 나이브 베이즈 도메인 분류기"""
+
+    def __init__(self, n_features: int = 2 ** 17, ngram_range: Tuple[int, int] = (1, 2),
+                 alpha: float = 1.0, max_chars: int = 4000):
+        """
+        Args:
+            n_features: 해시 특징 공간 크기
+            ngram_range: 사용할 단어 n-gram 범위 (최소, 최대)
+            alpha: 라플라스 스무딩 계수
+            max_chars: 분류에 사용할 앞부분 문자 수
+        """
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.alpha = alpha
+        self.max_chars = max_chars
+
+        self.classes: List[str] = []
+        self.class_log_prior: Optional[np.ndarray] = None
+        self.feature_log_prob: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.feature_log_prob is not None and len(self.classes) > 0
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """텍스트를 (해시 인덱스, 빈도) 배열로 변환"""
+        tokens = _TOKEN_PATTERN.findall(text[:self.max_chars].lower())
+        if not tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # 토큰 해시는 캐시하고 n-gram 해시는 NumPy로 조합
+        unigrams = np.fromiter((_token_hash(t) for t in tokens), dtype=np.int64, count=len(tokens))
+        min_n, max_n = self.ngram_range
+
+        hashed = []
+        gram = unigrams
+        for n in range(1, max_n + 1):
+            if n > 1:
+                gram = (gram[:-1] * _NGRAM_PRIME + unigrams[n - 1:]) & 0xFFFFFFFF
+            if n >= min_n and len(gram):
+                hashed.append(gram)
+
+        indices, counts = np.unique(np.concatenate(hashed) % self.n_features, return_counts=True)
+        return indices, counts.astype(np.float32)
+
+    def fit(self, samples: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+        """(텍스트, 도메인) 샘플로 학습. 클래스별 샘플 수 반환"""
+        feature_counts: Dict[str, np.ndarray] = {}
+        doc_counts: Dict[str, int] = {}
+
+        for text, label in samples:
+            if not text or not label:
+                continue
+            if label not in feature_counts:
+                feature_counts[label] = np.zeros(self.n_features, dtype=np.float64)
+                doc_counts[label] = 0
+            indices, counts = self._features(text)
+            feature_counts[label][indices] += counts
+            doc_counts[label] += 1
+
+        if not feature_counts:
+            raise ValueError("학습할 샘플이 없습니다.")
+
+        self.classes = sorted(feature_counts)
+        totals = np.array([doc_counts[c] for c in self.classes], dtype=np.float64)
+        self.class_log_prior = np.log(totals / totals.sum()).astype(np.float32)
+
+        smoothed = np.vstack([feature_counts[c] for c in self.classes]) + self.alpha
+        self.feature_log_prob = (
+            np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        ).astype(np.float32)
+
+        return {c: doc_counts[c] for c in self.classes}
+
+    def fit_from_tm(self, tm, min_samples: int = 1, batch_size: int = 1000) -> Dict[str, int]:
+        """TranslationMemory의 domain 라벨로 학습"""
+        counts = self.fit(
+            (entry["source"], entry["domain"])
+            for entry in tm.iter_entries(batch_size=batch_size)
+        )
+
+        # 샘플이 부족한 클래스는 제거
+        keep = [i for i, c in enumerate(self.classes) if counts[c] >= min_samples]
+        if not keep:
+            raise ValueError(f"샘플 수가 {min_samples}개 이상인 도메인이 없습니다.")
+        if len(keep) < len(self.classes):
+            self.classes = [self.classes[i] for i in keep]
+            self.class_log_prior = self.class_log_prior[keep]
+            self.feature_log_prob = self.feature_log_prob[keep]
+        return {c: counts[c] for c in self.classes}
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """도메인별 사후 확률"""
+        if not self.is_trained:
+            raise RuntimeError("학습되지 않은 분류기입니다.")
+
+        indices, counts = self._features(text)
+        scores = self.class_log_prior + self.feature_log_prob[:, indices] @ counts
+        scores = np.exp(scores - scores.max())
+        probs = scores / scores.sum()
+        return {c: float(p) for c, p in zip(self.classes, probs)}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """가장 가능성 높은 도메인과 신뢰도"""
+        probs = self.predict_proba(text)
+        best = max(probs, key=probs.get)
+        return best, probs[best]
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        """모델 저장 (.npz)"""
+        if not self.is_trained:
+            raise RuntimeError("학습되지 않은 분류기는 저장할 수 없습니다.")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        params = {
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+            "alpha": self.alpha,
+            "max_chars": self.max_chars,
+            "classes": self.classes,
+        }
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                params=np.frombuffer(json.dumps(params).encode("utf-8"), dtype=np.uint8),
+                class_log_prior=self.class_log_prior,
+                feature_log_prob=self.feature_log_prob,
+            )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "DomainClassifier":
+        """저장된 모델 로드"""
+        with np.load(path) as data:
+            params = json.loads(data["params"].tobytes().decode("utf-8"))
+            classifier = cls(
+                n_features=params["n_features"],
+                ngram_range=tuple(params["ngram_range"]),
+                alpha=params["alpha"],
+                max_chars=params["max_chars"],
+            )
+            classifier.classes = params["classes"]
+            classifier.class_log_prior = data["class_log_prior"]
+            classifier.feature_log_prob = data["feature_log_prob"]
+        return classifier
+
+
+if __name__ == "__main__":
+    # 테스트
+    classifier = DomainClassifier()
+    classifier.fit([
+        ("A semiconductor wafer having a transistor layer on a substrate", "electronics_semiconductor"),
+        ("A pharmaceutical compound obtained by chemical synthesis", "chemistry_pharma"),
+        ("A housing with a distal end and a proximal end", "mechanical"),
+        ("An antibody binding a protein expressed by the cell", "biotech"),
+    ])
+    print(classifier.predict("A method of forming a transistor on a wafer"))
+    print(guess_domain_by_keywords("A method of forming a transistor on a wafer"))
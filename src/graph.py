@@ -1,48 +1,78 @@
+import hashlib
+import sqlite3
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from .agents import analyst_node, translator_node, reviewer_node, tm_search_node, tm_save_node
+from .agents import (analyst_node, translator_node, reviewer_node, triage_node, tm_fuzzy_node,
+                     tm_save_node, human_review_node, budget_exceeded,
+                     aanalyst_node, atranslator_node, areviewer_node, atriage_node, atm_fuzzy_node,
+                     atm_save_node, ahuman_review_node)
 from .schemas import AgentState
 
+# Local checkpoint store shared by main_graph.py and app.py (anchored to the project root, not the CWD)
+CHECKPOINT_DB = str(Path(__file__).parent.parent / "data" / "graph_checkpoints.db")
+
 def decide_on_tm_match(state: AgentState):
-    """Decision node to check if a TM match was found."""
+    """Decision node after triage: finish on an exact TM match, otherwise fan out
+    to LLM analysis and fuzzy TM retrieval in parallel."""
     if state.get("tm_match_found"):
         return "end_with_tm"
     else:
-        return "translate"
+        return ["analyze", "tm_fuzzy"]
 
 def decide_after_review(state: AgentState):
-    """Decision node after the review step."""
+    """Decision node after the review step.
+
+    A failed review is retranslated (with the reviewer's feedback, on the next model of the
+    escalation ladder) until the attempts or the cost/time budget run out, then the draft
+    goes to the human-review queue.
+    """
     if state["review_result"] and state["review_result"].get("passed"):
         print("--- Review Passed. Proceeding to save to TM. ---")
         return "save_to_tm"
-    else:
-        print("--- Review Failed. Returning to Translator. ---")
-        return "translate"
+    if budget_exceeded(state):
+        print("--- Review Failed. No attempts or budget left. ---")
+        return "human_review"
+    print("--- Review Failed. Returning to Translator with feedback. ---")
+    return "translate"
 
 # Define the graph
 workflow = StateGraph(AgentState)
 
+def node(func, afunc):
+    """Node with a sync and an async implementation: invoke() uses func, ainvoke()/astream() use afunc."""
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
 # Add the nodes
-workflow.add_node("analyze", analyst_node)
-workflow.add_node("tm_search", tm_search_node)
-workflow.add_node("translate", translator_node)
-workflow.add_node("review", reviewer_node)
-workflow.add_node("save_to_tm", tm_save_node)
+workflow.add_node("triage", node(triage_node, atriage_node))
+workflow.add_node("analyze", node(analyst_node, aanalyst_node))
+workflow.add_node("tm_fuzzy", node(tm_fuzzy_node, atm_fuzzy_node))
+workflow.add_node("translate", node(translator_node, atranslator_node))
+workflow.add_node("review", node(reviewer_node, areviewer_node))
+workflow.add_node("save_to_tm", node(tm_save_node, atm_save_node))
+workflow.add_node("human_review", node(human_review_node, ahuman_review_node))
 
 # Set the entrypoint
-workflow.set_entry_point("analyze")
+workflow.set_entry_point("triage")
 
-# Add edges
-workflow.add_edge("analyze", "tm_search")
+# Add edges (translate waits for both parallel branches)
+workflow.add_edge(["analyze", "tm_fuzzy"], "translate")
 workflow.add_edge("translate", "review")
 workflow.add_edge("save_to_tm", END)
+workflow.add_edge("human_review", END)
 
-# Conditional edge after TM search
+# Conditional edge after triage
 workflow.add_conditional_edges(
-    "tm_search",
+    "triage",
     decide_on_tm_match,
     {
         "end_with_tm": END,
-        "translate": "translate",
+        "analyze": "analyze",
+        "tm_fuzzy": "tm_fuzzy",
     }
 )
 
@@ -53,8 +83,166 @@ workflow.add_conditional_edges(
     {
         "save_to_tm": "save_to_tm",
         "translate": "translate",
+        "human_review": "human_review",
     }
 )
 
-# Compile the graph
-app = workflow.compile()
+def get_checkpointer(db_path: str = CHECKPOINT_DB):
+    """SQLite checkpointer so graph state survives across processes (in-memory fallback)."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        from langgraph.checkpoint.memory import MemorySaver
+        print("--- langgraph-checkpoint-sqlite not installed; checkpoints are kept in memory only. ---")
+        return MemorySaver()
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    return SqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+
+
+# The checkpoint DB is opened on first use, so importing this module creates no files
+_checkpointer = None
+_compiled = {}
+_checkpointer_lock = threading.Lock()
+
+
+def shared_checkpointer():
+    """Process-wide checkpointer for the sync graphs (created on first use)."""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = get_checkpointer()
+        return _checkpointer
+
+
+def compiled_graph(builder: StateGraph = None):
+    """A StateGraph (default: the whole-document workflow) compiled with the shared checkpointer, cached."""
+    builder = builder or workflow
+    checkpointer = shared_checkpointer()
+    with _checkpointer_lock:
+        if id(builder) not in _compiled:
+            _compiled[id(builder)] = builder.compile(checkpointer=checkpointer)
+        return _compiled[id(builder)]
+
+
+def thread_id_for(source_text: str, document_type: str = "claim") -> str:
+    """Stable thread ID for a document, so re-running the same input resumes its thread."""
+    digest = hashlib.sha256(f"{document_type}\0{source_text}".encode("utf-8")).hexdigest()
+    return f"doc-{digest[:16]}"
+
+
+def thread_config(thread_id: str, checkpoint_id: Optional[str] = None) -> dict:
+    configurable = {"thread_id": thread_id}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def run_thread(initial_state: dict, thread_id: str, fresh: bool = False,
+               graph=None, max_concurrency: Optional[int] = None) -> dict:
+    """Run a compiled graph (default: the whole-document graph) on a thread.
+
+    - Interrupted thread (pending next nodes): resume from the last checkpoint.
+    - Finished thread: return the stored final state without calling any node.
+    - New thread: start from the entry point.
+    - fresh=True: delete the thread's checkpoints first, so the new run starts from the
+      initial state (add-reducer channels such as cost_usd cannot be reset through the input).
+
+    max_concurrency caps how many nodes of one step run at the same time.
+    """
+    graph = graph or compiled_graph()
+    config = thread_config(thread_id)
+    if max_concurrency:
+        config["max_concurrency"] = max_concurrency
+    snapshot = graph.get_state(config)
+    if snapshot.values and fresh:
+        print(f"--- Discarding the checkpoints of thread {thread_id}. ---")
+        graph.checkpointer.delete_thread(thread_id)
+    elif snapshot.values:
+        if snapshot.next:
+            print(f"--- Resuming thread {thread_id} at {', '.join(snapshot.next)} ---")
+            return graph.invoke(None, config)
+        print(f"--- Thread {thread_id} already finished. Using stored result. ---")
+        return snapshot.values
+    return graph.invoke(initial_state, config)
+
+
+@asynccontextmanager
+async def async_checkpointer(db_path: str = CHECKPOINT_DB):
+    """Async SQLite checkpointer for ainvoke/astream on the same checkpoint DB.
+
+    The async saver is bound to the running event loop, so each run opens its own.
+    """
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        # The in-memory fallback supports both sync and async access
+        yield shared_checkpointer()
+        return
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(db_path) as saver:
+        yield saver
+
+
+async def arun_thread(initial_state: dict, thread_id: str, fresh: bool = False,
+                      builder: StateGraph = None, max_concurrency: Optional[int] = None,
+                      on_update: Optional[Callable[[str, dict], None]] = None) -> dict:
+    """Async run_thread: nodes await their LLM calls and progress is streamed.
+
+    on_update(node_name, update) is called as each node finishes, so a UI can show progress
+    while the graph is still running. builder is the StateGraph to run (default: workflow).
+    """
+    async with async_checkpointer() as saver:
+        graph = (builder or workflow).compile(checkpointer=saver)
+        config = thread_config(thread_id)
+        if max_concurrency:
+            config["max_concurrency"] = max_concurrency
+
+        graph_input = initial_state
+        snapshot = await graph.aget_state(config)
+        if snapshot.values and fresh:
+            print(f"--- Discarding the checkpoints of thread {thread_id}. ---")
+            await saver.adelete_thread(thread_id)
+        elif snapshot.values:
+            if not snapshot.next:
+                print(f"--- Thread {thread_id} already finished. Using stored result. ---")
+                return snapshot.values
+            print(f"--- Resuming thread {thread_id} at {', '.join(snapshot.next)} ---")
+            graph_input = None
+
+        async for update in graph.astream(graph_input, config, stream_mode="updates"):
+            for node_name, values in update.items():
+                if on_update:
+                    on_update(node_name, values or {})
+        return (await graph.aget_state(config)).values
+
+
+def thread_history(thread_id: str) -> list:
+    """Checkpoints of a thread, oldest first (StateSnapshot objects)."""
+    return list(reversed(list(compiled_graph().get_state_history(thread_config(thread_id)))))
+
+
+def replay(thread_id: str, checkpoint_id: str) -> dict:
+    """Re-execute the graph from a stored checkpoint (creates a fork on the same thread)."""
+    return compiled_graph().invoke(None, thread_config(thread_id, checkpoint_id))
+
+
+def rerun_review(thread_id: str, review_model: Optional[str] = None,
+                 use_flash_review: Optional[bool] = None) -> dict:
+    """Re-run only the reviewer on the latest draft, reusing stored analysis and translation."""
+    app = compiled_graph()
+    after_translate = next(
+        (snap for snap in app.get_state_history(thread_config(thread_id)) if snap.next == ("review",)),
+        None
+    )
+    if after_translate is None:
+        raise ValueError(f"No draft translation checkpoint found for thread {thread_id}")
+
+    updates = {}
+    if review_model is not None:
+        updates["review_model"] = review_model
+    if use_flash_review is not None:
+        updates["use_flash_review"] = use_flash_review
+    config = app.update_state(after_translate.config, updates, as_node="translate")
+    return app.invoke(None, config, interrupt_after=["review"])
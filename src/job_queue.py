@@ -0,0 +1,388 @@
+"""
+번역 작업/세그먼트 큐 (SQLite)
+- 작업(문서)별 세그먼트 상태 기록: pending → translating → translated → qa_checked → saved
+- 워커는 세그먼트를 제한 시간(lease) 동안 점유하고, 시간이 지나면 다른 워커가 다시 가져감
+- 번역 결과를 즉시 저장하므로 중단 후 재시작해도 완료된 LLM 번역을 다시 요청하지 않음
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SEGMENT_STATES = ("pending", "translating", "translated", "qa_checked", "saved")
+DEFAULT_LEASE_SECONDS = 600
+
+
+def job_key(source_text: str, **options) -> str:
+    """원문과 번역 옵션으로 작업 ID 생성 (같은 입력을 다시 실행하면 같은 작업으로 재개)"""
+    payload = json.dumps(options, sort_keys=True, ensure_ascii=False) + "\0" + source_text
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _process_alive(pid: int) -> bool:
+    """같은 호스트의 프로세스 생존 여부"""
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@dataclass
+class SegmentRecord:
+    """큐에 저장된 세그먼트"""
+    job_id: str
+    seq: int
+    unit_id: str
+    section_type: str
+    source_text: str
+    status: str
+    translation: Optional[str]
+    meta: Dict
+    attempts: int
+    error: Optional[str]
+
+
+class JobQueue:
+    """SQLite 기반 번역 작업 큐"""
+
+    def __init__(self, db_path: str = "data/jobs.db", lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.conn = None
+        self._lock = threading.RLock()
+        self._init_database()
+
+    def _init_database(self):
+        """데이터베이스 초기화"""
+        # 여러 프로세스(CLI/GUI)가 같은 큐를 열 수 있으므로 잠금 대기 시간 지정
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            input_path TEXT,
+            options TEXT,
+            status TEXT DEFAULT 'running',
+            output_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS segments (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            unit_id TEXT NOT NULL,
+            section_type TEXT,
+            source_text TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            translation TEXT,
+            meta TEXT,
+            lease_owner TEXT,
+            lease_expires REAL,
+            attempts INTEGER DEFAULT 0,
+            error TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_id, unit_id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_segments_status ON segments(job_id, status)
+        ''')
+
+        # 자동 재번역으로 검수를 통과하지 못한 번역 (사람 검수 대기)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS human_review (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            thread_id TEXT,
+            source_text TEXT NOT NULL,
+            translation TEXT,
+            feedback TEXT,
+            reason TEXT,
+            meta TEXT,
+            status TEXT DEFAULT 'open',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        self.conn.commit()
+
+    def worker_id(self) -> str:
+        """현재 스레드의 워커 ID (호스트:프로세스:스레드)"""
+        return f"{self.worker_prefix}:{threading.get_ident()}"
+
+    def _row_to_record(self, row: sqlite3.Row) -> SegmentRecord:
+        return SegmentRecord(
+            job_id=row["job_id"],
+            seq=row["seq"],
+            unit_id=row["unit_id"],
+            section_type=row["section_type"] or "",
+            source_text=row["source_text"],
+            status=row["status"],
+            translation=row["translation"],
+            meta=json.loads(row["meta"]) if row["meta"] else {},
+            attempts=row["attempts"],
+            error=row["error"]
+        )
+
+    # ---- 작업 ----
+
+    def open_job(self, job_id: str, input_path: str = "", **options) -> bool:
+        """작업 등록. 이미 있는 작업이면 재개 (True 반환)"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT status FROM jobs WHERE job_id = ?', (job_id,))
+            row = cursor.fetchone()
+            if row:
+                cursor.execute('''
+                UPDATE jobs SET status = 'running', updated_at = CURRENT_TIMESTAMP WHERE job_id = ?
+                ''', (job_id,))
+                self._release_dead_leases(cursor, job_id)
+            else:
+                cursor.execute('''
+                INSERT INTO jobs (job_id, input_path, options) VALUES (?, ?, ?)
+                ''', (job_id, input_path, json.dumps(options, ensure_ascii=False)))
+            self.conn.commit()
+        return row is not None
+
+    def _release_dead_leases(self, cursor, job_id: str):
+        """이 호스트에서 종료된 프로세스가 점유한 세그먼트를 즉시 대기 상태로 (점유 만료를 기다리지 않음)"""
+        cursor.execute('''
+        SELECT DISTINCT lease_owner FROM segments WHERE job_id = ? AND status = 'translating'
+        ''', (job_id,))
+        for (owner,) in cursor.fetchall():
+            host, _, rest = (owner or "").partition(":")
+            pid = rest.split(":", 1)[0]
+            if host != socket.gethostname() or not pid.isdigit():
+                continue
+            if int(pid) == os.getpid() or not _process_alive(int(pid)):
+                cursor.execute('''
+                UPDATE segments SET status = 'pending', lease_owner = NULL, lease_expires = NULL
+                WHERE job_id = ? AND lease_owner = ? AND status = 'translating'
+                ''', (job_id, owner))
+
+    def finish_job(self, job_id: str, output_path: str = ""):
+        """출력 저장 완료: 모든 세그먼트를 saved로 표시"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            UPDATE segments SET status = 'saved', updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND status IN ('translated', 'qa_checked')
+            ''', (job_id,))
+            cursor.execute('''
+            UPDATE jobs SET status = 'done', output_path = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+            ''', (output_path, job_id))
+            self.conn.commit()
+
+    def list_jobs(self, unfinished_only: bool = True) -> List[Dict]:
+        """작업 목록과 세그먼트 상태별 개수"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            query = 'SELECT * FROM jobs'
+            if unfinished_only:
+                query += " WHERE status != 'done'"
+            cursor.execute(query + ' ORDER BY updated_at DESC')
+            jobs = [dict(row) for row in cursor.fetchall()]
+        for job in jobs:
+            job["progress"] = self.progress(job["job_id"])
+        return jobs
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        """세그먼트 상태별 개수"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            SELECT status, COUNT(*) FROM segments WHERE job_id = ? GROUP BY status
+            ''', (job_id,))
+            counts = dict(cursor.fetchall())
+        return {state: counts.get(state, 0) for state in SEGMENT_STATES}
+
+    # ---- 세그먼트 ----
+
+    def add_segment(self, job_id: str, seq: int, unit_id: str, section_type: str,
+                    source_text: str) -> SegmentRecord:
+        """세그먼트 등록 (이미 있으면 저장된 상태 그대로) 후 레코드 반환"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            INSERT OR IGNORE INTO segments (job_id, seq, unit_id, section_type, source_text)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (job_id, seq, unit_id, section_type, source_text))
+            self.conn.commit()
+        return self.get_segment(job_id, unit_id)
+
+    def get_segment(self, job_id: str, unit_id: str) -> Optional[SegmentRecord]:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT * FROM segments WHERE job_id = ? AND unit_id = ?', (job_id, unit_id))
+            row = cursor.fetchone()
+        return self._row_to_record(row) if row else None
+
+    def segments(self, job_id: str) -> List[SegmentRecord]:
+        """작업의 세그먼트 (문서 순서)"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT * FROM segments WHERE job_id = ? ORDER BY seq', (job_id,))
+            rows = cursor.fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def lease_segment(self, job_id: str, unit_id: str, worker_id: Optional[str] = None) -> bool:
+        """특정 세그먼트 점유 (대기 중이거나 점유 시간이 지난 경우에만 성공)"""
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            UPDATE segments
+            SET status = 'translating', lease_owner = ?, lease_expires = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND unit_id = ?
+              AND (status = 'pending' OR (status = 'translating' AND lease_expires < ?))
+            ''', (worker_id or self.worker_id(), now + self.lease_seconds, job_id, unit_id, now))
+            self.conn.commit()
+            return cursor.rowcount == 1
+
+    def lease(self, job_id: str, limit: int = 1, worker_id: Optional[str] = None) -> List[SegmentRecord]:
+        """대기 중인(또는 점유 시간이 지난) 세그먼트를 문서 순서로 최대 limit개 점유"""
+        now = time.time()
+        token = f"{worker_id or self.worker_id()}:{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            UPDATE segments
+            SET status = 'translating', lease_owner = ?, lease_expires = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE rowid IN (
+                SELECT rowid FROM segments
+                WHERE job_id = ? AND (status = 'pending' OR (status = 'translating' AND lease_expires < ?))
+                ORDER BY seq LIMIT ?
+            )
+            ''', (token, now + self.lease_seconds, job_id, now, limit))
+            self.conn.commit()
+            cursor.execute('''
+            SELECT * FROM segments WHERE job_id = ? AND lease_owner = ? AND status = 'translating' ORDER BY seq
+            ''', (job_id, token))
+            rows = cursor.fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def complete(self, job_id: str, unit_id: str, translation: str, meta: Optional[Dict] = None):
+        """번역 완료 기록
+
+        점유 시간이 지나 다른 워커가 가져간 경우에도 먼저 끝난 번역을 저장한다 (LLM 비용 재사용).
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            UPDATE segments
+            SET status = 'translated', translation = ?, meta = ?, lease_owner = NULL, lease_expires = NULL,
+                error = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND unit_id = ? AND status IN ('pending', 'translating')
+            ''', (translation, json.dumps(meta or {}, ensure_ascii=False), job_id, unit_id))
+            self.conn.commit()
+
+    def fail(self, job_id: str, unit_id: str, error: str):
+        """번역 실패: 대기 상태로 되돌리고 시도 횟수 증가"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            UPDATE segments
+            SET status = 'pending', lease_owner = NULL, lease_expires = NULL, error = ?,
+                attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND unit_id = ? AND status = 'translating'
+            ''', (error, job_id, unit_id))
+            self.conn.commit()
+
+    def mark_qa_checked(self, job_id: str, qa_results: Dict[str, Dict]):
+        """QA 결과 기록 (unit_id → QA 요약). 세그먼트 meta의 qa 항목에 저장"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            for unit_id, qa in qa_results.items():
+                cursor.execute('SELECT meta FROM segments WHERE job_id = ? AND unit_id = ?', (job_id, unit_id))
+                row = cursor.fetchone()
+                if row is None:
+                    continue
+                meta = json.loads(row["meta"]) if row["meta"] else {}
+                meta["qa"] = qa
+                cursor.execute('''
+                UPDATE segments SET status = 'qa_checked', meta = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ? AND unit_id = ? AND status IN ('translated', 'qa_checked')
+                ''', (json.dumps(meta, ensure_ascii=False), job_id, unit_id))
+            self.conn.commit()
+
+    # ---- 사람 검수 큐 ----
+
+    def add_human_review(self, thread_id: str, source_text: str, translation: str,
+                         feedback: str = "", reason: str = "", meta: Optional[Dict] = None) -> int:
+        """사람 검수 항목 등록. 항목 ID 반환"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            INSERT INTO human_review (thread_id, source_text, translation, feedback, reason, meta)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (thread_id, source_text, translation, feedback, reason,
+                  json.dumps(meta or {}, ensure_ascii=False)))
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def list_human_reviews(self, status: str = "open") -> List[Dict]:
+        """사람 검수 항목 목록 (오래된 순)"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT * FROM human_review WHERE status = ? ORDER BY id', (status,))
+            rows = cursor.fetchall()
+        items = [dict(row) for row in rows]
+        for item in items:
+            item["meta"] = json.loads(item["meta"]) if item["meta"] else {}
+        return items
+
+    def resolve_human_review(self, review_id: int):
+        """사람 검수 완료 처리"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("UPDATE human_review SET status = 'resolved' WHERE id = ?", (review_id,))
+            self.conn.commit()
+
+    def close(self):
+        """연결 종료"""
+        if self.conn:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    # 테스트
+    queue = JobQueue("data/test_jobs.db", lease_seconds=1)
+    job_id = job_key("1. A method.\n2. The method of claim 1.", use_self_review=True)
+    print(f"작업 {job_id} 재개: {queue.open_job(job_id, 'sample.txt')}")
+
+    queue.add_segment(job_id, 0, "claim-1", "claims", "1. A method.")
+    queue.add_segment(job_id, 1, "claim-2", "claims", "2. The method of claim 1.")
+    leased = queue.lease(job_id, limit=2)
+    print(f"점유: {[s.unit_id for s in leased]}")
+    queue.complete(job_id, "claim-1", "1. 방법.")
+
+    time.sleep(1.1)  # claim-2 점유 시간 만료 → 다시 점유 가능
+    print(f"재점유: {[s.unit_id for s in queue.lease(job_id)]}")
+    print(queue.progress(job_id))
+    queue.close()
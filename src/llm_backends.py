@@ -0,0 +1,487 @@
+"""
+LLM 백엔드
+- LLMBackend: 번역기/분석기용 generate_content 클라이언트와 LangGraph 에이전트용 채팅 모델을 제공하는 인터페이스
+- GeminiBackend: google-generativeai / langchain-google-genai (기본). 응답을 JSONL로 기록 가능
+- FakeBackend: 오프라인 부하 테스트용 로컬 백엔드
+    - 기록된 응답 재생(프롬프트 해시 기준) 또는 프롬프트에서 원문을 찾아 합성 번역 생성
+    - 지연 시간 분포, 오류율, 분당 요청 수 제한(초과 시 429 오류)을 설정 가능
+    - 같은 seed와 같은 호출 순서면 같은 결과 (결정적)
+- 설정: config/api_config.yaml의 llm 섹션, 환경 변수 LLM_BACKEND로 백엔드 선택 덮어쓰기
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "api_config.yaml"
+
+
+def _clients():
+    """llm_clients (load_env, require_api_key) — 순환 임포트를 피하려고 사용 시점에 임포트"""
+    try:
+        from . import llm_clients
+    except ImportError:
+        import llm_clients
+    return llm_clients
+
+
+def prompt_key(prompt: str) -> str:
+    """응답 기록/재생용 프롬프트 키"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def prompt_text(prompt) -> str:
+    """채팅 모델 입력(PromptValue, 메시지 목록, 문자열)을 하나의 문자열로 변환"""
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    from langchain_core.messages import get_buffer_string
+    return get_buffer_string(list(prompt))
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (영문 약 4자, 한글 약 2자당 1토큰)"""
+    hangul = sum(1 for ch in text if '가' <= ch <= '힣')
+    return max(1, (len(text) - hangul) // 4 + hangul // 2)
+
+
+class LLMBackend:
+    """LLM 백엔드 인터페이스"""
+
+    name = ""
+
+    def check_credentials(self):
+        """필요한 자격 증명 확인 (없으면 ValueError)"""
+
+    def generation_config(self, **options):
+        """generate_content에 전달할 생성 설정"""
+        return options
+
+    def generative_model(self, model: str):
+        """generate_content(prompt, generation_config=None, stream=False)를 제공하는 클라이언트"""
+        raise NotImplementedError
+
+    def chat_model(self, model: str):
+        """LangChain 채팅 모델 (prompt | model로 연결되는 Runnable)"""
+        raise NotImplementedError
+
+
+class ResponseRecorder:
+    """프롬프트/응답을 JSONL로 기록 (FakeBackend의 replay_path로 재생)"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def write(self, prompt: str, model: str, text: str):
+        record = {"key": prompt_key(prompt), "model": model, "text": text}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class _RecordingStream:
+    """스트리밍 응답을 그대로 전달하면서 끝까지 받은 경우에만 기록"""
+
+    def __init__(self, response, on_complete: Callable[[str], None]):
+        self._response = response
+        self._on_complete = on_complete
+
+    def __iter__(self):
+        parts = []
+        for chunk in self._response:
+            parts.append(chunk.text)
+            yield chunk
+        self._on_complete("".join(parts))
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class _RecordingGenerativeModel:
+    def __init__(self, inner, model: str, recorder: ResponseRecorder):
+        self._inner = inner
+        self._model = model
+        self._recorder = recorder
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        response = self._inner.generate_content(prompt, generation_config=generation_config, stream=stream)
+        if stream:
+            return _RecordingStream(response, lambda text: self._recorder.write(prompt, self._model, text))
+        self._recorder.write(prompt, self._model, response.text)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini (google-generativeai, langchain-google-genai)"""
+
+    name = "gemini"
+
+    def __init__(self, record_path: Optional[str] = None):
+        """
+        Args:
+            record_path: 지정하면 모든 응답을 JSONL로 기록 (FakeBackend의 replay_path로 재생)
+        """
+        self.recorder = ResponseRecorder(record_path) if record_path else None
+
+    def check_credentials(self):
+        _clients().require_api_key()
+
+    def generation_config(self, **options):
+        import google.generativeai as genai
+        return genai.types.GenerationConfig(**options)
+
+    def generative_model(self, model: str):
+        import google.generativeai as genai
+        genai.configure(api_key=_clients().require_api_key())
+        client = genai.GenerativeModel(model)
+        if self.recorder:
+            client = _RecordingGenerativeModel(client, model, self.recorder)
+        return client
+
+    def chat_model(self, model: str):
+        _clients().load_env()
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(model=model)
+        if not self.recorder:
+            return llm
+
+        from langchain_core.runnables import RunnableLambda
+        recorder = self.recorder
+
+        def invoke(prompt):
+            message = llm.invoke(prompt)
+            recorder.write(prompt_text(prompt), model, message.content)
+            return message
+
+        async def ainvoke(prompt):
+            message = await llm.ainvoke(prompt)
+            recorder.write(prompt_text(prompt), model, message.content)
+            return message
+
+        return RunnableLambda(invoke, afunc=ainvoke, name=f"recorded-{model}")
+
+
+class LatencyModel:
+    """응답 지연 시간 분포
+
+    distribution:
+        fixed: seconds
+        uniform: low ~ high
+        normal: 평균 seconds, 표준편차 sigma (0 미만은 0)
+        lognormal: 중앙값 seconds, 로그 표준편차 sigma (긴 꼬리)
+        exponential: 평균 seconds
+    per_1k_output_tokens: 출력 1000토큰당 추가 시간 (생성 속도)
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, distribution: str = "fixed", seconds: float = 0.0, sigma: float = 0.5,
+                 low: float = 0.0, high: float = 0.0, per_1k_output_tokens: float = 0.0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"지원하지 않는 지연 분포: {distribution} ({', '.join(self.DISTRIBUTIONS)})")
+        self.distribution = distribution
+        self.seconds = seconds
+        self.sigma = sigma
+        self.low = low
+        self.high = high
+        self.per_1k_output_tokens = per_1k_output_tokens
+
+    @classmethod
+    def from_config(cls, config) -> "LatencyModel":
+        """숫자(고정 지연) 또는 {distribution, seconds, sigma, low, high, per_1k_output_tokens}"""
+        if config is None:
+            return cls()
+        if isinstance(config, (int, float)):
+            return cls("fixed", float(config))
+        return cls(**config)
+
+    def sample(self, rng: random.Random, output_tokens: int = 0) -> float:
+        if self.distribution == "fixed":
+            base = self.seconds
+        elif self.distribution == "uniform":
+            base = rng.uniform(self.low, self.high)
+        elif self.distribution == "normal":
+            base = max(0.0, rng.gauss(self.seconds, self.sigma))
+        elif self.distribution == "lognormal":
+            base = self.seconds * math.exp(self.sigma * rng.gauss(0.0, 1.0))
+        else:
+            base = rng.expovariate(1.0 / self.seconds) if self.seconds > 0 else 0.0
+        return base + self.per_1k_output_tokens * output_tokens / 1000
+
+
+class FakeLLMError(Exception):
+    """FakeBackend가 발생시킨 모의 API 오류"""
+
+
+class FakeRateLimitError(FakeLLMError):
+    """FakeBackend 분당 요청 수 초과 (429 모의)"""
+
+
+_TERM_ROW = re.compile(r'^\| *([^|\n]+?) *\| *([^|\n]+?) *\| *절대 준수 *\|$', re.MULTILINE)
+_TOKEN = re.compile(r'<[^>]+>|\d+[A-Za-z]?|[A-Za-z]+|\s+|.', re.DOTALL)
+_DROPPED_WORDS = {"a", "an"}
+_ANAPHORA_WORDS = {"the", "said"}
+
+
+def _between(text: str, start: str, end: str) -> Optional[str]:
+    i = text.find(start)
+    if i < 0:
+        return None
+    i += len(start)
+    j = text.find(end, i)
+    return text[i:j if j >= 0 else len(text)]
+
+
+def pseudo_translate(source: str, term_mapping: Optional[Dict[str, str]] = None) -> str:
+    """결정적 모의 번역: 줄 구조, 숫자/참조부호, 서식 태그, 문장부호는 유지하고
+    용어집 용어는 지정된 번역어로, 나머지 단어는 해시 기반 한글 음절로 바꾼다."""
+    text = source
+    # 긴 용어부터 치환 (다단어 용어 우선)
+    for eng, kor in sorted((term_mapping or {}).items(), key=lambda item: -len(item[0])):
+        text = re.sub(rf'\b{re.escape(eng)}\b', f'\x00{kor}\x00', text, flags=re.IGNORECASE)
+
+    out = []
+    for i, part in enumerate(text.split('\x00')):
+        if i % 2:  # 용어집 번역어
+            out.append(part)
+            continue
+        dropped = False
+        for token in _TOKEN.findall(part):
+            word = token.lower()
+            if dropped and token.isspace():  # 생략한 관사 뒤 공백도 생략
+                dropped = False
+                continue
+            dropped = False
+            if not token.isalpha() or not token.isascii():
+                out.append(token)
+            elif word in _DROPPED_WORDS:
+                dropped = True
+            elif word in _ANAPHORA_WORDS:
+                out.append("상기")
+            else:
+                code = zlib.crc32(word.encode("utf-8"))
+                out.append(chr(0xAC00 + code % 11172) + chr(0xAC00 + (code >> 14) % 11172))
+    return "".join(out)
+
+
+def _respond_translation(prompt: str) -> Optional[str]:
+    """PatentTranslator.build_translation_prompt"""
+    source = _between(prompt, "**번역 대상 텍스트:**\n\n", "\n---\n")
+    if source is None:
+        return None
+    return pseudo_translate(source.strip(), dict(_TERM_ROW.findall(prompt)))
+
+
+def _respond_self_review(prompt: str) -> Optional[str]:
+    """PatentTranslator.translate_with_self_review: 원 번역 승인"""
+    if "품질 검수 전문가" not in prompt:
+        return None
+    draft = _between(prompt, "## 번역문\n", "\n\n## 필수 용어집")
+    return draft.strip() if draft is not None else None
+
+
+def _respond_document_analysis(prompt: str) -> Optional[str]:
+    """DocumentAnalyzer.analyze_with_gemini"""
+    if "Provide your analysis in a structured JSON format" not in prompt:
+        return None
+    return json.dumps({"key_terms": [], "document_type": "claim",
+                       "repeated_phrases": [], "domain_specific_terms": {}})
+
+
+def _respond_graph_analyst(prompt: str) -> Optional[str]:
+    """agents: analyst.prompt"""
+    if "master patent analyst" not in prompt:
+        return None
+    return json.dumps({"domain": "general technology", "term_mapping": {}})
+
+
+def _respond_graph_reviewer(prompt: str) -> Optional[str]:
+    """agents: reviewer.prompt"""
+    if "**Korean Translation:**" not in prompt:
+        return None
+    return json.dumps({"passed": True, "feedback": "No critical errors found (fake reviewer)."})
+
+
+def _respond_graph_translator(prompt: str) -> Optional[str]:
+    """agents: translator.prompt"""
+    source = _between(prompt, "**English Text:**\n`", "`")
+    return pseudo_translate(source) if source is not None else None
+
+
+DEFAULT_RESPONDERS: List[Callable[[str], Optional[str]]] = [
+    _respond_translation,
+    _respond_self_review,
+    _respond_document_analysis,
+    _respond_graph_analyst,
+    _respond_graph_reviewer,
+    _respond_graph_translator,
+]
+
+
+class _FakeResponse:
+    """google-generativeai 응답 형태 (text, usage_metadata, 스트리밍 청크)"""
+
+    def __init__(self, text: str, prompt_tokens: int, output_tokens: int, chunk_chars: int = 64):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(prompt_token_count=prompt_tokens,
+                                              candidates_token_count=output_tokens)
+        self._chunk_chars = chunk_chars
+
+    def __iter__(self):
+        for i in range(0, max(len(self.text), 1), self._chunk_chars):
+            yield SimpleNamespace(text=self.text[i:i + self._chunk_chars])
+
+
+class _FakeGenerativeModel:
+    def __init__(self, backend: "FakeBackend", model: str):
+        self.backend = backend
+        self.model_name = model
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        text, prompt_tokens, output_tokens = self.backend.complete(str(prompt), self.model_name)
+        return _FakeResponse(text, prompt_tokens, output_tokens)
+
+
+class FakeBackend(LLMBackend):
+    """오프라인 부하 테스트용 로컬 백엔드"""
+
+    name = "fake"
+
+    def __init__(self, latency=None, error_rate: float = 0.0,
+                 requests_per_minute: Optional[float] = None, replay_path: Optional[str] = None,
+                 replay_only: bool = False, seed: Optional[int] = 0,
+                 responders: Optional[List[Callable[[str], Optional[str]]]] = None):
+        """
+        Args:
+            latency: LatencyModel, 숫자(고정 초) 또는 LatencyModel 설정 dict
+            error_rate: 모의 API 오류(FakeLLMError) 발생 확률 (0~1)
+            requests_per_minute: 최근 60초 요청 수가 이 값을 넘으면 FakeRateLimitError
+            replay_path: GeminiBackend(record_path)로 기록한 JSONL (프롬프트가 같으면 기록된 응답 반환)
+            replay_only: 기록에 없는 프롬프트는 합성하지 않고 FakeLLMError
+            seed: 지연/오류 난수 시드 (None이면 비결정적)
+            responders: 프롬프트 → 응답(해당 없으면 None) 함수 목록 (기본: 저장소의 프롬프트 형식)
+        """
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError(f"오류율은 0~1 사이여야 합니다: {error_rate}")
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel.from_config(latency)
+        self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.replay_only = replay_only
+        self.responders = responders if responders is not None else DEFAULT_RESPONDERS
+        self.replay: Dict[str, str] = {}
+        if replay_path:
+            with open(replay_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.replay[record["key"]] = record["text"]
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()  # 최근 60초 요청 시각
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "replayed": 0,
+                      "prompt_tokens": 0, "output_tokens": 0}
+
+    def generative_model(self, model: str):
+        return _FakeGenerativeModel(self, model)
+
+    def chat_model(self, model: str):
+        from langchain_core.messages import AIMessage
+        from langchain_core.runnables import RunnableLambda
+
+        def to_message(result: Tuple[str, int, int]) -> AIMessage:
+            text, prompt_tokens, output_tokens = result
+            return AIMessage(content=text, usage_metadata={
+                "input_tokens": prompt_tokens, "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            })
+
+        def invoke(prompt):
+            return to_message(self.complete(prompt_text(prompt), model))
+
+        async def ainvoke(prompt):
+            return to_message(await self.acomplete(prompt_text(prompt), model))
+
+        return RunnableLambda(invoke, afunc=ainvoke, name=f"fake-{model}")
+
+    def complete(self, prompt: str, model: str = "") -> Tuple[str, int, int]:
+        """응답 생성 (지연 시간만큼 대기). Returns: (텍스트, 입력 토큰, 출력 토큰)"""
+        result, delay = self._prepare(prompt)
+        time.sleep(delay)
+        return result
+
+    async def acomplete(self, prompt: str, model: str = "") -> Tuple[str, int, int]:
+        """비동기 complete (이벤트 루프를 막지 않음)"""
+        result, delay = self._prepare(prompt)
+        await asyncio.sleep(delay)
+        return result
+
+    def _prepare(self, prompt: str):
+        """속도 제한/오류 판정, 응답과 지연 시간 결정 (예외는 지연 전에 즉시 발생)"""
+        now = time.monotonic()
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.requests_per_minute:
+                while self._window and now - self._window[0] >= 60.0:
+                    self._window.popleft()
+                if len(self._window) >= self.requests_per_minute:
+                    self.stats["rate_limited"] += 1
+                    raise FakeRateLimitError(
+                        f"429 Resource exhausted (fake): 분당 {self.requests_per_minute:g}회 초과")
+                self._window.append(now)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                raise FakeLLMError("500 Internal error (fake)")
+
+            text = self.replay.get(prompt_key(prompt)) if self.replay else None
+            if text is not None:
+                self.stats["replayed"] += 1
+            elif self.replay_only:
+                self.stats["errors"] += 1
+                raise FakeLLMError("기록된 응답이 없는 프롬프트입니다 (replay_only)")
+            else:
+                text = self._synthesize(prompt)
+
+            prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["output_tokens"] += output_tokens
+            delay = self.latency.sample(self._rng, output_tokens)
+        return (text, prompt_tokens, output_tokens), delay
+
+    def _synthesize(self, prompt: str) -> str:
+        for responder in self.responders:
+            text = responder(prompt)
+            if text is not None:
+                return text
+        return pseudo_translate(prompt.strip().splitlines()[-1] if prompt.strip() else "")
+
+
+def backend_from_config(config_path: Path = CONFIG_PATH) -> LLMBackend:
+    """config의 llm 섹션으로 백엔드 생성 (환경 변수 LLM_BACKEND가 backend 설정보다 우선)"""
+    config = {}
+    if Path(config_path).exists():
+        import yaml
+        config = (yaml.safe_load(Path(config_path).read_text(encoding="utf-8")) or {}).get("llm", {}) or {}
+
+    name = os.getenv("LLM_BACKEND") or config.get("backend", "gemini")
+    if name == "gemini":
+        return GeminiBackend(record_path=config.get("record_path"))
+    if name == "fake":
+        return FakeBackend(**(config.get("fake") or {}))
+    raise ValueError(f"지원하지 않는 LLM 백엔드: {name} (gemini, fake)")
@@ -0,0 +1,108 @@
+"""
+LLM 클라이언트 레지스트리
+- 공급자(provider)별 클라이언트 생성 함수를 등록하고, 처음 사용할 때 생성
+- 생성된 클라이언트는 (공급자, 모델)별로 캐시하여 프로세스 안에서 재사용
+- .env 로드와 API SDK 임포트를 첫 사용 시점까지 미룸 (LLM이 필요 없는 CLI 명령의 시작 시간 단축)
+- 기본 공급자("gemini", "langchain-gemini")는 현재 LLM 백엔드(llm_backends)에서 클라이언트를 받음
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from . import llm_backends
+except ImportError:
+    import llm_backends
+
+_factories: Dict[str, Callable[[str], Any]] = {}
+_clients: Dict[Tuple[str, str], Any] = {}
+_lock = threading.Lock()
+_env_loaded = False
+_backend: Optional["llm_backends.LLMBackend"] = None
+_backend_lock = threading.Lock()  # get_client가 _lock을 잡은 채 팩토리에서 백엔드를 조회하므로 별도 잠금
+
+
+def load_env():
+    """.env 파일 로드 (프로세스당 한 번)"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def require_api_key(name: str = "GOOGLE_API_KEY") -> str:
+    """API 키 조회 (.env 포함, 없으면 ValueError)"""
+    load_env()
+    api_key = os.getenv(name)
+    if not api_key:
+        raise ValueError(f"{name} 환경 변수를 설정해야 합니다.")
+    return api_key
+
+
+def register_provider(name: str, factory: Callable[[str], Any]):
+    """공급자 등록. factory(model) -> 클라이언트. 같은 이름으로 다시 등록하면 캐시된 클라이언트를 버림"""
+    with _lock:
+        _factories[name] = factory
+        for key in [key for key in _clients if key[0] == name]:
+            del _clients[key]
+
+
+def get_client(provider: str, model: str) -> Any:
+    """(공급자, 모델)별 클라이언트 (처음 요청 시 생성, 이후 캐시 재사용, 스레드 안전)"""
+    key = (provider, model)
+    with _lock:
+        if key not in _clients:
+            if provider not in _factories:
+                raise ValueError(f"등록되지 않은 LLM 공급자: {provider} (등록: {', '.join(sorted(_factories))})")
+            _clients[key] = _factories[provider](model)
+        return _clients[key]
+
+
+def clear_clients():
+    """캐시된 클라이언트 모두 제거 (API 키 변경 후 등)"""
+    with _lock:
+        _clients.clear()
+
+
+def active_backend() -> "llm_backends.LLMBackend":
+    """현재 LLM 백엔드 (처음 사용 시 config/api_config.yaml의 llm 섹션과 LLM_BACKEND 환경 변수로 생성)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = llm_backends.backend_from_config()
+        return _backend
+
+
+def use_backend(backend: "llm_backends.LLMBackend") -> Optional["llm_backends.LLMBackend"]:
+    """LLM 백엔드 교체 (캐시된 클라이언트 제거). Returns: 이전 백엔드"""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    clear_clients()
+    return previous
+
+
+def check_credentials():
+    """현재 백엔드의 자격 증명 확인 (없으면 ValueError)"""
+    active_backend().check_credentials()
+
+
+def generation_config(**options):
+    """현재 백엔드용 생성 설정 (max_output_tokens, temperature, top_p 등)"""
+    return active_backend().generation_config(**options)
+
+
+def _gemini_client(model: str):
+    """generate_content 클라이언트 (translator, analyzer)"""
+    return active_backend().generative_model(model)
+
+
+def _langchain_gemini_client(model: str):
+    """LangChain 채팅 모델 (LangGraph 에이전트)"""
+    return active_backend().chat_model(model)
+
+
+register_provider("gemini", _gemini_client)
+register_provider("langchain-gemini", _langchain_gemini_client)
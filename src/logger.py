@@ -3,53 +3,416 @@
 - 파일 기반 상세 로그
 - 콘솔 출력
 - 단계별 추적
+- 단계별 소요 시간/토큰 측정 (span) → JSON Lines + 작업별 요약
+- 비동기 기록: 로그 호출은 큐에 넣기만 하고, 파일/콘솔 출력은 QueueListener 스레드가 처리
+- 크기/시간 기준 로그 파일 교체, JSON 형식, 작업 ID/섹션 ID 자동 기록
 """
 
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+# 현재 작업/단계 (스레드, asyncio 태스크별로 분리됨)
+_current_job: contextvars.ContextVar[Optional["JobTrace"]] = contextvars.ContextVar("job_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+# 로그 레코드에 추가할 필드 (job_id, section_id 등)
+_log_context: contextvars.ContextVar[Dict] = contextvars.ContextVar("log_context", default={})
+
+LOGGER_NAME = "PatentTranslation"
+METRICS_LOGGER_NAME = "PatentTranslation.metrics"
+CONTEXT_FIELDS = ("job_id", "section_id")
+
+
+class Span:
+    """한 단계의 소요 시간과 토큰 수"""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attrs: Optional[Dict] = None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent = parent
+        self.attrs = dict(attrs or {})
+        self.started_at = time.time()
+        self.seconds = 0.0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.error: Optional[str] = None
+
+    def add_tokens(self, prompt_tokens: int = 0, output_tokens: int = 0):
+        """토큰 수 추가 (상위 단계에도 합산)"""
+        span = self
+        while span is not None:
+            span.prompt_tokens += prompt_tokens
+            span.output_tokens += output_tokens
+            span = span.parent
+
+    def set(self, **attrs):
+        """속성 추가 (모델명, 세그먼트 ID, 결과 등)"""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="milliseconds"),
+            "seconds": round(self.seconds, 6),
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class JobTrace:
+    """작업 하나의 단계 기록 (여러 스레드에서 추가될 수 있음)"""
+
+    def __init__(self, job_id: str, attrs: Optional[Dict] = None):
+        self.job_id = job_id
+        self.attrs = dict(attrs or {})
+        self.started_at = time.time()
+        self.wall_seconds = 0.0
+        self.spans: List[Span] = []
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def add_tokens(self, prompt_tokens: int, output_tokens: int):
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+
+    def summary(self) -> Dict:
+        """단계 이름별 집계 (횟수, 합계/평균/최대 시간, 작업 시간 대비 비율, 토큰)
+
+        단계는 중첩되므로(translation ⊃ llm_call) 비율의 합은 1을 넘을 수 있다.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        stages: Dict[str, Dict] = {}
+        for span in spans:
+            stage = stages.setdefault(span.name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                                  "errors": 0, "prompt_tokens": 0, "output_tokens": 0})
+            stage["count"] += 1
+            stage["seconds"] += span.seconds
+            stage["max_seconds"] = max(stage["max_seconds"], span.seconds)
+            stage["errors"] += span.error is not None
+            stage["prompt_tokens"] += span.prompt_tokens
+            stage["output_tokens"] += span.output_tokens
+        for stage in stages.values():
+            stage["mean_seconds"] = round(stage["seconds"] / stage["count"], 6)
+            stage["share"] = round(stage["seconds"] / self.wall_seconds, 4) if self.wall_seconds else 0.0
+            stage["seconds"] = round(stage["seconds"], 6)
+            stage["max_seconds"] = round(stage["max_seconds"], 6)
+        return {
+            "job_id": self.job_id,
+            "attrs": self.attrs,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="milliseconds"),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "llm_calls": stages.get("llm_call", {}).get("count", 0),
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "error": self.error,
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["seconds"])),
+        }
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """단계 측정. 진행 중인 작업(TranslationLogger.job)이 없으면 기록되지 않는다.
+
+    Example:
+        with span("tm_search", domain=domain) as s:
+            matches = tm.search(text)
+            s.set(matches=len(matches))
+    """
+    current = Span(name, _current_span.get(), attrs)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        _current_span.reset(token)
+        job = _current_job.get()
+        if job is not None:
+            job.add(current)
+
+
+def record_tokens(prompt_tokens: int = 0, output_tokens: int = 0):
+    """LLM 응답의 토큰 수를 현재 단계(및 상위 단계)와 작업에 기록"""
+    current = _current_span.get()
+    if current is not None:
+        current.add_tokens(prompt_tokens, output_tokens)
+    job = _current_job.get()
+    if job is not None:
+        job.add_tokens(prompt_tokens, output_tokens)
+
+
+def current_job() -> Optional[JobTrace]:
+    """진행 중인 작업 (없으면 None)"""
+    return _current_job.get()
+
+
+def bind_context(func: Callable) -> Callable:
+    """현재 작업/단계를 다른 스레드에서 이어가도록 func를 감쌈 (ThreadPoolExecutor 등)"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # 같은 Context를 여러 스레드에서 동시에 실행할 수 없으므로 호출마다 복사
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+
+@contextmanager
+def log_context(**fields):
+    """블록 안의 로그 레코드에 필드 추가 (예: log_context(job_id=..., section_id=...))"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def current_log_context() -> Dict:
+    """현재 로그 컨텍스트. 명시한 값이 없으면 진행 중인 작업 ID와 섹션(span의 unit_id)을 사용"""
+    context = dict(_log_context.get())
+    job = _current_job.get()
+    if job is not None:
+        context.setdefault("job_id", job.job_id)
+    if "section_id" not in context:
+        current = _current_span.get()
+        while current is not None:
+            if "unit_id" in current.attrs:
+                context["section_id"] = current.attrs["unit_id"]
+                break
+            current = current.parent
+    return context
+
+
+class ContextFilter(logging.Filter):
+    """로그를 호출한 스레드의 컨텍스트(job_id, section_id 등)를 레코드에 기록
+
+    큐에 넣기 전(호출 스레드)에 실행되어야 하므로 QueueHandler에 붙인다.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = current_log_context()
+        for field in CONTEXT_FIELDS:
+            setattr(record, field, context.pop(field, None))
+        record.context = context
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그 (time, level, logger, message, job_id, section_id, thread, 기타 컨텍스트)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            data[field] = getattr(record, field, None)
+        data.update(getattr(record, "context", None) or {})
+        data["thread"] = record.threadName
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # 큐를 거치며 텍스트로 변환된 예외
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """사람이 읽는 형식 (작업/섹션 ID가 있으면 메시지 앞에 표시)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ids = "/".join(str(value) for value in (getattr(record, "job_id", None),
+                                                 getattr(record, "section_id", None)) if value)
+        record.ids = f"[{ids}] " if ids else ""
+        return super().format(record)
+
+
+class _NameFilter(logging.Filter):
+    """지정한 로거(및 하위 로거)의 레코드만 통과 (exclude=True면 제외)"""
+
+    def __init__(self, name: str, exclude: bool = False):
+        super().__init__(name)
+        self.exclude = exclude
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return super().filter(record) != self.exclude
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """message를 확정하고 예외를 텍스트로 바꿔 큐에 넣음 (서식은 리스너 쪽 핸들러가 적용)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            # traceback 객체는 스레드 간에 넘기지 않고 텍스트로 변환
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def _rotating_handler(path: Path, rotation: str, max_bytes: int, backup_count: int,
+                      when: str) -> logging.Handler:
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                    encoding="utf-8")
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backup_count,
+                                                         encoding="utf-8")
+    raise ValueError(f"지원하지 않는 로그 교체 방식: {rotation} (size, time)")
+
+
+# 프로세스에서 동작 중인 리스너 (새 TranslationLogger가 만들어지면 이전 리스너를 비우고 교체)
+_active_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def _replace_listener(listener: Optional[logging.handlers.QueueListener]):
+    global _active_listener
+    with _listener_lock:
+        previous, _active_listener = _active_listener, listener
+    if previous is not None:
+        previous.stop()  # 큐에 남은 레코드를 모두 기록한 뒤 종료
+        for handler in previous.handlers:
+            handler.close()
+    if listener is not None:
+        listener.start()
+
+
+def shutdown_logging():
+    """리스너 종료 (남은 로그 기록). 프로세스 종료 시 자동 호출"""
+    for name in (LOGGER_NAME, METRICS_LOGGER_NAME):
+        logging.getLogger(name).handlers.clear()
+    _replace_listener(None)
+
+
+atexit.register(shutdown_logging)
 
 
 class TranslationLogger:
-    """번역 시스템 전용 로거"""
+    """번역 시스템 전용 로거
+
+    로그 호출(info, span 기록 등)은 큐에 넣고 바로 반환하며, 파일/콘솔 출력은 별도 스레드
+    (QueueListener)에서 처리한다. 로그 파일은 실행마다 새로 만들지 않고 크기/시간 기준으로 교체한다.
+    """
 
-    def __init__(self, log_dir: str = "logs", console_level: int = logging.INFO):
+    def __init__(self, log_dir: str = "logs", console_level: int = logging.INFO,
+                 metrics_file: Optional[str] = "metrics.jsonl", log_file: str = "translation.log",
+                 file_level: int = logging.DEBUG, json_format: bool = True, rotation: str = "size",
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, when: str = "midnight"):
         """
         Args:
             log_dir: 로그 파일 저장 디렉토리
             console_level: 콘솔 출력 레벨
+            metrics_file: 단계 측정 결과(JSON Lines) 파일 이름 (log_dir 기준, None이면 기록 안 함)
+            log_file: 로그 파일 이름 (log_dir 기준)
+            file_level: 로그 파일 기록 레벨
+            json_format: 로그 파일을 한 줄 JSON으로 기록 (False면 텍스트)
+            rotation: 로그 파일 교체 기준 ("size": max_bytes 초과 시, "time": when 주기마다)
+            max_bytes: rotation="size"일 때 파일 최대 크기
+            backup_count: 보관할 이전 파일 수
+            when: rotation="time"일 때 주기 (TimedRotatingFileHandler 형식: "midnight", "H", "D" 등)
         """
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
-
-        # 로거 설정
-        self.logger = logging.getLogger("PatentTranslation")
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.handlers.clear()
-
-        # 파일 핸들러 (상세 로그)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = self.log_dir / f"translation_{timestamp}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / log_file
+        self.metrics_path = self.log_dir / metrics_file if metrics_file else None
+
+        # 실제 출력 핸들러 (리스너 스레드에서 실행)
+        file_handler = _rotating_handler(log_path, rotation, max_bytes, backup_count, when)
+        file_handler.setLevel(file_level)
+        file_handler.setFormatter(JsonFormatter() if json_format else TextFormatter(
+            '%(asctime)s | %(levelname)-8s | %(name)s | %(ids)s%(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
-
-        # 콘솔 핸들러 (요약 로그)
+        ))
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(console_level)
-        console_formatter = logging.Formatter('%(levelname)s: %(message)s')
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
-
-        self.current_log_file = log_file
-        self.logger.info(f"로거 초기화 완료 - 로그 파일: {log_file}")
+        console_handler.setFormatter(TextFormatter('%(levelname)s: %(ids)s%(message)s'))
+        handlers = [file_handler, console_handler]
+        for handler in handlers:
+            handler.addFilter(_NameFilter(METRICS_LOGGER_NAME, exclude=True))
+        if self.metrics_path is not None:
+            metrics_handler = _rotating_handler(self.metrics_path, rotation, max_bytes, backup_count, when)
+            metrics_handler.setFormatter(logging.Formatter('%(message)s'))
+            metrics_handler.addFilter(_NameFilter(METRICS_LOGGER_NAME))
+            handlers.append(metrics_handler)
+
+        # 로거에는 큐 핸들러만 연결 (호출 스레드는 큐에 넣기만 함)
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(logging.DEBUG)
+        self.metrics_logger = logging.getLogger(METRICS_LOGGER_NAME)
+        self.metrics_logger.setLevel(logging.INFO)
+        self.metrics_logger.propagate = False
+        for target in (self.logger, self.metrics_logger):
+            target.handlers.clear()
+            target.addHandler(queue_handler)
+
+        self._listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _replace_listener(self._listener)
+
+        self.current_log_file = log_path
+        self.last_summary: Optional[Dict] = None  # 마지막으로 끝난 작업의 요약
+        self.logger.info(f"로거 초기화 완료 - 로그 파일: {log_path}")
+
+    @classmethod
+    def from_config(cls, config_path: str = "config/api_config.yaml", **overrides) -> "TranslationLogger":
+        """config의 logging 섹션으로 생성 (file, level, format, rotation, max_bytes, backup_count, when,
+        metrics_file). overrides가 설정보다 우선"""
+        config = {}
+        if Path(config_path).exists():
+            import yaml
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = (yaml.safe_load(f) or {}).get("logging", {}) or {}
+
+        log_path = Path(config.get("file", "logs/translation.log"))
+        options = {
+            "log_dir": str(log_path.parent),
+            "log_file": log_path.name,
+            "file_level": logging.getLevelName(str(config.get("level", "DEBUG")).upper()),
+            "json_format": config.get("format", "json") == "json",
+            "rotation": config.get("rotation", "size"),
+            "max_bytes": int(config.get("max_bytes", 10 * 1024 * 1024)),
+            "backup_count": int(config.get("backup_count", 5)),
+            "when": config.get("when", "midnight"),
+        }
+        if "metrics_file" in config:
+            metrics_file = config["metrics_file"]
+            options["metrics_file"] = Path(metrics_file).name if metrics_file else None
+        options.update(overrides)
+        return cls(**options)
 
     def debug(self, message: str):
         """디버그 레벨 로그"""
@@ -181,16 +544,67 @@ class TranslationLogger:
         """섹션별 번역 로그"""
         self.logger.info(f"번역 중 ({current}/{total}): {section_type.upper()} - {doc_type}")
 
+    # 단계별 측정 (span)
+
+    @contextmanager
+    def job(self, job_id: Optional[str] = None, **attrs) -> Iterator[JobTrace]:
+        """작업 측정. 블록 안의 span이 모두 기록되고, 끝나면 span과 요약을 JSON Lines로 기록
+
+        이미 진행 중인 작업 안에서 호출하면 새 작업을 만들지 않고 그 작업을 이어간다
+        (섹션 번역 안의 문서 번역 등).
+        """
+        active = _current_job.get()
+        if active is not None:
+            yield active
+            return
+
+        trace = JobTrace(job_id or uuid.uuid4().hex[:12], attrs)
+        token = _current_job.set(trace)
+        start = time.perf_counter()
+        try:
+            yield trace
+        except BaseException as e:
+            trace.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            trace.wall_seconds = time.perf_counter() - start
+            _current_job.reset(token)
+            self.log_job_summary(trace)
+
+    def span(self, name: str, **attrs):
+        """단계 측정 (모듈 함수 span과 동일)"""
+        return span(name, **attrs)
+
+    def log_job_summary(self, trace: JobTrace) -> Dict:
+        """작업의 span과 요약을 metrics 파일에 기록하고 요약을 로그로 출력"""
+        summary = trace.summary()
+        self.last_summary = summary
+        if self.metrics_path is not None:
+            # 파일 기록은 리스너 스레드에서 (작업 스레드는 큐에 넣기만 함)
+            for s in trace.spans:
+                self.metrics_logger.info(json.dumps({"type": "span", "job_id": trace.job_id, **s.to_dict()},
+                                                    ensure_ascii=False, default=str))
+            self.metrics_logger.info(json.dumps({"type": "job_summary", **summary},
+                                                ensure_ascii=False, default=str))
+
+        self.logger.info(f"작업 {trace.job_id} 완료: {summary['wall_seconds']:.2f}초, "
+                         f"LLM 호출 {summary['llm_calls']}회, "
+                         f"토큰 {summary['prompt_tokens']}+{summary['output_tokens']}")
+        for name, stage in summary["stages"].items():
+            self.logger.debug(f"  {name}: {stage['count']}회, {stage['seconds']:.3f}초 "
+                              f"(평균 {stage['mean_seconds']:.3f}초, 최대 {stage['max_seconds']:.3f}초, "
+                              f"{stage['share']:.0%})")
+        return summary
+
     def get_log_file_path(self) -> Path:
         """현재 로그 파일 경로 반환"""
         return self.current_log_file
 
     def close(self):
-        """로거 종료"""
+        """로거 종료 (큐에 남은 로그를 모두 기록한 뒤 리스너 종료)"""
         self.logger.info("로거 종료")
-        for handler in self.logger.handlers:
-            handler.close()
-        self.logger.handlers.clear()
+        if _active_listener is self._listener:
+            shutdown_logging()
 
 
 # 전역 로거 인스턴스
@@ -0,0 +1,229 @@
+"""
+PDF 텍스트 추출 서비스 (docling)
+- 파일 내용 해시 기반 디스크 캐시 (페이지별 마크다운)
+- 변환기(DocumentConverter) 인스턴스를 프로세스 내에서 재사용
+- 페이지 범위 단위 스트리밍 변환
+- 페이지 경계에서 끊긴 문단/청구항/표는 다시 이어 붙임 (join_pages)
+  페이지별로 변환하면 문서 전체를 한 번에 export_to_markdown()하던 이전 방식과 달리
+  페이지 끝의 블록이 둘로 나뉘므로, 문장/표 행이 끝나지 않은 페이지는 다음 페이지의 첫 블록과 합친다.
+"""
+
+import json
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+# 변환 방식이 바뀌면 올려서 기존 캐시를 무효화
+EXTRACTOR_VERSION = "docling-md-1"
+
+_CONVERTER = None
+_CONVERTER_LOCK = threading.Lock()
+
+
+def get_converter():
+    """프로세스 전역 docling 변환기 (최초 호출 시 한 번만 생성)"""
+    global _CONVERTER
+    with _CONVERTER_LOCK:
+        if _CONVERTER is None:
+            try:
+                from docling.document_converter import DocumentConverter
+            except ImportError:
+                raise ImportError("PDF 변환에는 docling 패키지가 필요합니다: pip install docling")
+            _CONVERTER = DocumentConverter()
+        return _CONVERTER
+
+
+# 블록이 끝난 것으로 보는 마지막 글자 (문장 부호 뒤의 닫는 괄호/따옴표 허용)
+_BLOCK_END = re.compile(r'[.!?。][)\]"\'”’]*$')
+# 다음 페이지 첫 블록이 새 블록으로 시작하는 경우 (헤더, 표, 목록, 그림/주석, 문단 번호, 청구항 번호)
+_BLOCK_START = re.compile(r'^(#|\||[-*]\s|<!--|!\[|\[\d{4}\]|【\d{4}】|\d+\.\s)')
+
+
+def join_pages(page_texts: Iterable[str]) -> str:
+    """페이지별 마크다운을 하나의 문서로 연결
+
+    페이지 경계에서 블록이 이어지면 (마지막 줄이 문장 부호로 끝나지 않음) 다음 페이지의 첫 블록과
+    합치고, 두 페이지에 걸친 표는 행을 이어 하나의 표로 만든다. 그 외에는 빈 줄로 구분한다.
+    """
+    joined = ""
+    for text in page_texts:
+        text = text.strip()
+        if not text:
+            continue
+        if not joined:
+            joined = text
+            continue
+
+        last_line = joined.rsplit("\n", 1)[-1].strip()
+        first_line = text.split("\n", 1)[0].strip()
+        if last_line.startswith("|") and first_line.startswith("|"):
+            # 표가 다음 페이지로 이어짐
+            joined += "\n" + text
+        elif (last_line.startswith(("#", "|", "<!--", "![")) or _BLOCK_END.search(last_line)
+              or _BLOCK_START.match(first_line)):
+            joined += "\n\n" + text
+        else:
+            # 문단/청구항이 다음 페이지로 이어짐
+            joined += " " + text
+    return joined
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_page_range(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """'3-10', '5', '3-' 형식의 페이지 범위 문자열을 (시작, 끝) 튜플로 변환 (1부터 시작, 끝 포함)"""
+    if not value:
+        return None
+    start, sep, end = value.partition('-')
+    try:
+        first = int(start) if start.strip() else 1
+        last = (int(end) if end.strip() else 10 ** 9) if sep else first
+    except ValueError:
+        raise ValueError(f"잘못된 페이지 범위: {value} (예: 1-20)")
+    if first < 1 or last < first:
+        raise ValueError(f"잘못된 페이지 범위: {value} (예: 1-20)")
+    return first, last
+
+
+class PDFExtractionService:
+    """캐시를 사용하는 PDF → 마크다운 추출 서비스"""
+
+    def __init__(self, cache_dir: str = "data/pdf_cache", chunk_pages: int = 10):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리 (파일 해시별 하위 디렉토리에 페이지 저장)
+            chunk_pages: 캐시에 없는 페이지를 한 번에 변환할 페이지 수
+        """
+        self.cache_dir = Path(cache_dir)
+        self.chunk_pages = chunk_pages
+        # 마지막 iter_pages 호출 기준 통계
+        self.cache_hits = 0
+        self.converted_pages = 0
+
+    def _entry_dir(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.{EXTRACTOR_VERSION}"
+
+    def _load_meta(self, entry: Path) -> Optional[dict]:
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_meta(self, entry: Path, meta: dict):
+        entry.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry / "meta.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        tmp_path.replace(entry / "meta.json")
+
+    def _page_path(self, entry: Path, page_no: int) -> Path:
+        return entry / f"page_{page_no:05d}.md"
+
+    def _convert_pages(self, path: str, entry: Path, meta: dict, first: int, last: int):
+        """[first, last] 페이지를 변환하여 캐시에 저장. 전체 페이지 수를 meta에 기록"""
+        converter = get_converter()
+        with _CONVERTER_LOCK:
+            result = converter.convert(path, page_range=(first, last))
+
+        document = result.document
+        page_count = getattr(result.input, "page_count", None) or meta.get("page_count")
+        if page_count:
+            meta["page_count"] = page_count
+
+        for page_no in range(first, min(last, meta.get("page_count") or last) + 1):
+            text = document.export_to_markdown(page_no=page_no)
+            tmp_path = entry / f"page_{page_no:05d}.md.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            tmp_path.replace(self._page_path(entry, page_no))
+            self.converted_pages += 1
+
+        self._save_meta(entry, meta)
+
+    def iter_pages(self, path: str, page_range: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[int, str]]:
+        """(페이지 번호, 마크다운)을 페이지 순서대로 생성
+
+        캐시된 페이지는 바로 반환하고, 없는 페이지는 chunk_pages 단위로 변환하면서 반환한다.
+        """
+        self.cache_hits = 0
+        self.converted_pages = 0
+        digest = file_hash(path)
+        entry = self._entry_dir(digest)
+        entry.mkdir(parents=True, exist_ok=True)
+        meta = self._load_meta(entry) or {"source": str(path), "sha256": digest}
+
+        first, last = page_range or (1, 10 ** 9)
+        page_no = first
+        while True:
+            page_count = meta.get("page_count")
+            if page_count is not None and page_no > min(last, page_count):
+                break
+
+            page_path = self._page_path(entry, page_no)
+            if not page_path.exists():
+                chunk_last = min(last, page_no + self.chunk_pages - 1)
+                if page_count is not None:
+                    chunk_last = min(chunk_last, page_count)
+                # 이미 캐시된 페이지 직전까지만 변환
+                for cached_no in range(page_no + 1, chunk_last + 1):
+                    if self._page_path(entry, cached_no).exists():
+                        chunk_last = cached_no - 1
+                        break
+                self._convert_pages(path, entry, meta, page_no, chunk_last)
+                if not page_path.exists():
+                    # 페이지 수를 알 수 없는 변환 결과 → 더 이상 페이지 없음
+                    break
+            else:
+                self.cache_hits += 1
+
+            with open(page_path, 'r', encoding='utf-8') as f:
+                yield page_no, f.read()
+            page_no += 1
+
+    def extract(self, path: str, page_range: Optional[Tuple[int, int]] = None) -> str:
+        """PDF 전체(또는 페이지 범위)를 마크다운 텍스트로 추출 (페이지 경계에서 끊긴 블록은 연결)"""
+        return join_pages(text for _, text in self.iter_pages(path, page_range))
+
+    def is_cached(self, path: str) -> bool:
+        """문서의 모든 페이지가 캐시되어 있는지 여부"""
+        entry = self._entry_dir(file_hash(path))
+        meta = self._load_meta(entry)
+        if not meta or not meta.get("page_count"):
+            return False
+        return all(self._page_path(entry, n).exists() for n in range(1, meta["page_count"] + 1))
+
+
+_SERVICE = None
+
+
+def get_extraction_service(cache_dir: str = "data/pdf_cache") -> PDFExtractionService:
+    """프로세스 전역 추출 서비스 (GUI 재실행 간 변환기와 캐시 상태 유지)"""
+    global _SERVICE
+    if _SERVICE is None or _SERVICE.cache_dir != Path(cache_dir):
+        _SERVICE = PDFExtractionService(cache_dir)
+    return _SERVICE
+
+
+if __name__ == "__main__":
+    # 테스트
+    import sys
+
+    if len(sys.argv) < 2:
+        print("사용법: python pdf_extractor.py <파일.pdf> [페이지 범위]")
+        sys.exit(1)
+
+    service = get_extraction_service()
+    for page_no, text in service.iter_pages(sys.argv[1], parse_page_range(sys.argv[2] if len(sys.argv) > 2 else None)):
+        print(f"--- 페이지 {page_no} ({len(text)}자) ---")
+        print(text[:200])
+    print(f"\n캐시 적중 {service.cache_hits}페이지, 변환 {service.converted_pages}페이지")
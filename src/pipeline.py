@@ -3,21 +3,34 @@
 문서 분석 → 번역 → QA 검증 → TM 저장
 """
 
-from typing import Dict, Optional
+from contextlib import nullcontext
+from typing import Callable, Dict, Optional
 from pathlib import Path
 import json
+import time
 
 from analyzer import DocumentAnalyzer
 from translator import PatentTranslator
 from qa_checker import PatentQAChecker
+from qa_segments import SegmentQASession, align_segments, segments_from_sections
 from tm_manager import TranslationMemory
+from section_parser import PatentSectionParser, iter_lines
+from claim_scheduler import ClaimScheduler
+from logger import TranslationLogger, bind_context, span
+from docx_stream import strip_format_tags
 
 
 class TranslationPipeline:
     """통합 번역 파이프라인"""
 
-    def __init__(self):
+    def __init__(self, logger: Optional[TranslationLogger] = None):
+        """
+        Args:
+            logger: 지정하면 번역 작업마다 단계별 소요 시간/토큰(분석, TM 검색, LLM 호출, QA, TM 저장)을
+                logger의 metrics 파일에 JSON Lines로 기록
+        """
         print("🚀 번역 파이프라인 초기화 중...")
+        self.logger = logger
         self.analyzer = DocumentAnalyzer()
         self.translator = PatentTranslator()
         self.qa_checker = PatentQAChecker()
@@ -28,20 +41,43 @@ class TranslationPipeline:
                           source_text: str,
                           document_type: str = "claim",
                           use_self_review: bool = True,
-                          save_to_tm: bool = True) -> Dict:
-        """문서 번역 전체 프로세스"""
+                          save_to_tm: bool = True,
+                          previous_translation: Optional[str] = None,
+                          job_id: Optional[str] = None) -> Dict:
+        """문서 번역 전체 프로세스
 
+        Args:
+            previous_translation: 용어 일관성 참고용 선행 번역 (종속항의 인용 청구항 전제부 등)
+            job_id: 단계 측정 작업 ID (logger 사용 시, 기본: 자동 생성)
+        """
+        with self._job(job_id, kind="document", document_type=document_type, chars=len(source_text)):
+            return self._translate_document(source_text, document_type, use_self_review,
+                                            save_to_tm, previous_translation)
+
+    def _job(self, job_id: Optional[str], **attrs):
+        """단계 측정 작업 (logger가 없으면 측정하지 않음, 진행 중인 작업이 있으면 이어감)"""
+        return self.logger.job(job_id, **attrs) if self.logger is not None else nullcontext()
+
+    def _translate_document(self, source_text: str, document_type: str, use_self_review: bool,
+                            save_to_tm: bool, previous_translation: Optional[str]) -> Dict:
         print("="*60)
         print("🌟 특허 번역 자동화 시작")
         print("="*60)
         print()
 
         # STEP 1: 문서 분석
+        # Word 서식 자리표시자(<g1>..</g1>, <x1/>)는 번역 프롬프트와 .docx 출력에만 사용
+        # (분석, TM 검색/저장, QA는 자리표시자를 제거한 텍스트 기준)
+        plain_source = strip_format_tags(source_text)
+
         print("📋 STEP 1: 문서 분석")
         print("-" * 60)
-        analysis = self.analyzer.analyze(source_text, use_claude=False)
+        with span("analysis"):
+            analysis = self.analyzer.analyze(plain_source, use_ai=False)
         domain = analysis["domain"]
         term_mapping = analysis["term_mapping"]
+        if self.logger is not None:
+            self.logger.log_analysis_result(domain, len(analysis["technical_terms"]), len(analysis["patterns"]))
 
         print(f"   도메인: {domain}")
         print(f"   핵심 용어: {len(term_mapping)}개")
@@ -50,7 +86,11 @@ class TranslationPipeline:
         # STEP 2: TM 검색
         print("📚 STEP 2: Translation Memory 검색")
         print("-" * 60)
-        tm_matches = self.tm.search(source_text, domain=domain, similarity_threshold=0.95)
+        with span("tm_search") as tm_span:
+            tm_matches = self.tm.search(plain_source, domain=domain, similarity_threshold=0.95)
+            tm_span.set(matches=len(tm_matches))
+        if self.logger is not None:
+            self.logger.log_tm_search(plain_source, len(tm_matches))
 
         if tm_matches and tm_matches[0]["similarity"] == 1.0:
             print(f"   ✅ 완전 일치 발견! (품질 점수: {tm_matches[0]['quality_score']})")
@@ -73,37 +113,53 @@ class TranslationPipeline:
         print("🔄 STEP 3: 번역 수행")
         print("-" * 60)
 
-        if use_self_review:
-            translation_result = self.translator.translate_with_self_review(
-                source_text=source_text,
-                domain=domain,
-                term_mapping=term_mapping,
-                document_type=document_type
-            )
-        else:
-            translation_result = self.translator.translate(
-                source_text=source_text,
-                domain=domain,
-                term_mapping=term_mapping,
-                document_type=document_type
-            )
+        with span("translation", self_review=use_self_review):
+            if use_self_review:
+                translation_result = self.translator.translate_with_self_review(
+                    source_text=source_text,
+                    domain=domain,
+                    term_mapping=term_mapping,
+                    document_type=document_type,
+                    previous_translation=previous_translation,
+                    qa_ruleset=self.qa_checker.ruleset
+                )
+            else:
+                translation_result = self.translator.translate(
+                    source_text=source_text,
+                    domain=domain,
+                    term_mapping=term_mapping,
+                    document_type=document_type,
+                    previous_translation=previous_translation,
+                    qa_ruleset=self.qa_checker.ruleset
+                )
 
         if not translation_result["success"]:
             print(f"   ❌ 번역 실패: {translation_result.get('error')}")
+            if self.logger is not None:
+                self.logger.error(f"번역 실패: {translation_result.get('error')}")
             return translation_result
 
         translation = translation_result["translation"]
+        plain_translation = strip_format_tags(translation)
         print()
 
         # STEP 4: QA 검증
         print("🔍 STEP 4: 품질 검증 (QA)")
         print("-" * 60)
-        qa_result = self.qa_checker.check_all(
-            source=source_text,
-            translation=translation,
-            term_mapping=term_mapping,
-            document_type=document_type
-        )
+        # 문단 단위로 정렬하여 검사 (위반 사항을 청구항/세그먼트 번호에 매핑)
+        with span("qa") as qa_span:
+            qa_session = SegmentQASession(
+                self.qa_checker,
+                align_segments(plain_source, plain_translation, document_type),
+                term_mapping
+            )
+            qa_result = qa_session.check()
+            qa_span.set(segments=qa_result["segments"], violations=qa_result["total_violations"])
+        if self.logger is not None:
+            self.logger.log_qa_result(qa_result["total_violations"], qa_result["severity_counts"],
+                                      qa_result["passed"])
+        print(f"   ✓ 세그먼트 {qa_result['segments']}개 검사 완료")
+        self.qa_checker.print_summary(qa_result)
         print()
 
         # STEP 5: TM 저장
@@ -111,13 +167,16 @@ class TranslationPipeline:
             print("💾 STEP 5: Translation Memory 저장")
             print("-" * 60)
             quality_score = 10 if qa_result["total_violations"] == 0 else 7
-            self.tm.add(
-                source=source_text,
-                target=translation,
-                domain=domain,
-                document_type=document_type,
-                quality_score=quality_score
-            )
+            with span("tm_save"):
+                self.tm.add(
+                    source=plain_source,
+                    target=plain_translation,
+                    domain=domain,
+                    document_type=document_type,
+                    quality_score=quality_score
+                )
+            if self.logger is not None:
+                self.logger.log_tm_save(plain_source, plain_translation, quality_score)
             print(f"   ✅ TM 저장 완료 (품질 점수: {quality_score})")
             print()
 
@@ -133,9 +192,154 @@ class TranslationPipeline:
             "source": "Claude AI",
             "analysis": analysis,
             "qa_result": qa_result,
+            "qa_session": qa_session,
             "translation_result": translation_result
         }
 
+    def translate_sections(self,
+                           source_text: str,
+                           use_self_review: bool = True,
+                           save_to_tm: bool = True,
+                           job_queue=None,
+                           job_id: Optional[str] = None,
+                           progress_callback: Optional[Callable[[str], None]] = None,
+                           max_workers: int = 4) -> Dict:
+        """섹션 자동 분류 후 섹션(문단/청구항) 단위 번역
+
+        Args:
+            job_queue: JobQueue. 지정하면 세그먼트별 번역 결과를 즉시 기록하고,
+                같은 job_id로 다시 실행하면 이미 번역된 세그먼트는 LLM을 호출하지 않고 재사용한다.
+            job_id: 작업 ID (job_queue 사용 시 필수, logger 사용 시 단계 측정 작업 ID)
+            progress_callback: 진행 메시지 출력 함수 (기본: print)
+            max_workers: 청구항 동시 번역 수
+        """
+        if job_queue is not None and not job_id:
+            raise ValueError("job_queue를 사용하려면 job_id가 필요합니다")
+
+        with self._job(job_id, kind="sections", chars=len(source_text)):
+            return self._translate_sections(source_text, use_self_review, save_to_tm, job_queue, job_id,
+                                            progress_callback, max_workers)
+
+    def _translate_sections(self, source_text: str, use_self_review: bool, save_to_tm: bool, job_queue,
+                            job_id: Optional[str], progress_callback: Optional[Callable[[str], None]],
+                            max_workers: int) -> Dict:
+        progress = progress_callback or print
+        parser = PatentSectionParser()
+
+        # 섹션별 번역 결과 저장
+        translated_sections = {}
+        term_mapping = {}
+        claims = []  # 청구항은 의존 관계에 따라 병렬 번역
+        reused = 0
+        seq = 0
+
+        def translate_unit(section, document_type: str, previous_translation: Optional[str] = None) -> str:
+            with span("segment", unit_id=section.unit_id, document_type=document_type):
+                return _translate_unit(section, document_type, previous_translation)
+
+        def _translate_unit(section, document_type: str, previous_translation: Optional[str]) -> str:
+            nonlocal reused
+            if job_queue is not None:
+                record = job_queue.get_segment(job_id, section.unit_id)
+                # 다른 워커가 점유 중이면 완료되거나 점유 시간이 끝날 때까지 대기
+                while record.translation is None and not job_queue.lease_segment(job_id, section.unit_id):
+                    time.sleep(1.0)
+                    record = job_queue.get_segment(job_id, section.unit_id)
+                if record.translation is not None:
+                    reused += 1
+                    term_mapping.update(record.meta.get("term_mapping", {}))
+                    return record.translation
+
+            try:
+                result = self.translate_document(
+                    source_text=section.content,
+                    document_type=document_type,
+                    use_self_review=use_self_review,
+                    save_to_tm=save_to_tm,
+                    previous_translation=previous_translation
+                )
+                if not result["success"]:
+                    raise Exception(f"섹션 번역 실패 ({section.unit_id}): {result.get('error')}")
+            except Exception as e:
+                if job_queue is not None:
+                    job_queue.fail(job_id, section.unit_id, str(e))
+                if self.logger is not None:
+                    self.logger.error(f"섹션 번역 실패: {e}", exc_info=True)
+                raise
+
+            unit_terms = result.get("analysis", {}).get("term_mapping", {})
+            term_mapping.update(unit_terms)
+            if job_queue is not None:
+                job_queue.complete(job_id, section.unit_id, result["translation"],
+                                   {"term_mapping": unit_terms, "source": result.get("source")})
+            return result["translation"]
+
+        # 파싱이 끝나기를 기다리지 않고 섹션이 완성되는 대로 번역
+        for section_type, section in parser.iter_sections(iter_lines(source_text)):
+            translated_sections.setdefault(section_type, [])
+            if job_queue is not None:
+                job_queue.add_segment(job_id, seq, section.unit_id, section_type, section.content)
+            seq += 1
+
+            if section.unit_type == 'claim':
+                claims.append(section)
+                continue
+
+            doc_type = parser.get_document_type_from_section(section.section_type)
+            progress(f"📝 번역 중 ({seq}): {section_type.upper()} {section.unit_id} - {doc_type}")
+            translated_sections[section_type].append((section, translate_unit(section, doc_type)))
+
+        if claims:
+            def on_claim_start(claim, index, total):
+                parents = ", ".join(claim.depends_on) or "독립항"
+                progress(f"📝 청구항 번역 중 ({index}/{total}): {claim.unit_id} ← {parents}")
+
+            # 청구항 번역 스레드에서도 같은 작업으로 단계를 기록
+            claim_translations = ClaimScheduler(
+                bind_context(lambda claim, context: translate_unit(claim, "claim", context)),
+                max_workers=max_workers, progress_callback=on_claim_start
+            ).run(claims)
+            translated_sections['claims'].extend(
+                (claim, claim_translations[claim.unit_id]) for claim in claims
+            )
+
+        if reused:
+            progress(f"↻ 작업 큐에서 번역 {reused}개 재사용")
+
+        # 번역된 섹션 재구성
+        progress("🔄 번역 문서 재구성 중...")
+        with span("reconstruct"):
+            translation = parser.reconstruct_document(translated_sections)
+
+        # 섹션(청구항) 단위 QA
+        with span("qa") as qa_span:
+            qa_session = SegmentQASession(
+                self.qa_checker,
+                segments_from_sections(translated_sections, parser),
+                term_mapping
+            )
+            qa_result = qa_session.check()
+            qa_span.set(segments=qa_result["segments"], violations=qa_result["total_violations"])
+        if job_queue is not None:
+            job_queue.mark_qa_checked(job_id, {
+                segment.unit_id: {
+                    "passed": qa_session.segment_passed(segment.index),
+                    "violations": len(qa_session.segment_violations(segment.index))
+                }
+                for segment in qa_session.segments
+            })
+
+        return {
+            "success": True,
+            "translation": translation,
+            "sections": {k: len(v) for k, v in translated_sections.items()},
+            "auto_section": True,
+            "qa_result": qa_result,
+            "qa_session": qa_session,
+            "translated_sections": translated_sections,
+            "reused_segments": reused
+        }
+
     def close(self):
         """리소스 정리"""
         self.tm.close()
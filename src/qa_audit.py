@@ -0,0 +1,218 @@
+"""
+Translation Memory 일괄 QA 감사
+- TM 항목을 배치 단위로 읽어 프로세스 풀에서 check_all 실행
+- 위반 사항을 감사 테이블(qa_audit)에 기록
+- 규칙 집합별 체크포인트로 중단 후 재개
+- 선택적으로 실패 항목의 quality_score 하향
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from qa_checker import PatentQAChecker
+from tm_manager import TranslationMemory
+
+
+# QA 실패(critical/major) 항목의 최대 품질 점수
+FAILED_QUALITY_SCORE = 3
+
+# 워커 프로세스별 QA 체커 (initializer에서 한 번만 생성)
+_worker_checker: Optional[PatentQAChecker] = None
+
+
+def _init_worker(checker_kwargs: Dict):
+    global _worker_checker
+    _worker_checker = PatentQAChecker(**checker_kwargs)
+
+
+def _audit_batch(rows: List[Dict]) -> List[Dict]:
+    """워커: TM 항목 배치에 대해 QA 실행"""
+    results = []
+    for row in rows:
+        qa_result = _worker_checker.check_all(
+            source=row["source"],
+            translation=row["target"],
+            term_mapping={},
+            document_type=row["document_type"] or "claim",
+            verbose=False
+        )
+        results.append({
+            "tm_id": row["id"],
+            "quality_score": row["quality_score"],
+            "passed": qa_result["passed"],
+            "severity_counts": qa_result["severity_counts"],
+            "violations": qa_result["violations"]
+        })
+    return results
+
+
+class TMQAAuditor:
+    """TM 일괄 QA 감사기"""
+
+    def __init__(self, db_path: str = "data/translation_memory.db",
+                 rule_paths: Optional[List[str]] = None,
+                 style_guide_path: str = "config/style_guide.json",
+                 terminology_path: str = "config/terminology.json"):
+        self.tm = TranslationMemory(db_path)
+        self.checker_kwargs = {
+            "style_guide_path": style_guide_path,
+            "terminology_path": terminology_path,
+            "rule_paths": rule_paths,
+        }
+        # 규칙 집합 해시: 체크포인트와 감사 기록을 규칙 버전별로 구분
+        self.ruleset_hash = PatentQAChecker(**self.checker_kwargs).ruleset.ruleset_hash
+        self._init_tables()
+
+    def _init_tables(self):
+        """감사 테이블 초기화"""
+        cursor = self.tm.conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS qa_audit (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tm_id INTEGER NOT NULL,
+            ruleset_hash TEXT NOT NULL,
+            rule_id TEXT,
+            severity TEXT,
+            description TEXT,
+            location TEXT,
+            found TEXT,
+            correct TEXT,
+            audited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_qa_audit_tm ON qa_audit(tm_id)
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS qa_audit_checkpoint (
+            ruleset_hash TEXT PRIMARY KEY,
+            last_tm_id INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        self.tm.conn.commit()
+
+    def get_checkpoint(self) -> int:
+        """현재 규칙 집합의 마지막 감사 TM id"""
+        cursor = self.tm.conn.cursor()
+        cursor.execute('SELECT last_tm_id FROM qa_audit_checkpoint WHERE ruleset_hash = ?',
+                       (self.ruleset_hash,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def reset(self):
+        """현재 규칙 집합의 체크포인트와 감사 기록 삭제"""
+        cursor = self.tm.conn.cursor()
+        cursor.execute('DELETE FROM qa_audit WHERE ruleset_hash = ?', (self.ruleset_hash,))
+        cursor.execute('DELETE FROM qa_audit_checkpoint WHERE ruleset_hash = ?', (self.ruleset_hash,))
+        self.tm.conn.commit()
+
+    def _save_results(self, results: List[Dict], downrank: bool):
+        """배치 결과와 체크포인트를 한 트랜잭션으로 저장"""
+        cursor = self.tm.conn.cursor()
+
+        cursor.executemany('''
+        INSERT INTO qa_audit
+        (tm_id, ruleset_hash, rule_id, severity, description, location, found, correct)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (r["tm_id"], self.ruleset_hash, v["rule_id"], v["severity"], v["description"],
+             v["location"], v["found"], v["correct"])
+            for r in results for v in r["violations"]
+        ])
+
+        if downrank:
+            cursor.executemany('''
+            UPDATE translation_memory SET quality_score = ? WHERE id = ?
+            ''', [
+                (FAILED_QUALITY_SCORE, r["tm_id"])
+                for r in results
+                if not r["passed"] and (r["quality_score"] or 0) > FAILED_QUALITY_SCORE
+            ])
+
+        cursor.execute('''
+        INSERT OR REPLACE INTO qa_audit_checkpoint (ruleset_hash, last_tm_id, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ''', (self.ruleset_hash, results[-1]["tm_id"]))
+
+        self.tm.conn.commit()
+
+    def run(self, workers: int = None, batch_size: int = 500,
+            downrank: bool = False, resume: bool = True,
+            progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """TM 전체 감사
+
+        Args:
+            workers: 프로세스 수 (기본: CPU 수)
+            batch_size: 워커에 한 번에 보내는 TM 항목 수
+            downrank: QA 실패 항목의 quality_score를 FAILED_QUALITY_SCORE로 하향
+            resume: 체크포인트 이후부터 재개 (False면 기존 감사 기록 삭제 후 처음부터)
+            progress_callback: 배치 완료마다 누적 통계를 받는 콜백
+        """
+        workers = workers or os.cpu_count() or 1
+        if not resume:
+            self.reset()
+        start_id = self.get_checkpoint()
+
+        stats = {
+            "start_id": start_id,
+            "audited": 0,
+            "failed": 0,
+            "violations": 0,
+            "downranked": 0,
+            "severity_counts": {"critical": 0, "major": 0, "minor": 0, "neutral": 0},
+        }
+        started = time.perf_counter()
+
+        def batches():
+            batch = []
+            for entry in self.tm.iter_entries(batch_size=batch_size, after_id=start_id):
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def collect(results):
+            self._save_results(results, downrank)
+            for r in results:
+                stats["audited"] += 1
+                stats["violations"] += len(r["violations"])
+                if not r["passed"]:
+                    stats["failed"] += 1
+                    if downrank and (r["quality_score"] or 0) > FAILED_QUALITY_SCORE:
+                        stats["downranked"] += 1
+                for severity, count in r["severity_counts"].items():
+                    stats["severity_counts"][severity] = stats["severity_counts"].get(severity, 0) + count
+            if progress_callback:
+                progress_callback(dict(stats, last_tm_id=results[-1]["tm_id"]))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.checker_kwargs,)) as executor:
+            # 제출 순서대로 결과를 반영해야 체크포인트가 건너뛰지 않음.
+            # 진행 중 배치 수를 제한하여 메모리 사용량을 일정하게 유지
+            max_pending = workers * 2
+            pending = deque()
+            for batch in batches():
+                pending.append(executor.submit(_audit_batch, batch))
+                if len(pending) >= max_pending:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+        stats["elapsed"] = time.perf_counter() - started
+        stats["rows_per_sec"] = stats["audited"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        stats["last_tm_id"] = self.get_checkpoint()
+        return stats
+
+    def close(self):
+        """리소스 정리"""
+        self.tm.close()
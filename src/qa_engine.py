@@ -0,0 +1,611 @@
+"""
+QA 규칙 컴파일 엔진
+- 선언형 규칙 파일(JSON/YAML) 로드
+- 규칙을 사전 컴파일된 정규식과 다중 패턴 매처로 변환
+- 번역문 리터럴 스캔 한 번으로 후보 규칙을 추린 뒤 해당 규칙만 확인
+- 컴파일된 규칙 집합을 파일 해시 기준으로 캐시
+"""
+
+import re
+import json
+import hashlib
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+
+# check_all 결과에 나타나는 검사 그룹 순서
+GROUP_ORDER = [
+    "formatting",
+    "terminology",
+    "antecedent_basis",
+    "claim_structure",
+    "punctuation",
+    "domain_terms",
+    "standard_terms",
+    "numerical",
+    "transitional",
+    "claim_noun_phrase",
+]
+
+
+class QAViolation:
+    """QA 위반 사항"""
+
+    def __init__(self, rule_id: str, severity: str, description: str,
+                 location: str, found: str, correct: str = ""):
+        self.rule_id = rule_id
+        self.severity = severity  # critical, major, minor, neutral
+        self.description = description
+        self.location = location
+        self.found = found
+        self.correct = correct
+
+    def to_dict(self) -> Dict:
+        return {
+            "rule_id": self.rule_id,
+            "severity": self.severity,
+            "description": self.description,
+            "location": self.location,
+            "found": self.found,
+            "correct": self.correct
+        }
+
+
+@dataclass
+class QARule:
+    """컴파일 전 QA 규칙 정의
+
+    kind:
+        regex      - 번역문에서 pattern이 일치할 때마다 위반 (템플릿의 {0}, {1}...은 매치 그룹)
+        literal    - 번역문에 targets 중 하나가 있으면 위반 (emit="each"면 대상별, "once"면 한 번)
+        structural - 내장 구조 검사 함수 (check 이름으로 지정)
+    """
+    rule_id: str
+    group: str
+    kind: str
+    severity: str
+    description: str = ""
+    location: str = ""
+    found: str = ""
+    correct: str = ""
+    pattern: str = ""
+    targets: List[str] = field(default_factory=list)
+    triggers: List[str] = field(default_factory=list)
+    emit: str = "each"
+    skip_if_correct: bool = False
+    mapping_key: str = ""
+    check: str = ""
+    document_types: Optional[List[str]] = None
+
+
+class MultiPatternMatcher:
+    """여러 리터럴을 한 번의 스캔으로 찾는 매처
+
+    모든 리터럴을 트라이 형태의 정규식 하나로 컴파일하고(첫 글자 문자 클래스로
+    후보 위치를 빠르게 건너뜀), 전방탐색으로 각 위치에서 가장 긴 리터럴을 찾는다.
+    같은 위치에서 시작하는 더 짧은 리터럴(접두사)은 사전 계산한 접두사 목록으로
+    함께 보고하므로 겹치는 일치도 빠지지 않는다.
+    """
+
+    def __init__(self, literals: Iterable[str]):
+        self.literals = sorted({lit for lit in literals if lit}, key=len, reverse=True)
+        self._prefixes = {
+            lit: [other for other in self.literals if other != lit and lit.startswith(other)]
+            for lit in self.literals
+        }
+        self._pattern = None
+        if self.literals:
+            first_chars = "".join(sorted({lit[0] for lit in self.literals}))
+            self._pattern = re.compile(
+                f"(?=[{re.escape(first_chars)}])(?=({self._trie_pattern(self.literals)}))"
+            )
+
+    @staticmethod
+    def _trie_pattern(literals: Iterable[str]) -> str:
+        """리터럴 목록을 공통 접두사를 공유하는 정규식으로 변환"""
+        root: Dict = {}
+        for literal in literals:
+            node = root
+            for ch in literal:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(ch) + build(child)
+                        for ch, child in sorted(node.items()) if ch != ""]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # 리터럴이 여기서 끝날 수도 있으면 더 긴 쪽을 먼저 시도 (탐욕적 선택)
+            return f"(?:{body})?" if "" in node else body
+
+        return build(root)
+
+    def find(self, text: str) -> Dict[str, int]:
+        """텍스트에 나타난 리터럴과 첫 출현 위치"""
+        found: Dict[str, int] = {}
+        if self._pattern is None:
+            return found
+
+        for match in self._pattern.finditer(text):
+            literal = match.group(1)
+            if literal not in found:
+                found[literal] = match.start()
+            for prefix in self._prefixes[literal]:
+                if prefix not in found:
+                    found[prefix] = match.start()
+        return found
+
+
+try:
+    import re._parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+
+def required_literal(pattern: str) -> str:
+    """정규식이 일치하려면 반드시 포함해야 하는 가장 긴 리터럴 (없으면 빈 문자열)
+
+    최상위 순서열과 그 안의 그룹에서 연속된 문자만 본다. 대소문자 무시 패턴은 제외.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except re.error:
+        return ""
+    if parsed.state.flags & re.IGNORECASE:
+        return ""
+
+    runs = [""]
+
+    def walk(items):
+        for op, arg in items:
+            if op is _sre_parse.LITERAL:
+                runs[-1] += chr(arg)
+            elif op is _sre_parse.SUBPATTERN and not (arg[1] & re.IGNORECASE):
+                walk(arg[-1])
+            else:
+                runs.append("")
+
+    walk(parsed)
+    return max(runs, key=len)
+
+
+_TEMPLATE_FIELD = re.compile(r"\{(\d+)\}")
+
+
+def _fill_template(template: str, match: "re.Match") -> str:
+    """{0}, {1}... 를 매치 그룹으로 치환"""
+    if "{" not in template:
+        return template
+    return _TEMPLATE_FIELD.sub(lambda m: match.group(int(m.group(1))) or "", template)
+
+
+# ===== 내장 구조 검사 =====
+
+_ANTECEDENT_PATTERN = re.compile(
+    r'the\s+(compound|device|method|system|apparatus|composition)', re.IGNORECASE
+)
+_ANTECEDENT_NOUNS = {
+    'compound': '화합물',
+    'device': '장치',
+    'method': '방법',
+    'system': '시스템',
+    'apparatus': '장치',
+    'composition': '조성물'
+}
+_CLAIM_ENDINGS = ('방법.', '장치.', '시스템.', '화합물.', '조성물.', '키트.', '용도.')
+_SEMICOLON_AT_END = re.compile(r';\s*$')
+_METHOD_PREAMBLE = re.compile(r'방법으로서,|방법에\s*있어서,')
+_METHOD_ENDINGS = re.compile(
+    r'포함하는\s*방법\.$|특성화되는,?\s*방법\.$|이루어지는\s*방법\.$|구성되는\s*방법\.$'
+)
+
+
+def _check_claim_ending(rule, source, translation, stripped):
+    if stripped.endswith('.'):
+        return []
+    return [QAViolation(rule.rule_id, rule.severity, rule.description,
+                        rule.location, stripped[-20:], rule.correct)]
+
+
+def _check_claim_noun_phrase_ending(rule, source, translation, stripped):
+    if stripped.endswith(_CLAIM_ENDINGS):
+        return []
+    return [QAViolation(rule.rule_id, rule.severity, rule.description,
+                        rule.location, stripped[-30:], rule.correct)]
+
+
+def _check_semicolon_at_end(rule, source, translation, stripped):
+    if not _SEMICOLON_AT_END.search(stripped):
+        return []
+    return [QAViolation(rule.rule_id, rule.severity, rule.description,
+                        rule.location, rule.found, rule.correct)]
+
+
+def _check_antecedent_basis(rule, source, translation, stripped):
+    violations = []
+    missing: Dict[str, bool] = {}  # 번역문에 있으나 '상기'가 붙지 않은 명사
+    for match in _ANTECEDENT_PATTERN.finditer(source):
+        noun_kr = _ANTECEDENT_NOUNS[match.group(1).lower()]
+        if noun_kr not in missing:
+            missing[noun_kr] = (noun_kr in translation
+                                and re.search(f'상기\\s+{noun_kr}', translation) is None)
+        if missing[noun_kr]:
+            violations.append(QAViolation(
+                rule.rule_id, rule.severity, rule.description,
+                f"'{noun_kr}' 발견", noun_kr, f"상기 {noun_kr}"
+            ))
+    return violations
+
+
+def _check_method_claim_preamble(rule, source, translation, stripped):
+    if '방법' not in translation or _METHOD_PREAMBLE.search(translation):
+        return []
+    return [QAViolation(rule.rule_id, rule.severity, rule.description,
+                        rule.location, translation[:50] + "...", rule.correct)]
+
+
+def _check_method_claim_ending(rule, source, translation, stripped):
+    if '방법' not in translation or _METHOD_ENDINGS.search(translation):
+        return []
+    if not stripped.endswith('방법.'):
+        return []
+    return [QAViolation(rule.rule_id, rule.severity, rule.description,
+                        rule.location, translation[-50:], rule.correct)]
+
+
+STRUCTURAL_CHECKS: Dict[str, Callable] = {
+    "claim_ending": _check_claim_ending,
+    "claim_noun_phrase_ending": _check_claim_noun_phrase_ending,
+    "semicolon_at_end": _check_semicolon_at_end,
+    "antecedent_basis": _check_antecedent_basis,
+    "method_claim_preamble": _check_method_claim_preamble,
+    "method_claim_ending": _check_method_claim_ending,
+}
+
+
+class CompiledRuleSet:
+    """컴파일된 QA 규칙 집합"""
+
+    def __init__(self, rules: Sequence[QARule], ruleset_hash: str = ""):
+        self.rules = list(rules)
+        self.ruleset_hash = ruleset_hash or _hash_rules(self.rules)
+        self._order = {id(rule): i for i, rule in enumerate(self.rules)}
+        self._group_index = {group: i for i, group in enumerate(GROUP_ORDER)}
+
+        for rule in self.rules:
+            if rule.group not in self._group_index:
+                raise ValueError(f"알 수 없는 QA 규칙 그룹: {rule.group} ({rule.rule_id})")
+            if rule.kind == "structural" and rule.check not in STRUCTURAL_CHECKS:
+                raise ValueError(f"알 수 없는 구조 검사: {rule.check} ({rule.rule_id})")
+
+        # 정규식 규칙: 반드시 포함해야 하는 리터럴(앵커)을 뽑아 리터럴 스캔에 합치고,
+        # 앵커가 발견된 규칙만 개별 정규식으로 확인한다
+        self._regex_rules = []
+        for rule in self.rules:
+            if rule.kind == "regex":
+                self._regex_rules.append((rule, re.compile(rule.pattern), required_literal(rule.pattern)))
+
+        # 리터럴 규칙: 번역문 대상 / 원문 트리거를 각각 하나의 매처로
+        literal_rules = [rule for rule in self.rules if rule.kind == "literal"]
+        self._target_matcher = MultiPatternMatcher(
+            [target for rule in literal_rules for target in rule.targets]
+            + [anchor for _, _, anchor in self._regex_rules if anchor]
+        )
+        self._trigger_matcher = MultiPatternMatcher(
+            trigger.lower() for rule in literal_rules for trigger in rule.triggers
+        )
+        # 발견된 대상 리터럴에 해당하는 규칙만 평가하도록 색인
+        self._rules_by_target: Dict[str, List[int]] = {}
+        for i, rule in enumerate(self.rules):
+            if rule.kind == "literal":
+                for target in rule.targets:
+                    self._rules_by_target.setdefault(target, []).append(i)
+        self._structural_rules = [rule for rule in self.rules if rule.kind == "structural"]
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _applies(self, rule: QARule, document_type: str, groups) -> bool:
+        if groups is not None and rule.group not in groups:
+            return False
+        return rule.document_types is None or document_type in rule.document_types
+
+    def _regex_violation(self, rule: QARule, match) -> Optional[QAViolation]:
+        found = match.group()
+        correct = _fill_template(rule.correct, match)
+        if rule.skip_if_correct and found == correct:
+            return None
+        return QAViolation(
+            rule_id=rule.rule_id,
+            severity=rule.severity,
+            description=_fill_template(rule.description, match),
+            location=f"위치: {match.start()}",
+            found=found,
+            correct=correct
+        )
+
+    def _literal_violations(self, rule: QARule, present: Dict[str, int],
+                            term_mapping: Dict[str, str]) -> List[QAViolation]:
+        hits = [target for target in rule.targets if target in present]
+        if not hits:
+            return []
+        if rule.emit == "once":
+            hits = hits[:1]
+
+        correct = rule.correct
+        if rule.mapping_key:
+            correct = term_mapping.get(rule.mapping_key, rule.correct or "확인 필요")
+
+        return [
+            QAViolation(
+                rule_id=rule.rule_id,
+                severity=rule.severity,
+                description=rule.description.replace("{target}", target),
+                location=(rule.location or "'{target}' 발견").replace("{target}", target),
+                found=(rule.found or "{target}").replace("{target}", target),
+                correct=correct.replace("{target}", target)
+            )
+            for target in hits
+        ]
+
+    def evaluate(self, source: str, translation: str,
+                 term_mapping: Optional[Dict[str, str]] = None,
+                 document_type: str = "claim",
+                 groups: Optional[Iterable[str]] = None) -> List[QAViolation]:
+        """모든 규칙 평가 (그룹 순서 → 규칙 순서 → 출현 위치 순으로 정렬)"""
+        term_mapping = term_mapping or {}
+        groups = set(groups) if groups is not None else None
+        results = []  # (정렬 키, 위반)
+
+        def add(rule, position, violation):
+            key = (self._group_index[rule.group], self._order[id(rule)], position)
+            results.append((key, violation))
+
+        # 1. 번역문 리터럴 스캔 (금지 용어 + 정규식 앵커를 한 번에)
+        present = self._target_matcher.find(translation)
+
+        # 2. 앵커가 발견된 정규식 규칙만 확인
+        for rule, compiled, anchor in self._regex_rules:
+            if anchor and anchor not in present:
+                continue
+            if not self._applies(rule, document_type, groups):
+                continue
+            for match in compiled.finditer(translation):
+                violation = self._regex_violation(rule, match)
+                if violation:
+                    add(rule, match.start(), violation)
+
+        # 3. 리터럴 규칙 (원문 트리거는 필요할 때 한 번만 스캔)
+        candidates = sorted({i for target in present for i in self._rules_by_target.get(target, ())})
+        triggered = None
+        for i in candidates:
+            rule = self.rules[i]
+            if not self._applies(rule, document_type, groups):
+                continue
+            if rule.triggers:
+                if triggered is None:
+                    triggered = self._trigger_matcher.find(source.lower())
+                if not any(trigger.lower() in triggered for trigger in rule.triggers):
+                    continue
+            for j, violation in enumerate(self._literal_violations(rule, present, term_mapping)):
+                add(rule, j, violation)
+
+        # 4. 구조 검사
+        stripped = translation.strip()
+        for rule in self._structural_rules:
+            if not self._applies(rule, document_type, groups):
+                continue
+            check = STRUCTURAL_CHECKS[rule.check]
+            for j, violation in enumerate(check(rule, source, translation, stripped)):
+                add(rule, j, violation)
+
+        results.sort(key=lambda item: item[0])
+        return [violation for _, violation in results]
+
+    def streaming_scanner(self, source: str,
+                          term_mapping: Optional[Dict[str, str]] = None,
+                          document_type: str = "claim",
+                          severities: Iterable[str] = ("critical",)) -> "StreamingQAScanner":
+        """스트리밍 번역 출력용 증분 스캐너 생성"""
+        return StreamingQAScanner(self, source, term_mapping, document_type, severities)
+
+
+class StreamingQAScanner:
+    """스트리밍 번역 출력을 청크 단위로 검사하는 증분 스캐너
+
+    지정한 심각도(기본: critical)의 리터럴/정규식 규칙만 검사한다. 청크 경계에
+    걸친 일치를 놓치지 않도록 이전 청크의 끝부분을 다시 스캔하고, 정규식은
+    뒤따르는 텍스트에 따라 결과가 바뀔 수 있으므로 끝에서 holdback 글자 이내의
+    일치는 다음 청크(또는 finish)까지 보류한다. 구조 검사는 전체 번역문이
+    필요하므로 finish()의 전체 평가에서만 수행된다.
+    """
+
+    def __init__(self, ruleset: "CompiledRuleSet", source: str,
+                 term_mapping: Optional[Dict[str, str]] = None,
+                 document_type: str = "claim",
+                 severities: Iterable[str] = ("critical",),
+                 regex_lookback: int = 256, holdback: int = 16):
+        self.ruleset = ruleset
+        self.source = source
+        self.term_mapping = term_mapping or {}
+        self.document_type = document_type
+        self.regex_lookback = regex_lookback
+        self.holdback = holdback
+        severities = set(severities)
+
+        # 원문 트리거는 스트리밍 전에 알 수 있으므로 미리 평가
+        triggered = ruleset._trigger_matcher.find(source.lower())
+
+        def active(rule: QARule) -> bool:
+            if rule.severity not in severities or not ruleset._applies(rule, document_type, None):
+                return False
+            return not rule.triggers or any(t.lower() in triggered for t in rule.triggers)
+
+        self._literal_rules = [rule for rule in ruleset.rules if rule.kind == "literal" and active(rule)]
+        self._regex_rules = [(rule, compiled) for rule, compiled, _ in ruleset._regex_rules if active(rule)]
+        self._matcher = MultiPatternMatcher(
+            target for rule in self._literal_rules for target in rule.targets
+        )
+        self._literal_overlap = max((len(lit) for lit in self._matcher.literals), default=1) - 1
+
+        self.text = ""
+        self.violations: List[QAViolation] = []
+        self._present: Dict[str, int] = {}
+        self._fired_literal_rules = set()
+        self._reported_regex = set()  # (rule_id, 시작 위치)
+        self._literal_scanned = 0
+        self._regex_scanned = 0
+
+    @property
+    def active(self) -> bool:
+        """스트리밍 중 검사할 규칙이 있는지 여부"""
+        return bool(self._literal_rules or self._regex_rules)
+
+    @property
+    def should_abort(self) -> bool:
+        """생성을 중단해야 하는 위반이 발견되었는지 여부"""
+        return bool(self.violations)
+
+    def feed(self, chunk: str, final: bool = False) -> List[QAViolation]:
+        """청크를 추가하고 새로 발견된 위반 사항 반환"""
+        self.text += chunk
+        new_violations = []
+
+        # 리터럴: 가장 긴 리터럴 길이만큼 이전 구간을 겹쳐서 스캔
+        if self._literal_rules:
+            start = max(0, self._literal_scanned - self._literal_overlap)
+            for literal, position in self._matcher.find(self.text[start:]).items():
+                self._present.setdefault(literal, start + position)
+            self._literal_scanned = len(self.text)
+
+            for rule in self._literal_rules:
+                if rule.rule_id in self._fired_literal_rules:
+                    continue
+                violations = self.ruleset._literal_violations(rule, self._present, self.term_mapping)
+                if violations:
+                    self._fired_literal_rules.add(rule.rule_id)
+                    new_violations.extend(violations)
+
+        # 정규식: lookback 구간부터 다시 스캔하되 끝부분 holdback 이내의 일치는 보류
+        if self._regex_rules:
+            stable_end = len(self.text) if final else len(self.text) - self.holdback
+            start = max(0, self._regex_scanned - self.regex_lookback)
+            for rule, compiled in self._regex_rules:
+                for match in compiled.finditer(self.text, start):
+                    if match.end() > stable_end:
+                        break
+                    key = (rule.rule_id, match.start())
+                    if key in self._reported_regex:
+                        continue
+                    self._reported_regex.add(key)
+                    violation = self.ruleset._regex_violation(rule, match)
+                    if violation:
+                        new_violations.append(violation)
+            self._regex_scanned = max(self._regex_scanned, stable_end)
+
+        self.violations.extend(new_violations)
+        return new_violations
+
+    def finish(self) -> List[QAViolation]:
+        """보류 중인 구간을 마저 검사하고 새로 발견된 위반 사항 반환"""
+        return self.feed("", final=True)
+
+
+# ===== 선언형 규칙 파일 =====
+
+DEFAULT_RULE_FILES = ["config/qa_rules.json"]
+
+# 규칙 파일 키 → QARule 필드
+_RULE_FIELDS = {
+    "id": "rule_id",
+    "group": "group",
+    "type": "kind",
+    "severity": "severity",
+    "description": "description",
+    "location": "location",
+    "found": "found",
+    "correction": "correct",
+    "target_pattern": "pattern",
+    "target_terms": "targets",
+    "source_trigger": "triggers",
+    "emit": "emit",
+    "skip_if_correct": "skip_if_correct",
+    "mapping_key": "mapping_key",
+    "check": "check",
+    "document_types": "document_types",
+}
+_RULE_KINDS = {"regex", "literal", "structural"}
+_SEVERITIES = {"critical", "major", "minor", "neutral"}
+
+# 규칙 집합 해시 → 컴파일된 규칙 집합
+_RULESET_CACHE: Dict[str, CompiledRuleSet] = {}
+
+
+def _hash_rules(rules: Sequence[QARule]) -> str:
+    payload = json.dumps([asdict(rule) for rule in rules], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parse_rule_file(path: Path, raw: bytes) -> List[QARule]:
+    """규칙 파일 내용을 QARule 목록으로 변환"""
+    if path.suffix.lower() in (".yaml", ".yml"):
+        import yaml
+        data = yaml.safe_load(raw.decode("utf-8")) or {}
+    else:
+        data = json.loads(raw.decode("utf-8"))
+
+    entries = data.get("rules", []) if isinstance(data, dict) else data
+    rules = []
+    for index, entry in enumerate(entries):
+        rule_id = entry.get("id", f"#{index}")
+        unknown = set(entry) - set(_RULE_FIELDS)
+        if unknown:
+            raise ValueError(f"{path}: 규칙 {rule_id}에 알 수 없는 키: {sorted(unknown)}")
+        for key in ("id", "group", "type", "severity"):
+            if key not in entry:
+                raise ValueError(f"{path}: 규칙 {rule_id}에 '{key}' 항목이 없습니다.")
+        if entry["type"] not in _RULE_KINDS:
+            raise ValueError(f"{path}: 규칙 {rule_id}의 type은 {sorted(_RULE_KINDS)} 중 하나여야 합니다.")
+        if entry["severity"] not in _SEVERITIES:
+            raise ValueError(f"{path}: 규칙 {rule_id}의 severity는 {sorted(_SEVERITIES)} 중 하나여야 합니다.")
+
+        kwargs = {_RULE_FIELDS[key]: value for key, value in entry.items()}
+        for key in ("targets", "triggers"):
+            if isinstance(kwargs.get(key), str):
+                kwargs[key] = [kwargs[key]]
+        rules.append(QARule(**kwargs))
+    return rules
+
+
+def load_ruleset(rule_paths: Optional[Sequence[str]] = None,
+                 extra_rules: Sequence[QARule] = ()) -> CompiledRuleSet:
+    """규칙 파일들을 로드하여 컴파일 (파일 내용 해시가 같으면 캐시 재사용)
+
+    extra_rules는 용어집 등 다른 설정에서 생성된 규칙으로, 파일 규칙보다 앞에 배치된다.
+    같은 id의 규칙이 여러 번 나오면 마지막 정의가 처음 위치에 적용된다.
+    """
+    rule_paths = DEFAULT_RULE_FILES if rule_paths is None else rule_paths
+    contents = []
+    digest = hashlib.sha256()
+    for rule_path in rule_paths:
+        path = Path(rule_path)
+        raw = path.read_bytes()
+        contents.append((path, raw))
+        digest.update(str(path).encode("utf-8") + b"\0" + raw + b"\0")
+    digest.update(_hash_rules(extra_rules).encode("utf-8"))
+    ruleset_hash = digest.hexdigest()
+
+    cached = _RULESET_CACHE.get(ruleset_hash)
+    if cached is not None:
+        return cached
+
+    # 같은 id의 규칙은 뒤에 오는 파일의 정의로 교체 (고객별 규칙 파일로 재정의)
+    rules: Dict[str, QARule] = {rule.rule_id: rule for rule in extra_rules}
+    for path, raw in contents:
+        for rule in _parse_rule_file(path, raw):
+            rules[rule.rule_id] = rule
+    ruleset = CompiledRuleSet(list(rules.values()), ruleset_hash=ruleset_hash)
+    _RULESET_CACHE[ruleset_hash] = ruleset
+    return ruleset
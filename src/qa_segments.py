@@ -0,0 +1,230 @@
+"""
+세그먼트 단위 증분 QA
+- 원문/번역을 세그먼트(청구항, 섹션, 문단) 단위로 정렬하여 검사
+- (세그먼트 해시, 규칙 집합 해시) 키로 검사 결과 캐시
+- 검수 중 수정된 세그먼트만 재검사
+- 위반 사항을 세그먼트 번호와 청구항 번호에 매핑
+"""
+
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from qa_engine import QAViolation
+
+
+# 원문 청구항 번호 (1., Claim 1.) / 번역 청구항 번호 (1., 청구항 1.)
+_SOURCE_CLAIM_NUMBER = re.compile(r'^\s*(?:Claim\s+)?(\d+)\.\s+', re.IGNORECASE)
+_TARGET_CLAIM_NUMBER = re.compile(r'^\s*(?:청구항\s*)?(\d+)\.\s*')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# (세그먼트 해시, 규칙 집합 해시) → 위반 사항 목록
+_SEGMENT_QA_CACHE: "OrderedDict[Tuple[str, str], List[QAViolation]]" = OrderedDict()
+SEGMENT_QA_CACHE_SIZE = 20000
+_SEGMENT_QA_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class QASegment:
+    """정렬된 원문/번역 세그먼트"""
+    index: int
+    source: str
+    target: str
+    document_type: str = "claim"
+    section_type: str = ""
+    claim_number: Optional[int] = None
+    unit_id: str = ""
+
+    @property
+    def label(self) -> str:
+        """리포트용 세그먼트 표시명"""
+        if self.claim_number is not None:
+            return f"청구항 {self.claim_number}"
+        if self.unit_id:
+            return f"{self.section_type} {self.unit_id}"
+        if self.section_type:
+            return f"{self.section_type} #{self.index + 1}"
+        return f"세그먼트 {self.index + 1}"
+
+
+def _claim_number(source: str, target: str) -> Optional[int]:
+    match = _SOURCE_CLAIM_NUMBER.match(source) or _TARGET_CLAIM_NUMBER.match(target)
+    return int(match.group(1)) if match else None
+
+
+def align_segments(source: str, translation: str, document_type: str = "claim") -> List[QASegment]:
+    """빈 줄 기준 문단으로 원문/번역 정렬
+
+    문단 수가 다르면 정렬할 수 없으므로 전체를 하나의 세그먼트로 취급한다.
+    """
+    source_parts = [p.strip() for p in _PARAGRAPH_BREAK.split(source.strip()) if p.strip()]
+    target_parts = [p.strip() for p in _PARAGRAPH_BREAK.split(translation.strip()) if p.strip()]
+
+    if not source_parts or len(source_parts) != len(target_parts):
+        source_parts, target_parts = [source.strip()], [translation.strip()]
+
+    return [
+        QASegment(
+            index=i,
+            source=src,
+            target=tgt,
+            document_type=document_type,
+            claim_number=_claim_number(src, tgt) if document_type == "claim" else None
+        )
+        for i, (src, tgt) in enumerate(zip(source_parts, target_parts))
+    ]
+
+
+def segments_from_sections(translated_sections: Dict[str, List[Tuple]], parser) -> List[QASegment]:
+    """자동 섹션 분류 결과 {섹션: [(PatentSection, 번역문)]}를 문서 순서의 세그먼트로 변환"""
+    items = [item for section_items in translated_sections.values() for item in section_items]
+    items.sort(key=lambda item: item[0].start_line)
+
+    segments = []
+    for i, (section, translation) in enumerate(items):
+        document_type = parser.get_document_type_from_section(section.section_type)
+        segments.append(QASegment(
+            index=i,
+            source=section.content,
+            target=translation,
+            document_type=document_type,
+            section_type=section.section_type,
+            unit_id=section.unit_id,
+            claim_number=_claim_number(section.content, translation) if document_type == "claim" else None
+        ))
+    return segments
+
+
+class SegmentQASession:
+    """세그먼트 단위 증분 QA 세션
+
+    검사 결과는 모듈 전역 캐시에 (세그먼트 해시, 규칙 집합 해시) 키로 저장되므로
+    같은 세그먼트는 세션이나 문서가 달라도 다시 검사하지 않는다.
+    """
+
+    def __init__(self, checker, segments: List[QASegment],
+                 term_mapping: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            checker: PatentQAChecker (ruleset 사용)
+            segments: 정렬된 세그먼트 목록
+            term_mapping: 용어 매핑 (세그먼트 해시에 포함)
+        """
+        self.checker = checker
+        self.segments = segments
+        self.term_mapping = term_mapping or {}
+        self._term_digest = hashlib.sha256(
+            json.dumps(self.term_mapping, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self._results: List[Optional[List[QAViolation]]] = [None] * len(segments)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _segment_hash(self, segment: QASegment) -> str:
+        payload = "\0".join([segment.document_type, segment.source, segment.target, self._term_digest])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _check_segment(self, segment: QASegment) -> List[QAViolation]:
+        ruleset = self.checker.ruleset
+        key = (self._segment_hash(segment), ruleset.ruleset_hash)
+
+        with _SEGMENT_QA_CACHE_LOCK:
+            cached = _SEGMENT_QA_CACHE.get(key)
+            if cached is not None:
+                _SEGMENT_QA_CACHE.move_to_end(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        self.cache_misses += 1
+        violations = ruleset.evaluate(segment.source, segment.target,
+                                      self.term_mapping, segment.document_type)
+        with _SEGMENT_QA_CACHE_LOCK:
+            _SEGMENT_QA_CACHE[key] = violations
+            if len(_SEGMENT_QA_CACHE) > SEGMENT_QA_CACHE_SIZE:
+                _SEGMENT_QA_CACHE.popitem(last=False)
+        return violations
+
+    def check(self) -> Dict:
+        """검사되지 않은 세그먼트만 검사하고 전체 결과 반환"""
+        for i, segment in enumerate(self.segments):
+            if self._results[i] is None:
+                self._results[i] = self._check_segment(segment)
+        return self.result()
+
+    def update_target(self, index: int, target: str) -> List[Dict]:
+        """세그먼트 번역문 수정 후 해당 세그먼트만 재검사. 세그먼트의 위반 사항 반환"""
+        if not 0 <= index < len(self.segments):
+            raise ValueError(f"세그먼트 번호가 범위를 벗어났습니다: {index}")
+
+        segment = self.segments[index]
+        segment.target = target
+        self._results[index] = self._check_segment(segment)
+        return [self._annotate(segment, v) for v in self._results[index]]
+
+    def segment_violations(self, index: int) -> List[Dict]:
+        """세그먼트의 위반 사항"""
+        violations = self._results[index]
+        if violations is None:
+            violations = self._results[index] = self._check_segment(self.segments[index])
+        return [self._annotate(self.segments[index], v) for v in violations]
+
+    def segment_passed(self, index: int) -> bool:
+        """세그먼트에 critical/major 위반이 없는지 여부"""
+        self.segment_violations(index)
+        return not any(v.severity in ("critical", "major") for v in self._results[index])
+
+    def _annotate(self, segment: QASegment, violation: QAViolation) -> Dict:
+        item = violation.to_dict()
+        item["location"] = f"{segment.label} / {violation.location}"
+        item["segment_index"] = segment.index
+        item["claim_number"] = segment.claim_number
+        item["section_type"] = segment.section_type
+        item["unit_id"] = segment.unit_id
+        return item
+
+    def result(self) -> Dict:
+        """check_all과 같은 형식의 집계 결과 (위반 사항에 세그먼트 정보 포함)"""
+        violations = []
+        annotated = []
+        for segment, segment_result in zip(self.segments, self._results):
+            for v in segment_result or []:
+                violations.append(v)
+                annotated.append(self._annotate(segment, v))
+
+        result = self.checker._summarize(violations)
+        result["violations"] = annotated
+        result["segments"] = len(self.segments)
+        result["segment_passed"] = [
+            not any(v.severity in ("critical", "major") for v in segment_result or [])
+            for segment_result in self._results
+        ]
+        result["cache_hits"] = self.cache_hits
+        result["cache_misses"] = self.cache_misses
+        return result
+
+    def translation(self) -> str:
+        """현재 세그먼트 번역문을 문단 순서대로 결합"""
+        return "\n\n".join(segment.target for segment in self.segments)
+
+
+if __name__ == "__main__":
+    # 테스트
+    from qa_checker import PatentQAChecker
+
+    checker = PatentQAChecker()
+    source = "1. A method comprising a compound.\n\n2. The method of claim 1, wherein the compound is heated."
+    translation = "1. 화합물을 포함하는 방법.\n\n2. 제1항에 있어서, 화합물은 가열되는 방법"
+
+    session = SegmentQASession(checker, align_segments(source, translation), {"compound": "화합물"})
+    result = session.check()
+    for v in result["violations"]:
+        print(f"[{v['severity']}] {v['location']}: {v['description']}")
+
+    session.update_target(1, "2. 제1항에 있어서, 상기 화합물은 가열되는 방법.")
+    result = session.check()
+    print(f"수정 후 위반: {result['total_violations']}개 (캐시 적중 {result['cache_hits']}, 검사 {result['cache_misses']})")
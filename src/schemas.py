@@ -1,3 +1,4 @@
+import operator
 from pydantic import BaseModel, Field
 from typing import Dict, TypedDict, Annotated, List
 from langchain_core.messages import BaseMessage
@@ -9,12 +10,61 @@ class AgentState(TypedDict):
     original_text: str
     document_type: str
     use_flash_review: bool
+    review_model: str
     analysis_result: dict
     draft_translation: str
     review_result: dict
     final_translation: str
     tm_match_found: bool
+    # Local (no-LLM) domain guess used for TM lookups, and fuzzy TM matches for the translator
+    domain_guess: str
+    tm_suggestions: List[dict]
     messages: Annotated[List[BaseMessage], lambda x, y: x + y]
+    # Review loop: number of translation attempts and the model used for the latest draft
+    iteration: int
+    translator_model: str
+    # Budget spent on this document (nodes return increments)
+    cost_usd: Annotated[float, operator.add]
+    llm_seconds: Annotated[float, operator.add]
+    # Set when the loop gives up and the draft is queued for a human reviewer
+    needs_human_review: bool
+    escalation_reason: str
+
+
+def merge_section_results(existing: List[dict], new: List[dict]) -> List[dict]:
+    """Reducer for section results: parallel branches append, a re-run of a section replaces it."""
+    merged = {item["seq"]: item for item in existing or []}
+    merged.update((item["seq"], item) for item in new or [])
+    return [merged[seq] for seq in sorted(merged)]
+
+
+class SectionTask(TypedDict):
+    """
+    Input of one section branch in the section fan-out graph (sent with Send).
+    """
+    seq: int
+    section: dict  # PatentSection fields
+    section_key: str  # parse_document key (title / abstract / claims / specification)
+    document_type: str
+    use_flash_review: bool
+    review_model: str
+
+
+class DocumentState(TypedDict):
+    """
+    State of the section fan-out graph: the document is split into sections, each section
+    runs through the per-text workflow in parallel, and the results are reassembled in order.
+    """
+    original_text: str
+    use_flash_review: bool
+    review_model: str
+    sections: List[dict]
+    # Each branch writes one result; the reducer makes parallel writes safe
+    section_results: Annotated[List[dict], merge_section_results]
+    final_translation: str
+    cost_usd: Annotated[float, operator.add]
+    llm_seconds: Annotated[float, operator.add]
+    needs_human_review: bool
 
 
 class AnalysisResult(BaseModel):
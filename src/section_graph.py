@@ -0,0 +1,183 @@
+from dataclasses import asdict
+from typing import Callable, Optional
+
+from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+from .agents import GRAPH_CONFIG
+from .graph import workflow, compiled_graph, node, thread_id_for, run_thread, arun_thread
+from .schemas import DocumentState, SectionTask
+from .section_parser import PatentSection, PatentSectionParser, iter_lines
+
+# Per-section workflow (triage -> analyze/tm_fuzzy -> translate <-> review -> save).
+# Section progress is checkpointed by the parent graph, so the branches run without their own checkpoints.
+section_app = workflow.compile(checkpointer=False)
+
+parser = PatentSectionParser()
+
+
+def split_sections_node(state: DocumentState):
+    """
+    Splits the document into sections (title, abstract, each claim, specification paragraphs).
+    """
+    print("--- Running Section Split Node ---")
+    sections = [
+        {
+            "section_key": key,
+            "section": asdict(section),
+            "document_type": parser.get_document_type_from_section(section.section_type),
+        }
+        for key, section in parser.iter_sections(iter_lines(state["original_text"]))
+    ]
+    if not sections and state["original_text"].strip():
+        # No section headers (e.g. a bare claim set): translate the whole document as one claim section
+        print("--- No section headers found. Translating the whole document as one section. ---")
+        text = state["original_text"].strip()
+        section = PatentSection(section_type="claim", content=text, start_line=0,
+                                end_line=text.count("\n"), unit_id="document", unit_type="text")
+        sections = [{"section_key": "claims", "section": asdict(section), "document_type": "claim"}]
+    print(f"--- Split into {len(sections)} sections. ---")
+    return {"sections": sections}
+
+
+def fan_out_sections(state: DocumentState):
+    """Conditional edge: one Send per section to the translate/review branch."""
+    if not state["sections"]:
+        return "assemble"
+    return [
+        Send("translate_section", {
+            "seq": seq,
+            "section": item["section"],
+            "section_key": item["section_key"],
+            "document_type": item["document_type"],
+            "use_flash_review": state.get("use_flash_review", False),
+            "review_model": state.get("review_model", ""),
+        })
+        for seq, item in enumerate(state["sections"])
+    ]
+
+
+def _section_input(task: SectionTask, config):
+    """Initial state and config of the per-text workflow for one section."""
+    section = task["section"]
+    print(f"--- Translating section {task['seq'] + 1}: {section['unit_id'] or section['section_type']} ---")
+    section_state = {
+        "original_text": section["content"],
+        "document_type": task["document_type"],
+        "use_flash_review": task["use_flash_review"],
+        "messages": [],
+        "iteration": 0,
+        "needs_human_review": False,
+        "escalation_reason": ""
+    }
+    if task.get("review_model"):
+        section_state["review_model"] = task["review_model"]
+
+    # Human-review items are filed under "<document thread>:<section>"
+    thread_id = config.get("configurable", {}).get("thread_id", "")
+    return section_state, {"configurable": {"thread_id": f"{thread_id}:{section['unit_id'] or task['seq']}"}}
+
+
+def _section_update(task: SectionTask, result: dict) -> dict:
+    return {
+        "section_results": [{
+            "seq": task["seq"],
+            "section_key": task["section_key"],
+            "section": task["section"],
+            "translation": result.get("final_translation") or result.get("draft_translation", ""),
+            "source": "TM" if result.get("tm_match_found") else result.get("translator_model", ""),
+            "review_passed": (result.get("review_result") or {}).get("passed"),
+            "iteration": result.get("iteration", 0),
+            "needs_human_review": result.get("needs_human_review", False),
+            "escalation_reason": result.get("escalation_reason", ""),
+        }],
+        "cost_usd": result.get("cost_usd", 0.0),
+        "llm_seconds": result.get("llm_seconds", 0.0),
+    }
+
+
+def translate_section_node(task: SectionTask, config):
+    """
+    Runs one section through the per-text workflow and reports its result to the parent.
+    """
+    section_state, section_config = _section_input(task, config)
+    return _section_update(task, section_app.invoke(section_state, section_config))
+
+
+async def atranslate_section_node(task: SectionTask, config):
+    """Async translate_section_node."""
+    section_state, section_config = _section_input(task, config)
+    return _section_update(task, await section_app.ainvoke(section_state, section_config))
+
+
+def assemble_node(state: DocumentState):
+    """
+    Reassembles the translated sections in document order (branches finish in any order).
+    """
+    print("--- Running Assemble Node ---")
+    translated_sections = {}
+    for item in state.get("section_results", []):
+        translated_sections.setdefault(item["section_key"], []).append(
+            (PatentSection(**item["section"]), item["translation"])
+        )
+    return {
+        "final_translation": parser.reconstruct_document(translated_sections),
+        "needs_human_review": any(r["needs_human_review"] for r in state.get("section_results", [])),
+    }
+
+
+# Define the graph
+section_workflow = StateGraph(DocumentState)
+
+section_workflow.add_node("split_sections", split_sections_node)
+section_workflow.add_node("translate_section", node(translate_section_node, atranslate_section_node))
+section_workflow.add_node("assemble", assemble_node)
+
+section_workflow.set_entry_point("split_sections")
+section_workflow.add_conditional_edges("split_sections", fan_out_sections, ["translate_section", "assemble"])
+# assemble runs once, after every branch has reported
+section_workflow.add_edge("translate_section", "assemble")
+section_workflow.add_edge("assemble", END)
+
+
+def run_sections(source_text: str, use_flash_review: bool = False, review_model: Optional[str] = None,
+                 thread_id: Optional[str] = None, fresh: bool = False,
+                 max_concurrency: Optional[int] = None) -> dict:
+    """Translate a document section by section, at most max_concurrency sections at a time
+    (default: graph.max_concurrency in config/api_config.yaml)."""
+    initial_state = {
+        "original_text": source_text,
+        "use_flash_review": use_flash_review,
+        "needs_human_review": False,
+    }
+    if review_model:
+        initial_state["review_model"] = review_model
+    return run_thread(
+        initial_state,
+        thread_id or thread_id_for(source_text, "sections"),
+        fresh=fresh,
+        # Completed branches are checkpointed, so a resumed run only redoes unfinished sections
+        graph=compiled_graph(section_workflow),
+        max_concurrency=max_concurrency or GRAPH_CONFIG["max_concurrency"],
+    )
+
+
+async def arun_sections(source_text: str, use_flash_review: bool = False, review_model: Optional[str] = None,
+                        thread_id: Optional[str] = None, fresh: bool = False,
+                        max_concurrency: Optional[int] = None,
+                        on_update: Optional[Callable[[str, dict], None]] = None) -> dict:
+    """Async run_sections; on_update(node_name, update) is called as each section finishes."""
+    initial_state = {
+        "original_text": source_text,
+        "use_flash_review": use_flash_review,
+        "needs_human_review": False,
+    }
+    if review_model:
+        initial_state["review_model"] = review_model
+    return await arun_thread(
+        initial_state,
+        thread_id or thread_id_for(source_text, "sections"),
+        fresh=fresh,
+        builder=section_workflow,
+        max_concurrency=max_concurrency or GRAPH_CONFIG["max_concurrency"],
+        on_update=on_update,
+    )
@@ -1,11 +1,13 @@
 """
 특허 명세서 섹션 자동 파싱
 - 제목(Title), 요약서(Abstract), 청구항(Claims), 명세서(Specification) 자동 구분
+- 파일 객체/라인 이터레이터를 한 줄씩 읽으며 섹션을 완성되는 즉시 반환
+- 명세서는 문단 번호([0001]), 도면 설명(FIG. 1), 표 단위로 분할하여 고유 ID 부여
 """
 
 import re
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -16,12 +18,34 @@ class PatentSection:
     start_line: int
     end_line: int
     heading: str = ""
+    unit_id: str = ""    # 문서 내 고유 ID (p0001, fig-1, claim-1, p0012.t1 등)
+    unit_type: str = ""  # paragraph, figure, table, text, claim
+    label: str = ""      # 번역 대상에서 분리한 문단 번호 ([0001])
+    depends_on: List[str] = field(default_factory=list)  # 인용하는 선행 청구항 ID (종속항)
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """문자열을 '\\n' 기준으로 나누어 한 줄씩 반환 (str.split('\\n')과 같은 결과, 리스트 생성 없음)"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
 
 
 class PatentSectionParser:
     """특허 명세서 섹션 파서"""
 
-    def __init__(self):
+    def __init__(self, split_units: bool = True):
+        """
+        Args:
+            split_units: 명세서를 문단 번호/도면 설명/표 단위로 분할 (False면 헤더 단위 통짜 섹션)
+        """
+        self.split_units = split_units
+
         # 영문 섹션 헤더 패턴
         self.section_patterns = {
             'title': [
@@ -60,6 +84,42 @@ class PatentSectionParser:
         # 청구항 번호 패턴 (1., Claim 1, 등)
         self.claim_number_pattern = r'^\s*(?:Claim\s+)?(\d+)\.\s+'
 
+        # 종속항의 인용 청구항 (claim 1, claims 1 or 2, any one of claims 1 to 5)
+        self.claim_reference_pattern = (r'\bclaims?\s+(\d+(?:\s*(?:-|–|to|through|or|and|,)\s*'
+                                        r'(?:any\s+one\s+of\s+)?(?:claims?\s+)?\d+)*)')
+
+        # 명세서 단위 패턴: 문단 번호 ([0001], 【0001】), 도면 설명 (FIG. 1 is ...), 표 (| ... |)
+        self.paragraph_pattern = r'^[\[【]\s*(\d{3,5})\s*[\]】]\s*'
+        self.figure_pattern = (r'^(?:FIG(?:URE)?S?\.?)\s*(\d+[A-Za-z]?)'
+                               r'(?:\s*(?:and|to|-)\s*\d+[A-Za-z]?)?\s+(?:is|are|shows?|illustrates?|depicts?)\b')
+        self.table_pattern = r'^\|'
+
+        # Background, Summary, Description은 specification으로 통합
+        self.section_aliases = {
+            'background': 'specification',
+            'summary': 'specification',
+            'description': 'specification',
+            'drawings': 'specification',
+        }
+        self._compile_patterns()
+
+    def _compile_patterns(self):
+        """섹션 헤더 패턴을 이름 있는 그룹의 단일 정규식으로 컴파일
+
+        대안은 section_patterns 순서대로 시도되므로 기존의 순차 검사와 같은 섹션이 선택된다.
+        section_patterns를 수정한 경우 다시 호출해야 한다.
+        """
+        alternatives = [
+            f"(?P<{section_type}>{'|'.join(f'(?:{p.lstrip(chr(94))})' for p in patterns)})"
+            for section_type, patterns in self.section_patterns.items()
+        ]
+        self._header_regex = re.compile('^(?:' + '|'.join(alternatives) + ')')
+        self._claim_number_regex = re.compile(self.claim_number_pattern)
+        self._claim_reference_regex = re.compile(self.claim_reference_pattern, re.IGNORECASE)
+        self._paragraph_regex = re.compile(self.paragraph_pattern)
+        self._figure_regex = re.compile(self.figure_pattern, re.IGNORECASE)
+        self._table_regex = re.compile(self.table_pattern)
+
     def parse_document(self, text: str) -> Dict[str, List[PatentSection]]:
         """
         특허 문서를 섹션별로 파싱
@@ -72,19 +132,104 @@ class PatentSectionParser:
                 'specification': [PatentSection],  # Background, Summary, Description 통합
             }
         """
-        lines = text.split('\n')
         sections = {
             'title': [],
             'abstract': [],
             'claims': [],
             'specification': []
         }
+        for key, section in self.iter_sections(iter_lines(text)):
+            sections[key].append(section)
+        return sections
+
+    def parse_file(self, path: str, encoding: str = 'utf-8') -> Iterator[Tuple[str, PatentSection]]:
+        """파일을 한 줄씩 읽으며 섹션 생성 (전체를 메모리에 올리지 않음)"""
+        with open(path, 'r', encoding=encoding) as f:
+            yield from self.iter_sections(f)
+
+    def iter_sections(self, lines: Iterable[str]) -> Iterator[Tuple[str, PatentSection]]:
+        """
+        라인 이터레이터(파일 객체 포함)에서 섹션이 완성되는 즉시 생성
+
+        청구항은 청구항별로, 명세서는 split_units=True이면 문단/도면 설명/표 단위로 나뉜다.
+        섹션 헤더는 그 헤더 아래의 첫 번째 섹션(단위)의 heading에 기록된다.
 
+        Yields:
+            (parse_document 결과의 키, PatentSection) - 문서 순서대로
+        """
         current_section = None
         section_start = 0
         section_content = []
+        unit = None  # 현재 단위 (unit_type, label, unit_id), None이면 번호 없는 텍스트
+        heading = ""
+        anchor = ""  # 번호 없는 단위의 ID 기준 (직전 번호 단위 ID)
+        anchor_count = 0
+        seen_ids: Dict[str, int] = {}
+        i = -1
+
+        def flush(end_line: int):
+            """누적된 내용을 섹션으로 생성 (내용이 없으면 None, heading은 다음 단위로 이월)"""
+            nonlocal heading, anchor_count
+            content = '\n'.join(section_content).strip()
+            if not current_section or not content:
+                return None
+
+            unit_type, label, unit_id = unit or ('text', '', None)
+            if unit_id is None:
+                # 번호 없는 텍스트/표: 섹션 이름 또는 직전 번호 단위 기준 ID (p0012.1, p0012.t2)
+                if current_section in ('title', 'abstract', 'claims'):
+                    unit_id = current_section
+                else:
+                    anchor_count += 1
+                    prefix = 't' if unit_type == 'table' else ''
+                    unit_id = f"{anchor or 'spec'}.{prefix}{anchor_count}"
+            if label:
+                content = content[len(label):].lstrip() if content.startswith(label) else content
+            seen_ids[unit_id] = seen_ids.get(unit_id, 0) + 1
+            if seen_ids[unit_id] > 1:
+                unit_id = f"{unit_id}-{seen_ids[unit_id]}"
+
+            if unit_type == 'claim':
+                item = self._build_claim(content, section_start, end_line, heading)
+                if item:
+                    item[1].depends_on = [
+                        f"claim-{n}" for n in self.claim_references(content, int(unit_id.split('-')[1]))
+                    ]
+            else:
+                item = self._build_section(current_section, content, section_start, end_line, heading)
+            if item:
+                item[1].unit_id, item[1].unit_type, item[1].label = unit_id, unit_type, label
+                heading = ""
+            return item
+
+        def unit_boundary(line_stripped: str):
+            """새 단위가 시작되는 줄이면 (unit_type, label, unit_id) 반환 (ID가 None이면 flush 시 부여)"""
+            if current_section == 'claims':
+                match = self._claim_number_regex.match(line_stripped)
+                return ('claim', '', f"claim-{match.group(1)}") if match else None
+
+            if not self.split_units or current_section != 'specification':
+                return None
+
+            in_table = unit is not None and unit[0] == 'table'
+            # 단위 시작 줄은 '[', '【', 'F', '|'로 시작하므로 나머지는 정규식 생략
+            if line_stripped[0] not in '[【Ff|':
+                return ('text', '', None) if in_table else None
+            match = self._paragraph_regex.match(line_stripped)
+            if match:
+                return 'paragraph', match.group(0).strip(), f"p{match.group(1)}"
+            match = self._figure_regex.match(line_stripped)
+            if match:
+                return 'figure', '', f"fig-{match.group(1).lower()}"
+            if self._table_regex.match(line_stripped):
+                return None if in_table else ('table', '', None)
+            if in_table:
+                # 표가 끝난 뒤의 번호 없는 텍스트
+                return 'text', '', None
+            return None
 
         for i, line in enumerate(lines):
+            line = line.rstrip('\n')
             line_stripped = line.strip()
 
             # 빈 줄 스킵
@@ -97,116 +242,98 @@ class PatentSectionParser:
             detected_section = self._detect_section_header(line_stripped)
 
             if detected_section:
-                # 이전 섹션 저장
-                if current_section and section_content:
-                    self._save_section(
-                        sections,
-                        current_section,
-                        '\n'.join(section_content).strip(),
-                        section_start,
-                        i - 1,
-                        line_stripped
-                    )
+                # 이전 섹션 생성
+                item = flush(i - 1)
+                if item:
+                    yield item
 
                 # 새 섹션 시작
                 current_section = detected_section
                 section_start = i
                 section_content = []
+                unit = None
+                heading = line_stripped
+                if detected_section != 'specification':
+                    anchor, anchor_count = "", 0
+                continue
 
-            # 청구항 섹션 내에서 개별 청구항 감지
-            elif current_section == 'claims':
-                claim_match = re.match(self.claim_number_pattern, line_stripped)
-                if claim_match:
-                    # 이전 청구항 저장
-                    if section_content:
-                        self._save_claim(
-                            sections,
-                            '\n'.join(section_content).strip(),
-                            section_start,
-                            i - 1
-                        )
-
-                    # 새 청구항 시작
-                    section_start = i
-                    section_content = [line]
-                else:
-                    section_content.append(line)
+            # 청구항/명세서 단위 경계 감지
+            boundary = unit_boundary(line_stripped)
+            if boundary:
+                item = flush(i - 1)
+                if item:
+                    yield item
 
-            # 일반 내용 누적
+                # 새 단위 시작 (문단/도면 설명은 이후 번호 없는 단위의 ID 기준이 됨)
+                section_start = i
+                section_content = [line]
+                unit = boundary
+                if boundary[0] in ('paragraph', 'figure'):
+                    anchor, anchor_count = boundary[2], 0
             else:
                 section_content.append(line)
 
-        # 마지막 섹션 저장
-        if current_section and section_content:
-            if current_section == 'claims':
-                self._save_claim(
-                    sections,
-                    '\n'.join(section_content).strip(),
-                    section_start,
-                    len(lines) - 1
-                )
-            else:
-                self._save_section(
-                    sections,
-                    current_section,
-                    '\n'.join(section_content).strip(),
-                    section_start,
-                    len(lines) - 1,
-                    ""
-                )
-
-        return sections
-
-    def _detect_section_header(self, line: str) -> str:
+        # 마지막 섹션 생성
+        item = flush(i)
+        if item:
+            yield item
+
+    def claim_references(self, text: str, claim_number: int) -> List[int]:
+        """청구항이 인용하는 선행 청구항 번호 (범위 표현 전개, 자기 자신 이후 번호는 제외)"""
+        references = []
+        for match in self._claim_reference_regex.finditer(text):
+            range_start = None
+            previous = None
+            for token in re.finditer(r'(\d+)|(-|–|to|through)', match.group(1)):
+                if token.group(1):
+                    number = int(token.group(1))
+                    if range_start is not None:
+                        references.extend(range(range_start + 1, number + 1))
+                        range_start = None
+                    else:
+                        references.append(number)
+                    previous = number
+                elif previous is not None:
+                    range_start = previous
+
+        return sorted({n for n in references if 0 < n < claim_number})
+
+    def _detect_section_header(self, line: str) -> Optional[str]:
         """라인에서 섹션 헤더 감지"""
-        line_upper = line.upper()
-
-        for section_type, patterns in self.section_patterns.items():
-            for pattern in patterns:
-                if re.match(pattern, line_upper):
-                    # Background, Summary, Description은 specification으로 통합
-                    if section_type in ['background', 'summary', 'description', 'drawings']:
-                        return 'specification'
-                    return section_type
-
-        return None
-
-    def _save_section(self, sections: Dict, section_type: str, content: str,
-                     start_line: int, end_line: int, heading: str):
-        """섹션 저장"""
+        match = self._header_regex.match(line.upper())
+        if not match:
+            return None
+        section_type = match.lastgroup
+        return self.section_aliases.get(section_type, section_type)
+
+    def _build_section(self, section_type: str, content: str, start_line: int,
+                       end_line: int, heading: str = "") -> Optional[Tuple[str, PatentSection]]:
+        """섹션 생성 (title, abstract, claims 외에는 specification으로 분류)"""
         if not content:
-            return
+            return None
 
-        # title, abstract, claims는 그대로 저장
-        if section_type in ['title', 'abstract', 'claims']:
-            sections[section_type].append(PatentSection(
-                section_type=section_type,
-                content=content,
-                start_line=start_line,
-                end_line=end_line,
-                heading=heading
-            ))
-        # specification은 누적
-        else:
-            sections['specification'].append(PatentSection(
-                section_type='specification',
-                content=content,
-                start_line=start_line,
-                end_line=end_line,
-                heading=heading
-            ))
-
-    def _save_claim(self, sections: Dict, content: str, start_line: int, end_line: int):
-        """청구항 저장"""
+        key = section_type if section_type in ['title', 'abstract', 'claims'] else 'specification'
+        return key, PatentSection(
+            section_type=key,
+            content=content,
+            start_line=start_line,
+            end_line=end_line,
+            heading=heading
+        )
+
+    def _build_claim(self, content: str, start_line: int, end_line: int,
+                     heading: str = "") -> Optional[Tuple[str, PatentSection]]:
+        """청구항 생성"""
         if not content:
-            return
+            return None
 
-        sections['claims'].append(PatentSection(
+        return 'claims', PatentSection(
             section_type='claim',
             content=content,
             start_line=start_line,
-            end_line=end_line
-        ))
+            end_line=end_line,
+            heading=heading
+        )
 
     def get_document_type_from_section(self, section_type: str) -> str:
         """섹션 타입을 문서 타입으로 변환"""
@@ -239,6 +366,9 @@ class PatentSectionParser:
                 result.append(self._translate_header(original_section.heading))
                 result.append("")
 
+            # 문단 번호는 번역 대상에서 분리되어 있으므로 다시 붙임
+            if original_section.label:
+                translated_text = f"{original_section.label} {translated_text}"
             result.append(translated_text)
             result.append("")
 
@@ -296,5 +426,5 @@ This invention relates to data processing...
     for section_type, items in sections.items():
         print(f"\n{section_type.upper()}: {len(items)}개")
         for i, section in enumerate(items, 1):
-            print(f"  [{i}] Lines {section.start_line}-{section.end_line}")
+            print(f"  [{i}] {section.unit_id} Lines {section.start_line}-{section.end_line}")
             print(f"      {section.content[:50]}...")
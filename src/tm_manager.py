@@ -7,7 +7,8 @@ Translation Memory 관리 시스템
 
 import sqlite3
 import hashlib
-from typing import List, Dict, Tuple
+import threading
+from typing import List, Dict, Optional, Tuple, Iterator
 from pathlib import Path
 from difflib import SequenceMatcher
 
@@ -19,11 +20,13 @@ class TranslationMemory:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn = None
+        # 청구항 병렬 번역 등 여러 스레드에서 같은 연결을 공유하므로 접근을 직렬화
+        self._lock = threading.RLock()
         self._init_database()
 
     def _init_database(self):
         """데이터베이스 초기화"""
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         cursor = self.conn.cursor()
 
         cursor.execute('''
@@ -63,65 +66,75 @@ class TranslationMemory:
         try:
             source_hash = self._calculate_hash(source)
 
-            cursor = self.conn.cursor()
-            cursor.execute('''
-            INSERT OR REPLACE INTO translation_memory
-            (source_text, target_text, source_hash, domain, document_type, quality_score)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (source, target, source_hash, domain, document_type, quality_score))
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                INSERT OR REPLACE INTO translation_memory
+                (source_text, target_text, source_hash, domain, document_type, quality_score)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', (source, target, source_hash, domain, document_type, quality_score))
 
-            self.conn.commit()
+                self.conn.commit()
             return True
 
         except Exception as e:
             print(f"TM 추가 오류: {e}")
             return False
 
+    def get_exact(self, source: str) -> Optional[Dict]:
+        """해시로 정확히 일치하는 항목만 조회 (유사도 계산 없음)"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            SELECT source_text, target_text, domain, quality_score
+            FROM translation_memory
+            WHERE source_hash = ?
+            ''', (self._calculate_hash(source),))
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        return {
+            "source": row[0],
+            "target": row[1],
+            "domain": row[2],
+            "quality_score": row[3],
+            "similarity": 1.0,
+            "match_type": "exact"
+        }
+
     def search(self, source: str, domain: str = None,
                similarity_threshold: float = 0.85,
                max_results: int = 5) -> List[Dict]:
         """유사 문장 검색"""
-        cursor = self.conn.cursor()
+        with self._lock:
+            # 정확히 일치하는 항목 먼저 검색
+            exact_match = self.get_exact(source)
+            if exact_match:
+                return [exact_match]
 
-        # 정확히 일치하는 항목 먼저 검색
-        source_hash = self._calculate_hash(source)
-        cursor.execute('''
-        SELECT source_text, target_text, domain, quality_score, 1.0 as similarity
-        FROM translation_memory
-        WHERE source_hash = ?
-        ''', (source_hash,))
-
-        exact_match = cursor.fetchone()
-        if exact_match:
-            return [{
-                "source": exact_match[0],
-                "target": exact_match[1],
-                "domain": exact_match[2],
-                "quality_score": exact_match[3],
-                "similarity": 1.0,
-                "match_type": "exact"
-            }]
-
-        # 도메인 필터
-        if domain:
-            query = '''
-            SELECT source_text, target_text, domain, quality_score
-            FROM translation_memory
-            WHERE domain = ?
-            ORDER BY quality_score DESC
-            LIMIT 100
-            '''
-            cursor.execute(query, (domain,))
-        else:
-            query = '''
-            SELECT source_text, target_text, domain, quality_score
-            FROM translation_memory
-            ORDER BY quality_score DESC
-            LIMIT 100
-            '''
-            cursor.execute(query)
+            cursor = self.conn.cursor()
 
-        candidates = cursor.fetchall()
+            # 도메인 필터
+            if domain:
+                query = '''
+                SELECT source_text, target_text, domain, quality_score
+                FROM translation_memory
+                WHERE domain = ?
+                ORDER BY quality_score DESC
+                LIMIT 100
+                '''
+                cursor.execute(query, (domain,))
+            else:
+                query = '''
+                SELECT source_text, target_text, domain, quality_score
+                FROM translation_memory
+                ORDER BY quality_score DESC
+                LIMIT 100
+                '''
+                cursor.execute(query)
+
+            candidates = cursor.fetchall()
 
         # 유사도 계산
         results = []
@@ -142,29 +155,69 @@ class TranslationMemory:
 
         return results[:max_results]
 
+    def iter_entries(self, batch_size: int = 1000, after_id: int = 0,
+                     domain: str = None) -> Iterator[Dict]:
+        """TM 항목 순차 조회 (id 순, 배치 단위로 읽어 메모리 사용량 제한)"""
+        cursor = self.conn.cursor()
+        last_id = after_id
+
+        while True:
+            if domain:
+                cursor.execute('''
+                SELECT id, source_text, target_text, domain, document_type, quality_score
+                FROM translation_memory
+                WHERE id > ? AND domain = ?
+                ORDER BY id
+                LIMIT ?
+                ''', (last_id, domain, batch_size))
+            else:
+                cursor.execute('''
+                SELECT id, source_text, target_text, domain, document_type, quality_score
+                FROM translation_memory
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+                ''', (last_id, batch_size))
+
+            rows = cursor.fetchall()
+            if not rows:
+                return
+
+            for row in rows:
+                yield {
+                    "id": row[0],
+                    "source": row[1],
+                    "target": row[2],
+                    "domain": row[3],
+                    "document_type": row[4],
+                    "quality_score": row[5]
+                }
+            last_id = rows[-1][0]
+
     def get_stats(self) -> Dict:
         """TM 통계"""
-        cursor = self.conn.cursor()
+        with self._lock:
+            cursor = self.conn.cursor()
 
-        # 전체 개수
-        cursor.execute('SELECT COUNT(*) FROM translation_memory')
-        total = cursor.fetchone()[0]
+            # 전체 개수
+            cursor.execute('SELECT COUNT(*) FROM translation_memory')
+            total = cursor.fetchone()[0]
 
-        # 도메인별 개수
-        cursor.execute('''
-        SELECT domain, COUNT(*) as count
-        FROM translation_memory
-        GROUP BY domain
-        ''')
-        domain_counts = dict(cursor.fetchall())
+            # 도메인별 개수
+            cursor.execute('''
+            SELECT domain, COUNT(*) as count
+            FROM translation_memory
+            GROUP BY domain
+            ''')
+            domain_counts = dict(cursor.fetchall())
 
-        # 문서 유형별 개수
-        cursor.execute('''
-        SELECT document_type, COUNT(*) as count
-        FROM translation_memory
-        GROUP BY document_type
-        ''')
-        type_counts = dict(cursor.fetchall())
+            # 문서 유형별 개수
+            cursor.execute('''
+            SELECT document_type, COUNT(*) as count
+            FROM translation_memory
+            GROUP BY document_type
+            ''')
+            type_counts = dict(cursor.fetchall())
 
         return {
             "total": total,
@@ -0,0 +1,345 @@
+"""
+번역 서버 (ASGI)
+- 파이프라인(용어집, QA 규칙 세트, TM 연결, LLM 클라이언트)을 한 번만 초기화하여 모든 요청이 공유
+- 번역은 제한된 워커 스레드 풀에서 실행, 실행 중 + 대기 작업이 한도를 넘으면 429로 거절 (백프레셔)
+- 엔드포인트
+    POST /jobs                  번역 작업 제출 → 202 {"job_id", "status"}
+    GET  /jobs/{job_id}         작업 상태
+    GET  /jobs/{job_id}/result  번역 결과 (완료 전에는 409)
+    GET  /jobs/{job_id}/stream  진행 상황 (Server-Sent Events)
+    GET  /health                워커/대기열 상태
+- 웹 프레임워크 없이 ASGI 규격만 사용 (실행: uvicorn, 테스트: httpx.ASGITransport)
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+DOCUMENT_TYPES = ('claim', 'specification', 'abstract')
+
+
+class QueueFullError(Exception):
+    """실행 중 + 대기 작업 수가 한도에 도달함"""
+
+
+@dataclass
+class ServerJob:
+    """서버 번역 작업"""
+    job_id: str
+    options: Dict
+    status: str = "queued"  # queued / running / done / failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[Dict] = field(default_factory=list)
+    result: Optional[Dict] = None
+    error: str = ""
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._waiters = []  # (이벤트 루프, asyncio.Event) - stream 구독자
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def add_event(self, event: str, message: str = "", **data):
+        """진행 이벤트 추가 후 stream 구독자 깨우기 (워커 스레드에서 호출)"""
+        with self._lock:
+            self.events.append({"seq": len(self.events), "event": event, "message": message,
+                                "time": time.time(), **data})
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(waiter.set)
+
+    def subscribe(self, loop, waiter: asyncio.Event) -> int:
+        """새 이벤트 알림 등록. Returns: 현재 이벤트 수 (등록 전에 추가된 이벤트 확인용)"""
+        with self._lock:
+            self._waiters.append((loop, waiter))
+            return len(self.events)
+
+    def summary(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": (self.finished_at or time.time()) - (self.started_at or self.created_at),
+            "events": len(self.events),
+            "error": self.error,
+        }
+
+
+class TranslationService:
+    """워밍된 파이프라인과 제한된 워커 풀로 번역 작업 실행"""
+
+    def __init__(self, pipeline=None, workers: int = 2, max_pending: int = 16,
+                 max_finished: int = 1000):
+        """
+        Args:
+            pipeline: TranslationPipeline (None이면 생성). 모든 작업이 공유한다.
+            workers: 동시에 번역할 작업 수
+            max_pending: 워커를 기다릴 수 있는 작업 수 (초과 제출은 QueueFullError)
+            max_finished: 메모리에 보관할 완료 작업 수 (오래된 것부터 제거)
+        """
+        if workers < 1:
+            raise ValueError(f"워커 수는 1 이상이어야 합니다: {workers}")
+        if max_pending < 0:
+            raise ValueError(f"대기 작업 수는 0 이상이어야 합니다: {max_pending}")
+        if pipeline is None:
+            from pipeline import TranslationPipeline
+            pipeline = TranslationPipeline()
+        self.pipeline = pipeline
+        self.workers = workers
+        self.capacity = workers + max_pending
+        self.max_finished = max_finished
+        self.jobs: "OrderedDict[str, ServerJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+
+    def submit(self, text: str, document_type: str = "claim", use_self_review: bool = True,
+               save_to_tm: bool = True, auto_section: bool = False) -> ServerJob:
+        """작업 제출 (즉시 반환). 한도 초과 시 QueueFullError"""
+        if not text or not text.strip():
+            raise ValueError("번역할 텍스트가 없습니다")
+        if document_type not in DOCUMENT_TYPES:
+            raise ValueError(f"지원하지 않는 문서 유형: {document_type} ({', '.join(DOCUMENT_TYPES)})")
+
+        job = ServerJob(uuid.uuid4().hex, {
+            "document_type": document_type,
+            "use_self_review": use_self_review,
+            "save_to_tm": save_to_tm,
+            "auto_section": auto_section,
+        })
+        with self._lock:
+            if self._active >= self.capacity:
+                raise QueueFullError(f"번역 대기열이 가득 찼습니다 ({self._active}/{self.capacity})")
+            self._active += 1
+            self.jobs[job.job_id] = job
+            self._prune()
+        job.add_event("queued", "대기 중")
+        self._executor.submit(self._run, job, text)
+        return job
+
+    def get(self, job_id: str) -> Optional[ServerJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            running = sum(1 for job in self.jobs.values() if job.status == "running")
+            queued = sum(1 for job in self.jobs.values() if job.status == "queued")
+        return {"workers": self.workers, "capacity": self.capacity, "running": running, "queued": queued}
+
+    def close(self):
+        """실행 중인 작업이 끝날 때까지 기다린 뒤 정리"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.pipeline.close()
+
+    def _prune(self):
+        """완료 작업이 max_finished를 넘으면 오래된 것부터 제거 (_lock 보유 상태에서 호출)"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    def _run(self, job: ServerJob, text: str):
+        job.status = "running"
+        job.started_at = time.time()
+        job.add_event("started", "번역 시작")
+        try:
+            options = job.options
+            if options["auto_section"]:
+                result = self.pipeline.translate_sections(
+                    source_text=text,
+                    use_self_review=options["use_self_review"],
+                    save_to_tm=options["save_to_tm"],
+                    job_id=job.job_id,
+                    progress_callback=lambda message: job.add_event("progress", message)
+                )
+            else:
+                result = self.pipeline.translate_document(
+                    source_text=text,
+                    document_type=options["document_type"],
+                    use_self_review=options["use_self_review"],
+                    save_to_tm=options["save_to_tm"],
+                    job_id=job.job_id
+                )
+            if not result["success"]:
+                raise RuntimeError(result.get("error") or "번역 실패")
+
+            job.result = self._serialize(result)
+            job.status = "done"
+            job.finished_at = time.time()
+            job.add_event("done", "번역 완료")
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            job.finished_at = time.time()
+            job.add_event("failed", str(e))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _serialize(self, result: Dict) -> Dict:
+        """파이프라인 결과에서 JSON으로 보낼 항목만 추출"""
+        data = {
+            "translation": result["translation"],
+            "source": result.get("source", ""),
+        }
+        if "qa_result" in result:
+            qa_result = result["qa_result"]
+            data["qa"] = {
+                "passed": qa_result["passed"],
+                "total_violations": qa_result["total_violations"],
+                "violations": qa_result.get("violations", []),
+                "report": self.pipeline.qa_checker.generate_report(qa_result),
+            }
+        if "sections" in result:
+            data["sections"] = result["sections"]
+        return data
+
+
+def create_app(service: TranslationService, keepalive_seconds: float = 15.0):
+    """TranslationService를 HTTP로 노출하는 ASGI 앱"""
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        parts = [part for part in scope["path"].split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            await _send_json(send, 200, {"status": "ok", **service.stats()})
+        elif parts == ["jobs"] and method == "POST":
+            await _submit(receive, send)
+        elif len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = service.get(parts[1])
+            if job is None:
+                await _send_json(send, 404, {"error": f"작업을 찾을 수 없습니다: {parts[1]}"})
+            elif len(parts) == 2:
+                await _send_json(send, 200, job.summary())
+            elif parts[2] == "result":
+                await _result(send, job)
+            elif parts[2] == "stream":
+                await _stream(send, job)
+            else:
+                await _send_json(send, 404, {"error": "not found"})
+        else:
+            await _send_json(send, 404, {"error": "not found"})
+
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await asyncio.to_thread(service.close)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _submit(receive, send):
+        try:
+            payload = json.loads(await _read_body(receive) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("요청 본문은 JSON 객체여야 합니다")
+            job = service.submit(
+                text=payload.get("text", ""),
+                document_type=payload.get("document_type", "claim"),
+                use_self_review=bool(payload.get("use_self_review", True)),
+                save_to_tm=bool(payload.get("save_to_tm", True)),
+                auto_section=bool(payload.get("auto_section", False)),
+            )
+        except json.JSONDecodeError as e:
+            await _send_json(send, 400, {"error": f"잘못된 JSON: {e}"})
+        except ValueError as e:
+            await _send_json(send, 400, {"error": str(e)})
+        except QueueFullError as e:
+            await _send_json(send, 429, {"error": str(e)}, headers=[(b"retry-after", b"5")])
+        else:
+            await _send_json(send, 202, {"job_id": job.job_id, "status": job.status},
+                             headers=[(b"location", f"/jobs/{job.job_id}".encode())])
+
+    async def _result(send, job: ServerJob):
+        if not job.finished:
+            await _send_json(send, 409, {"error": "작업이 아직 끝나지 않았습니다", **job.summary()})
+        elif job.status == "failed":
+            await _send_json(send, 500, job.summary())
+        else:
+            await _send_json(send, 200, {**job.summary(), "result": job.result})
+
+    async def _stream(send, job: ServerJob):
+        """이벤트를 SSE로 전송, 작업이 끝나면 연결 종료 (유휴 시 keepalive 주석 전송)"""
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+        ]})
+        loop = asyncio.get_running_loop()
+        sent = 0
+        last_event = ""
+        while last_event not in ("done", "failed"):
+            waiter = asyncio.Event()
+            available = job.subscribe(loop, waiter)
+            for event in job.events[sent:available]:
+                data = json.dumps(event, ensure_ascii=False)
+                await send({"type": "http.response.body", "more_body": True,
+                            "body": f"event: {event['event']}\ndata: {data}\n\n".encode("utf-8")})
+                last_event = event["event"]
+            sent = available
+            if last_event in ("done", "failed"):
+                break
+            try:
+                await asyncio.wait_for(waiter.wait(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    return app
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, status: int, data: Dict, headers: Optional[List] = None):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"content-length", str(len(body)).encode()),
+        *(headers or []),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = 2, max_pending: int = 16):
+    """uvicorn으로 서버 실행 (파이프라인은 시작 시 한 번 초기화)"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise ImportError("uvicorn이 설치되어 있지 않습니다: pip install uvicorn")
+
+    import logging
+    from logger import TranslationLogger
+    from pipeline import TranslationPipeline
+
+    # 작업별 단계 소요 시간/토큰을 logs/metrics.jsonl에 기록 (작업 ID = 서버 작업 ID)
+    pipeline = TranslationPipeline(logger=TranslationLogger.from_config(console_level=logging.WARNING))
+    service = TranslationService(pipeline=pipeline, workers=workers, max_pending=max_pending)
+    # 파이프라인과 작업 상태를 공유해야 하므로 단일 프로세스로 실행
+    uvicorn.run(create_app(service), host=host, port=port, workers=1)
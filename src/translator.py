@@ -5,50 +5,76 @@ Gemini API 번역 엔진
 - 3단계 번역 프로세스 (분석 → 번역 → 검증)
 """
 
-import os
 import json
 import re
 import yaml
-from typing import Dict, Optional
-import google.generativeai as genai
-from dotenv import load_dotenv
+import threading
+from typing import Dict, List, Optional
 from pathlib import Path
 
-load_dotenv()
+from llm_clients import check_credentials, generation_config, get_client
+from logger import record_tokens, span
 
 
 class PatentTranslator:
     """특허 번역 엔진"""
 
     def __init__(self, config_path: str = "config/api_config.yaml"):
-        # API 키 설정
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY 환경 변수를 설정해야 합니다.")
-        genai.configure(api_key=api_key)
+        # LLM 백엔드 자격 증명 확인 (클라이언트는 첫 요청 시 생성)
+        check_credentials()
 
         # API 설정 로드
         with open(config_path, 'r', encoding='utf-8') as f:
             config = yaml.safe_load(f)
         
         self.google_config = config.get("google", {})
+        self.qa_config = config.get("qa", {})
         self.model_name = self.google_config.get("model", "gemini-2.5-flash")
         
-        # GenerationConfig 설정
-        self.generation_config = genai.types.GenerationConfig(
+        # 생성 설정 (현재 LLM 백엔드 형식)
+        self.generation_config = generation_config(
             max_output_tokens=self.google_config.get("max_output_tokens", 8192),
             temperature=self.google_config.get("temperature", 0.0),
             top_p=self.google_config.get("top_p", 1.0)
         )
 
-        # GenerativeModel 인스턴스 생성
-        self.model = genai.GenerativeModel(self.model_name)
+        # 요청 속도 제한 (acquire()를 제공하는 객체, 배치 번역 등에서 설정)
+        self.rate_limiter = None
+        # 누적 토큰 사용량 (여러 스레드에서 호출될 수 있음)
+        self.token_usage = {"requests": 0, "prompt_tokens": 0, "output_tokens": 0}
+        self._usage_lock = threading.Lock()
         
     def set_model(self, model_name: str):
         """번역에 사용할 모델을 설정합니다."""
         print(f"모델을 {model_name}(으)로 변경합니다.")
         self.model_name = model_name
-        self.model = genai.GenerativeModel(self.model_name)
+
+    @property
+    def model(self):
+        """현재 모델의 GenerativeModel (레지스트리에서 캐시된 클라이언트)"""
+        return get_client("gemini", self.model_name)
+
+    def _generate(self, prompt: str, stream: bool = False):
+        """속도 제한을 적용하여 모델 호출"""
+        if self.rate_limiter is not None:
+            with span("rate_limit_wait"):
+                self.rate_limiter.acquire()
+        return self.model.generate_content(
+            prompt,
+            generation_config=self.generation_config,
+            stream=stream
+        )
+
+    def _record_usage(self, response):
+        """응답의 토큰 사용량 누적 (스트리밍이 중단되어 사용량이 없으면 요청 수만 집계)"""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = (getattr(usage, "prompt_token_count", 0) or 0) if usage is not None else 0
+        output_tokens = (getattr(usage, "candidates_token_count", 0) or 0) if usage is not None else 0
+        with self._usage_lock:
+            self.token_usage["requests"] += 1
+            self.token_usage["prompt_tokens"] += prompt_tokens
+            self.token_usage["output_tokens"] += output_tokens
+        record_tokens(prompt_tokens, output_tokens)
 
     def build_translation_prompt(self,
                                  source_text: str,
@@ -90,7 +116,7 @@ class PatentTranslator:
 - `comprising`은 "포함하는"으로 번역합니다. ("구비하는" 사용 금지)
 - `wherein`은 "여기서" 또는 화학식 뒤에서는 "상기 식에서"로 번역합니다.
 
-{previous_context}
+{previous_context}{format_context}
 
 ---
 **번역 대상 텍스트:**
@@ -116,6 +142,16 @@ class PatentTranslator:
 {previous_translation}
 
 **지시**: 위 번역에서 사용된 용어와 표현을 **반드시 일관되게** 유지하십시오.
+"""
+
+        # Word 서식 자리표시자 (docx_stream.read_docx_text(placeholders=True))
+        format_context = ""
+        if re.search(r'</?g\d+>|<x\d+/>', source_text):
+            format_context = """
+## 서식 태그 규칙
+- `<g1>...</g1>`, `<x1/>` 형식의 태그는 원문의 글자 서식과 개체(그림, 필드 등)를 나타냅니다.
+- 태그는 번호를 바꾸거나 삭제하지 말고, 해당하는 번역어를 감싸도록 그대로 유지하십시오.
+- 원문의 한 줄은 번역문의 한 줄로 번역하십시오. (줄을 합치거나 나누지 마십시오)
 """
 
         return base_prompt.format(
@@ -123,16 +159,34 @@ class PatentTranslator:
             document_type=document_type,
             term_table=term_table,
             previous_context=previous_context,
+            format_context=format_context,
             source_text=source_text
         )
 
+    def build_retry_feedback(self, violations: List) -> str:
+        """스트리밍 QA로 중단된 초안의 치명적 오류를 재요청 프롬프트용 지시로 변환"""
+        lines = ["", "## 이전 초안에서 발견된 치명적 오류 (반드시 수정)"]
+        for v in violations:
+            line = f"- {v.description}: '{v.found}'"
+            if v.correct:
+                line += f" → '{v.correct}'"
+            lines.append(line)
+        lines.append("**지시**: 위 표현을 절대 사용하지 말고 처음부터 다시 번역하십시오.")
+        return "\n".join(lines)
+
     def translate(self,
                  source_text: str,
                  domain: str,
                  term_mapping: Dict[str, str],
                  document_type: str = "claim",
-                 previous_translation: Optional[str] = None) -> Dict:
-        """텍스트 번역"""
+                 previous_translation: Optional[str] = None,
+                 qa_ruleset=None) -> Dict:
+        """텍스트 번역
+
+        Args:
+            qa_ruleset: QA 규칙 집합(CompiledRuleSet). 지정하면 출력을 스트리밍으로 받으며
+                치명적 위반이 나타나는 즉시 생성을 중단하고 오류를 알려 재요청한다.
+        """
 
         print(f"🔄 번역 중... (모델: {self.model_name}, 도메인: {domain}, 유형: {document_type})")
 
@@ -140,29 +194,74 @@ class PatentTranslator:
             source_text, domain, term_mapping, document_type, previous_translation
         )
 
+        if qa_ruleset is not None:
+            return self._translate_streaming(prompt, source_text, term_mapping, document_type, qa_ruleset)
+
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=self.generation_config
-            )
-            
-            # Gemini API의 응답 구조에 따라 텍스트 추출
-            translation = response.text.strip()
+            with span("llm_call", model=self.model_name, purpose="translate", stream=False):
+                response = self._generate(prompt)
+                self._record_usage(response)
+
+                # Gemini API의 응답 구조에 따라 텍스트 추출
+                translation = response.text.strip()
 
             return {"success": True, "translation": translation}
 
         except Exception as e:
             return {"success": False, "error": str(e), "translation": None}
 
+    def _translate_streaming(self, prompt: str, source_text: str,
+                             term_mapping: Dict[str, str], document_type: str,
+                             qa_ruleset) -> Dict:
+        """스트리밍 번역 + 증분 QA (치명적 위반 시 조기 중단 후 재요청)"""
+        severities = self.qa_config.get("stream_abort_severities", ["critical"])
+        max_retries = self.qa_config.get("stream_max_retries", 1)
+        aborted = []  # 중단된 시도별 위반 사항
+
+        for attempt in range(max_retries + 1):
+            scanner = qa_ruleset.streaming_scanner(source_text, term_mapping, document_type, severities)
+            # 마지막 시도는 중단하지 않고 끝까지 생성 (최종 QA에서 보고)
+            can_abort = scanner.active and attempt < max_retries
+
+            try:
+                with span("llm_call", model=self.model_name, purpose="translate", stream=True,
+                          attempt=attempt) as call:
+                    response = self._generate(prompt, stream=True)
+                    for chunk in response:
+                        if scanner.feed(chunk.text) and can_abort:
+                            break
+                    self._record_usage(response)
+                    if not scanner.should_abort:
+                        scanner.finish()
+                    call.set(aborted=can_abort and scanner.should_abort)
+            except Exception as e:
+                return {"success": False, "error": str(e), "translation": None}
+
+            if not (can_abort and scanner.should_abort):
+                return {
+                    "success": True,
+                    "translation": scanner.text.strip(),
+                    "stream_aborts": aborted
+                }
+
+            # 남은 출력을 받지 않고 오류를 지적하여 재요청
+            print(f"   ⚠️ 치명적 오류 감지, 생성 중단 ({len(scanner.text)}자에서): "
+                  f"{', '.join(v.found for v in scanner.violations)}")
+            aborted.append([v.to_dict() for v in scanner.violations])
+            prompt += self.build_retry_feedback(scanner.violations)
+
     def translate_with_self_review(self,
                                    source_text: str,
                                    domain: str,
                                    term_mapping: Dict[str, str],
-                                   document_type: str = "claim") -> Dict:
+                                   document_type: str = "claim",
+                                   previous_translation: Optional[str] = None,
+                                   qa_ruleset=None) -> Dict:
         """자체 검수 포함 번역"""
 
         print("📝 1단계: 초벌 번역")
-        first_result = self.translate(source_text, domain, term_mapping, document_type)
+        first_result = self.translate(source_text, domain, term_mapping, document_type,
+                                      previous_translation, qa_ruleset=qa_ruleset)
 
         if not first_result["success"]:
             return first_result
@@ -193,11 +292,10 @@ class PatentTranslator:
 """
         
         try:
-            response = self.model.generate_content(
-                review_prompt,
-                generation_config=self.generation_config
-            )
-            final_translation = response.text.strip()
+            with span("llm_call", model=self.model_name, purpose="self_review", stream=False):
+                response = self._generate(review_prompt)
+                self._record_usage(response)
+                final_translation = response.text.strip()
             
             status = "REVISED" if final_translation != first_translation else "APPROVED"
             print(f"   ✓ 검수 결과: {status}")